@@ -3,6 +3,10 @@ from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
 from fastapi import Request
 from app.database.models import User, Category, Post  # Import your models
+from app.database.session import SessionLocal
+from app.repositories.category import CategoryRepository
+from app.repositories.post import PostRepository
+from app.core.category_cache import invalidate_catalog
 
 # Custom Authentication Backend
 class BasicAuthBackend(AuthenticationBackend):
@@ -34,10 +38,39 @@ class UserAdmin(ModelView, model=User):
     column_sortable_list = [User.id, User.created_at]
 
 class CategoryAdmin(ModelView, model=Category):
-    column_list = [Category.id, Category.name]
+    column_list = [Category.id, Category.name, Category.post_count]
+    form_excluded_columns = [Category.post_count]
+
+    async def after_model_change(self, data, model, is_created, request):
+        await invalidate_catalog()
+
+    async def after_model_delete(self, model, request):
+        await invalidate_catalog()
 
 class PostAdmin(ModelView, model=Post):
     column_list = [Post.id, Post.title, Post.description, Post.category_id, Post.author_id]
+    # Posts are created by uploads (blob, counters, background jobs), never here;
+    # edits are limited to what no derived data depends on, besides category counts
+    can_create = False
+    form_columns = [Post.title, Post.description, Post.category]
+
+    async def on_model_change(self, data, model, is_created, request):
+        request.state.previous_category_id = model.category_id
+
+    async def after_model_change(self, data, model, is_created, request):
+        previous_category_id = request.state.previous_category_id
+        if previous_category_id != model.category_id:
+            async with SessionLocal() as db:
+                await CategoryRepository.increment_post_count(db, previous_category_id, -1)
+                await CategoryRepository.increment_post_count(db, model.category_id, 1)
+                await db.commit()
+            await invalidate_catalog()
+
+    async def delete_model(self, request, pk):
+        # Like a user's delete: releases the blob, fixes the counters, timelines and contents
+        async with SessionLocal() as db:
+            await PostRepository.delete(db, int(pk))
+        await invalidate_catalog()
 
 # Setup SQLAdmin
 def setup_admin(app, engine):
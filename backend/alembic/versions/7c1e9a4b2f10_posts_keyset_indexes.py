@@ -0,0 +1,30 @@
+"""posts keyset pagination indexes
+
+Revision ID: 7c1e9a4b2f10
+Revises: 4d2a645c6eb3
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e9a4b2f10'
+down_revision: Union[str, None] = '4d2a645c6eb3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'])
+    op.create_index('ix_posts_category_created_at_id', 'posts', ['category_id', 'created_at', 'id'])
+    op.create_index('ix_posts_author_created_at_id', 'posts', ['author_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_author_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_category_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
@@ -0,0 +1,76 @@
+"""hashed refresh tokens and session indexes
+
+Revision ID: a1e4b7c90d25
+Revises: f6c2d8e35a71
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1e4b7c90d25'
+down_revision: Union[str, None] = 'f6c2d8e35a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.add_column(sa.Column('token_hash', sa.String(length=64), nullable=True))
+
+    # Hash the stored tokens; the sessions stay valid. Tokens issued before they
+    # carried a `jti` may repeat: only the newest session per token is kept
+    bind = op.get_bind()
+    sessions = sa.table(
+        'user_sessions',
+        sa.column('id', sa.Integer()), sa.column('refresh_token', sa.String()), sa.column('token_hash', sa.String()),
+    )
+    rows = bind.execute(sa.select(sessions.c.id, sessions.c.refresh_token).order_by(sessions.c.id.desc())).all()
+    hashes, seen, duplicates = {}, set(), []
+    for row in rows:
+        token_hash = hashlib.sha256(row.refresh_token.encode()).hexdigest()  # As app.core.jwt.refresh_token_hash
+        if token_hash in seen:
+            duplicates.append(row.id)
+        else:
+            seen.add(token_hash)
+            hashes[row.id] = token_hash
+    if duplicates:
+        bind.execute(sa.delete(sessions).where(sessions.c.id.in_(duplicates)))
+    if hashes:
+        bind.execute(
+            sa.update(sessions)
+            .where(sessions.c.id == sa.bindparam('session_id'))
+            .values(token_hash=sa.bindparam('hash')),
+            [{'session_id': session_id, 'hash': token_hash} for session_id, token_hash in hashes.items()],
+        )
+
+    existing = {index['name'] for index in sa.inspect(bind).get_indexes('user_sessions')}
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.alter_column('token_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.drop_column('refresh_token')
+        if 'ix_user_sessions_user_id' in existing:
+            # Covered by the (user_id, is_revoked) index
+            batch_op.drop_index('ix_user_sessions_user_id')
+        batch_op.create_index('ix_user_sessions_token_hash', ['token_hash'], unique=True)
+        batch_op.create_index('ix_user_sessions_user_id_is_revoked', ['user_id', 'is_revoked'])
+        batch_op.create_index('ix_user_sessions_expires_at', ['expires_at'])
+
+
+def downgrade() -> None:
+    # Raw tokens cannot be recovered: existing sessions end with the downgrade
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.drop_index('ix_user_sessions_expires_at')
+        batch_op.drop_index('ix_user_sessions_user_id_is_revoked')
+        batch_op.drop_index('ix_user_sessions_token_hash')
+        batch_op.add_column(sa.Column('refresh_token', sa.String(), nullable=True))
+    op.execute("UPDATE user_sessions SET refresh_token = token_hash, is_revoked = true")
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.alter_column('refresh_token', existing_type=sa.String(), nullable=False)
+        batch_op.create_unique_constraint('uq_user_sessions_refresh_token', ['refresh_token'])
+        batch_op.drop_column('token_hash')
+        batch_op.create_index('ix_user_sessions_user_id', ['user_id'])
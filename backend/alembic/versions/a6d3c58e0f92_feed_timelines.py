@@ -0,0 +1,43 @@
+"""feed timelines
+
+Revision ID: a6d3c58e0f92
+Revises: f2b9e4a17c35
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3c58e0f92'
+down_revision: Union[str, None] = 'f2b9e4a17c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'feed_entries',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('post_id', sa.Integer(), sa.ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('author_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_feed_entries_user_created_at_post', 'feed_entries', ['user_id', 'created_at', 'post_id'])
+    op.create_index('ix_feed_entries_post_id', 'feed_entries', ['post_id'])
+    # Backfill timelines from the existing follow graph
+    op.execute(
+        "INSERT INTO feed_entries (user_id, post_id, author_id, created_at) "
+        "SELECT user_follows.follower_id, posts.id, posts.author_id, posts.created_at "
+        "FROM posts JOIN user_follows ON user_follows.following_id = posts.author_id "
+        "WHERE posts.created_at IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_feed_entries_post_id', table_name='feed_entries')
+    op.drop_index('ix_feed_entries_user_created_at_post', table_name='feed_entries')
+    op.drop_table('feed_entries')
@@ -0,0 +1,84 @@
+"""post_contents: extracted document text with full-text index
+
+Revision ID: b7d2e5f81c39
+Revises: a1e4b7c90d25
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e5f81c39'
+down_revision: Union[str, None] = 'a1e4b7c90d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE post_contents ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_post_contents_search_vector ON post_contents USING GIN (search_vector)",
+]
+
+# FTS5 shadow table over `post_contents.body`, kept in sync by triggers
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS post_contents_fts USING fts5(
+        body,
+        content='post_contents', content_rowid='post_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_contents_fts_ai AFTER INSERT ON post_contents BEGIN
+        INSERT INTO post_contents_fts(rowid, body) VALUES (new.post_id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_contents_fts_ad AFTER DELETE ON post_contents BEGIN
+        INSERT INTO post_contents_fts(post_contents_fts, rowid, body) VALUES ('delete', old.post_id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_contents_fts_au AFTER UPDATE OF body ON post_contents BEGIN
+        INSERT INTO post_contents_fts(post_contents_fts, rowid, body) VALUES ('delete', old.post_id, old.body);
+        INSERT INTO post_contents_fts(rowid, body) VALUES (new.post_id, new.body);
+    END
+    """,
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'post_contents',
+        sa.Column('post_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('page_count', sa.Integer(), nullable=False),
+        sa.Column('truncated', sa.Boolean(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('extracted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('post_id'),
+    )
+    dialect = op.get_bind().dialect.name
+    for statement in POSTGRES_DDL if dialect == 'postgresql' else SQLITE_DDL if dialect == 'sqlite' else []:
+        op.execute(statement)
+    # Existing posts are indexed by `python -m app.commands.extract_contents`
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_post_contents_search_vector")
+        op.execute("ALTER TABLE post_contents DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('post_contents_fts_ai', 'post_contents_fts_ad', 'post_contents_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS post_contents_fts")
+    op.drop_table('post_contents')
@@ -0,0 +1,29 @@
+"""blobs.preview_format: first-page thumbnails
+
+Revision ID: c5a9e3d17b42
+Revises: b7d2e5f81c39
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a9e3d17b42'
+down_revision: Union[str, None] = 'b7d2e5f81c39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('blobs') as batch_op:
+        batch_op.add_column(sa.Column('preview_format', sa.String(length=8), nullable=True))
+    # Previews of existing files are rendered by `python -m app.commands.render_previews`
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('blobs') as batch_op:
+        batch_op.drop_column('preview_format')
@@ -0,0 +1,98 @@
+"""post ranking scores
+
+Revision ID: c8e1f47a2d56
+Revises: a6d3c58e0f92
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+import math
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f47a2d56'
+down_revision: Union[str, None] = 'a6d3c58e0f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOP_SCORE = sa.text('(upvotes - downvotes)')
+
+# Ranking parameters as of this revision (app.core.ranking with the default
+# RANKING_HOT_DECAY_SECONDS); `python -m app.commands.recompute_scores` rescores
+# posts with the current ones
+HOT_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HOT_DECAY_SECONDS = 45000
+WILSON_Z = 1.959964
+
+
+def wilson_score(upvotes: int, downvotes: int) -> float:
+    n = upvotes + downvotes
+    if n == 0:
+        return 0.0
+    p, z = upvotes / n, WILSON_Z
+    return (
+        p + z * z / (2 * n) - z * math.sqrt((p * (1 - p) + z * z / (4 * n)) / n)
+    ) / (1 + z * z / n)
+
+
+def hot_score(upvotes: int, downvotes: int, created_at: datetime) -> float:
+    net = upvotes - downvotes
+    order = math.log10(max(abs(net), 1))
+    sign = (net > 0) - (net < 0)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return round(sign * order + (created_at - HOT_EPOCH).total_seconds() / HOT_DECAY_SECONDS, 7)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.add_column(sa.Column('hot_score', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('wilson_score', sa.Float(), server_default='0', nullable=False))
+
+    # Backfill scores from the vote counters
+    bind = op.get_bind()
+    posts = sa.table(
+        'posts',
+        sa.column('id', sa.Integer()), sa.column('upvotes', sa.Integer()),
+        sa.column('downvotes', sa.Integer()), sa.column('created_at', sa.DateTime(timezone=True)),
+        sa.column('hot_score', sa.Float()), sa.column('wilson_score', sa.Float()),
+    )
+    rows = bind.execute(sa.select(posts.c.id, posts.c.upvotes, posts.c.downvotes, posts.c.created_at)).all()
+    params = [
+        {
+            'post_id': post_id,
+            'hot': hot_score(upvotes or 0, downvotes or 0, created_at),
+            'wilson': wilson_score(upvotes or 0, downvotes or 0),
+        }
+        for post_id, upvotes, downvotes, created_at in rows
+        if created_at is not None
+    ]
+    if params:
+        bind.execute(
+            sa.update(posts)
+            .where(posts.c.id == sa.bindparam('post_id'))
+            .values(hot_score=sa.bindparam('hot'), wilson_score=sa.bindparam('wilson')),
+            params,
+        )
+
+    op.create_index('ix_posts_hot_score_id', 'posts', ['hot_score', 'id'])
+    op.create_index('ix_posts_wilson_score_id', 'posts', ['wilson_score', 'id'])
+    op.create_index('ix_posts_top_score_id', 'posts', [TOP_SCORE, 'id'])
+    op.create_index('ix_posts_category_hot_score_id', 'posts', ['category_id', 'hot_score', 'id'])
+    op.create_index('ix_posts_category_wilson_score_id', 'posts', ['category_id', 'wilson_score', 'id'])
+    op.create_index('ix_posts_category_top_score_id', 'posts', ['category_id', TOP_SCORE, 'id'])
+
+
+def downgrade() -> None:
+    for name in (
+        'ix_posts_category_top_score_id', 'ix_posts_category_wilson_score_id', 'ix_posts_category_hot_score_id',
+        'ix_posts_top_score_id', 'ix_posts_wilson_score_id', 'ix_posts_hot_score_id',
+    ):
+        op.drop_index(name, table_name='posts')
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('wilson_score')
+        batch_op.drop_column('hot_score')
@@ -0,0 +1,34 @@
+"""category post counts
+
+Revision ID: d4f7a9c21e63
+Revises: c8e1f47a2d56
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f7a9c21e63'
+down_revision: Union[str, None] = 'c8e1f47a2d56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.add_column(sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill the counters from the posts table
+    op.execute(
+        "UPDATE categories SET post_count = "
+        "(SELECT count(*) FROM posts WHERE posts.category_id = categories.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('post_count')
@@ -0,0 +1,47 @@
+"""user stats
+
+Revision ID: e5a0c7d93b18
+Revises: b3f8d2e61a47
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0c7d93b18'
+down_revision: Union[str, None] = 'b3f8d2e61a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('following_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('uploads_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('upvotes_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('downvotes_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    # Backfill from the source tables
+    op.execute(
+        "INSERT INTO user_stats (user_id, followers_count, following_count, uploads_count, upvotes_count, downvotes_count) "
+        "SELECT users.id, "
+        "(SELECT count(*) FROM user_follows WHERE user_follows.following_id = users.id), "
+        "(SELECT count(*) FROM user_follows WHERE user_follows.follower_id = users.id), "
+        "(SELECT count(*) FROM posts WHERE posts.author_id = users.id), "
+        "(SELECT count(*) FROM post_votes JOIN posts ON posts.id = post_votes.post_id "
+        "WHERE posts.author_id = users.id AND post_votes.is_upvote), "
+        "(SELECT count(*) FROM post_votes JOIN posts ON posts.id = post_votes.post_id "
+        "WHERE posts.author_id = users.id AND NOT post_votes.is_upvote) "
+        "FROM users"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
@@ -0,0 +1,33 @@
+"""user follows list indexes
+
+Revision ID: e9b3c6d08f14
+Revises: d4f7a9c21e63
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b3c6d08f14'
+down_revision: Union[str, None] = 'd4f7a9c21e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_user_follows_following_created_at_id', 'user_follows',
+        ['following_id', 'created_at', 'id', 'follower_id'],
+    )
+    op.create_index(
+        'ix_user_follows_follower_created_at_id', 'user_follows',
+        ['follower_id', 'created_at', 'id', 'following_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_follows_follower_created_at_id', table_name='user_follows')
+    op.drop_index('ix_user_follows_following_created_at_id', table_name='user_follows')
@@ -0,0 +1,43 @@
+"""content-addressed blobs
+
+Revision ID: f2b9e4a17c35
+Revises: e5a0c7d93b18
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b9e4a17c35'
+down_revision: Union[str, None] = 'e5a0c7d93b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'blobs',
+        sa.Column('sha256', sa.String(length=64), primary_key=True),
+        sa.Column('extension', sa.String(length=10), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.add_column(sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_posts_blob_sha256', ['blob_sha256'])
+        batch_op.create_foreign_key('fk_posts_blob_sha256', 'blobs', ['blob_sha256'], ['sha256'])
+    # Existing flat uploads are moved into the blob store by
+    # `python -m app.commands.migrate_uploads`
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_constraint('fk_posts_blob_sha256', type_='foreignkey')
+        batch_op.drop_index('ix_posts_blob_sha256')
+        batch_op.drop_column('blob_sha256')
+    op.drop_table('blobs')
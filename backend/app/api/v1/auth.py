@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.database.session import get_db
+from app.core.rate_limit import login_rate_limits
 from app.services.auth import AuthService
 from app.services.user import UserService
 from app.schemas.login import LoginResponse
@@ -18,7 +19,7 @@ async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_db
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/login", response_model=LoginResponse)
+@router.post("/login", response_model=LoginResponse, dependencies=login_rate_limits)
 async def login_user(
     request: Request,
     response: Response,
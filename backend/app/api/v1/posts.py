@@ -1,69 +1,133 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.post import PostCreate, PostResponse, PostVote
+from app.schemas.post import PostCreate, PostResponse, PostPage, PostVote
 from app.services.post import PostService
-from app.database.session import get_db
+from app.database.session import get_db, get_read_db
 from app.core.deps import get_current_user, get_current_user_optional
+from app.core.rate_limit import upload_rate_limit, vote_rate_limit
+from app.core.upload import receive_upload
+from app.core.downloads import download_response, preview_response
 
 router = APIRouter()
 
-@router.post("/upload", response_model=PostResponse)
+LISTING_SORTS = "^(recent|hot|top|wilson)$"
+BATCH_MAX_IDS = 100
+SEARCH_SORTS = "^(recent|relevant|hot|top|wilson)$"
+
+UPLOAD_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["title", "description", "category_id", "file"],
+                    "properties": {
+                        "title": {"type": "string"},
+                        "description": {"type": "string"},
+                        "category_id": {"type": "integer"},
+                        "file": {"type": "string", "format": "binary"},
+                    },
+                }
+            }
+        },
+    }
+}
+
+@router.post("/upload", response_model=PostResponse, openapi_extra=UPLOAD_FORM_SCHEMA, dependencies=[Depends(upload_rate_limit)])
 async def create_post(
-    title: str = Form(...),
-    description: str = Form(...),
-    category_id: int = Form(...),
-    file: UploadFile = File(...),
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    post_data = PostCreate(title=title, description=description, category_id=category_id)
-    return await PostService.create(db, post_data, file, author_id=current_user.id)
+    """
+    Create a post from a multipart form (title, description, category_id, file).
+    The body is streamed: the file goes to disk chunk by chunk and oversized
+    uploads are rejected without being buffered.
+    """
+    form = await receive_upload(request)
+    if form.file is None:
+        raise HTTPException(status_code=400, detail="File is required")
+    try:
+        post_data = PostCreate(**form.fields)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    return await PostService.create(db, post_data, form.file, author_id=current_user.id)
 
-@router.get("/", response_model=List[PostResponse])
+@router.get("/", response_model=PostPage)
 async def get_posts(
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    sort: Optional[str] = Query(None, pattern=LISTING_SORTS, description="Sort order: 'recent' (default), 'hot', 'top' (net votes) or 'wilson' (rating confidence)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    skip: int = Query(0, ge=0, description="Legacy offset, ignored when a cursor is given"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_optional),
 ):
-    return await PostService.get_all(db, skip=skip, limit=limit)
+    viewer_id = current_user.id if current_user else None
+    return await PostService.get_all(db, skip=skip, limit=limit, cursor=cursor, sort=sort, viewer_id=viewer_id)
 
-@router.get("/following", response_model=List[PostResponse])
+@router.get("/following", response_model=PostPage)
 async def get_following_posts(
     current_user=Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    skip: int = Query(0, ge=0, description="Legacy offset, ignored when a cursor is given"),
+    limit: int = Query(10, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
 ):
-    return await PostService.get_following(db, user_id=current_user.id, skip=skip, limit=limit)
+    return await PostService.get_following(db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor)
 
-@router.get("/search", response_model=List[PostResponse])
+@router.get("/search", response_model=PostPage)
 async def search_posts(
     q: str = Query(..., min_length=1, description="Search query"),
     category_id: Optional[int] = Query(None, description="Optional category ID to filter results"),
-    sort: Optional[str] = Query(None, description="Sort order: 'recent' or 'relevant'"),
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    sort: Optional[str] = Query(None, pattern=SEARCH_SORTS, description="Sort order: 'recent', 'relevant' (text relevance, then rating confidence), 'hot', 'top' or 'wilson'"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    skip: int = Query(0, ge=0, description="Legacy offset, ignored when a cursor is given"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_optional),
 ):
-    """ Search for posts by title or description, optionally filtered by category and sorted """
-    return await PostService.search(db, query=q, category_id=category_id, sort=sort, skip=skip, limit=limit)
+    """ Full-text search for posts by title, description or document text, optionally filtered by category and sorted """
+    viewer_id = current_user.id if current_user else None
+    return await PostService.search(db, query=q, category_id=category_id, sort=sort, skip=skip, limit=limit, cursor=cursor, viewer_id=viewer_id)
 
-@router.get("/search/category", response_model=List[PostResponse])
+@router.get("/search/category", response_model=PostPage)
 async def search_posts_by_category(
     category_id: int = Query(..., description="Category ID"),
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    sort: Optional[str] = Query(None, pattern=LISTING_SORTS, description="Sort order: 'recent' (default), 'hot', 'top' or 'wilson'"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    skip: int = Query(0, ge=0, description="Legacy offset, ignored when a cursor is given"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_optional),
 ):
     """ Get all posts from a specific category """
-    return await PostService.search_by_category(db, category_id=category_id, skip=skip, limit=limit)
+    viewer_id = current_user.id if current_user else None
+    return await PostService.search_by_category(db, category_id=category_id, skip=skip, limit=limit, cursor=cursor, sort=sort, viewer_id=viewer_id)
+
+@router.get("/batch", response_model=List[PostResponse])
+async def get_posts_batch(
+    ids: str = Query(..., pattern=r"^\d+(,\d+)*$", description=f"Comma-separated post IDs (at most {BATCH_MAX_IDS})"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_optional),
+):
+    """
+    Get several posts in one request, in the requested order, with the user's
+    vote on each if authenticated. Unknown IDs are left out.
+    """
+    post_ids = list(dict.fromkeys(int(post_id) for post_id in ids.split(",")))
+    if len(post_ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} post IDs per request")
+    viewer_id = current_user.id if current_user else None
+    return await PostService.get_batch(db, post_ids, viewer_id=viewer_id)
 
 @router.get("/{id}", response_model=PostResponse)
 async def get_post(
     id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user_optional),
 ):
     """
@@ -75,9 +139,11 @@ async def get_post(
 @router.get("/user/{username}", response_model=List[PostResponse])
 async def get_user_posts(
     username: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_optional),
 ):
-    return await PostService.get_by_user(db, username)
+    viewer_id = current_user.id if current_user else None
+    return await PostService.get_by_user(db, username, viewer_id=viewer_id)
 
 @router.delete("/{id}", response_model=dict)
 async def delete_post(
@@ -88,15 +154,26 @@ async def delete_post(
     await PostService.delete(db, id, current_user)
     return {"message": "Post deleted successfully"}
 
-@router.get("/{id}/download")
+@router.api_route("/{id}/download", methods=["GET", "HEAD"])
 async def download_post_file(
     id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+):
+    key, sha256 = await PostService.get_file(db, id)
+    return await download_response(request, key, filename=key.rsplit("/", 1)[-1], sha256=sha256)
+
+@router.get("/{id}/preview")
+async def get_post_preview(
+    id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    file_url = await PostService.get_file_url(db, id)
-    return FileResponse(file_url, media_type="application/octet-stream", filename=file_url.split("/")[-1])
+    """ First-page thumbnail of the post's document (see `preview_url`) """
+    key, sha256 = await PostService.get_preview(db, id)
+    return await preview_response(request, key, sha256)
 
-@router.post("/{post_id}/vote", response_model=PostResponse)
+@router.post("/{post_id}/vote", response_model=PostResponse, dependencies=[Depends(vote_rate_limit)])
 async def vote_post(
     post_id: int,
     vote_data: PostVote,
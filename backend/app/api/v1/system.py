@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.system import JobQueueStats, PoolStats, ReplicaReport
+from app.database.session import engine, get_read_db, pool_stats, replica_router
+from app.repositories.job import JobRepository
+from app.core.config import settings
+from app.core.deps import require_metrics_token
+from app.core.jobs import job_worker, timing_summary
+
+router = APIRouter()
+
+@router.get("/db-pool", response_model=PoolStats, dependencies=[Depends(require_metrics_token)])
+async def get_db_pool_stats():
+    """ Database connection pool usage of the worker serving the request """
+    return pool_stats(engine)
+
+@router.get("/db-replicas", response_model=ReplicaReport, dependencies=[Depends(require_metrics_token)])
+async def get_db_replicas(check: bool = False):
+    """ Health and pool usage of the read replicas, in DATABASE_REPLICA_URLS order; `check=true` probes them first """
+    if check:
+        await replica_router.check_health()
+    return {"replicas": [
+        {
+            "index": index,
+            "healthy": replica.healthy,
+            "pool": pool_stats(replica.engine),
+        }
+        for index, replica in enumerate(replica_router.replicas)
+    ]}
+
+@router.get("/jobs", response_model=JobQueueStats, dependencies=[Depends(require_metrics_token)])
+async def get_job_stats(db: AsyncSession = Depends(get_read_db)):
+    """ Background job queue depth, and wait / run times of the recently finished jobs """
+    timings = []
+    for job in await JobRepository.recent_timings(db):
+        if job.started_at and job.finished_at:
+            timings.append((
+                max((job.started_at - job.run_at).total_seconds(), 0),
+                (job.finished_at - job.started_at).total_seconds(),
+            ))
+    return {
+        **await JobRepository.depth(db),
+        "recent": timing_summary(timings),
+        "worker": job_worker.metrics() if settings.JOB_WORKER_IN_PROCESS else None,
+    }
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.session import get_db
-from app.core.deps import get_current_user
+from app.database.session import get_db, get_read_db
+from app.core.deps import get_current_user, get_current_user_optional
+from app.schemas.user import FollowPage
 from app.services.user_follow import UserFollowService
 
 router = APIRouter()
@@ -28,28 +30,34 @@ async def unfollow_user(
     """
     await UserFollowService.unfollow_user(db, current_user.id, user_id)
 
-@router.get("/{user_id}/followers")
+@router.get("/{user_id}/followers", response_model=FollowPage)
 async def get_followers(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
-    limit: int = 10,
-    offset: int = 0
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    offset: int = Query(0, ge=0, description="Legacy offset, ignored when a cursor is given"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_optional),
 ):
     """
-    Get all followers of a user.
+    Get the followers of a user, most recent first, with their profile counters
+    and whether the current user follows them.
     """
-    followers = await UserFollowService.get_followers(db, user_id, limit, offset)
-    return [{"follower_id": f.follower_id, "created_at": f.created_at} for f in followers]
+    viewer_id = current_user.id if current_user else None
+    return await UserFollowService.get_followers(db, user_id, limit, skip=offset, cursor=cursor, viewer_id=viewer_id)
 
-@router.get("/{user_id}/following")
+@router.get("/{user_id}/following", response_model=FollowPage)
 async def get_following(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
-    limit: int = 10,
-    offset: int = 0
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    offset: int = Query(0, ge=0, description="Legacy offset, ignored when a cursor is given"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_optional),
 ):
     """
-    Get all users a user is following.
+    Get the users a user is following, most recently followed first, with their
+    profile counters and whether the current user follows them.
     """
-    following = await UserFollowService.get_following(db, user_id, limit, offset)
-    return [{"following_id": f.following_id, "created_at": f.created_at} for f in following]
\ No newline at end of file
+    viewer_id = current_user.id if current_user else None
+    return await UserFollowService.get_following(db, user_id, limit, skip=offset, cursor=cursor, viewer_id=viewer_id)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.deps import get_current_user, get_current_user_optional
-from app.database.session import get_db
+from app.database.session import get_db, get_read_db
 from app.schemas.user import UserResponse, UserUpdate, UserProfile
 from app.schemas.post import PostResponse
 from app.services.user import UserService
@@ -24,7 +24,7 @@ async def update_current_user_profile(
     return await UserService.update_profile(db, current_user, user_data)
 
 @router.get("/{id}", response_model=UserResponse)
-async def get_user_profile(id: int, db: AsyncSession = Depends(get_db)):
+async def get_user_profile(id: int, db: AsyncSession = Depends(get_read_db)):
     """ Get a public profile of a user by their ID """
     user = await UserService.get_by_id(db, id)
     if not user:
@@ -37,7 +37,7 @@ async def get_user_uploads(
     db: AsyncSession = Depends(get_db),
 ):
     """ Get the current user's uploaded files """
-    return await PostService.get_by_user(db, current_user.id)
+    return await PostService.get_by_user(db, current_user.username, viewer_id=current_user.id)
 
 @router.get("/me/profile", response_model=UserProfile)
 async def get_user_profile(
@@ -50,7 +50,7 @@ async def get_user_profile(
 @router.get("/{username}/profile", response_model=UserProfile)
 async def get_user_profile(
     username: str, 
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user_optional),
 ):
     """ Get the user's profile """
@@ -0,0 +1,32 @@
+"""
+Queue text extraction for posts whose document is not indexed for search yet,
+e.g. the posts uploaded before document search existed. The job workers do
+the extraction.
+
+Usage (from the backend directory):
+    python -m app.commands.extract_contents            # posts without extracted text
+    python -m app.commands.extract_contents --failed   # also retry failed extractions
+    python -m app.commands.extract_contents 1 2 3      # selected post ids (re-extracted)
+"""
+import asyncio
+import sys
+from app.database.session import SessionLocal
+from app.repositories.job import JobRepository
+from app.repositories.post_content import PostContentRepository
+
+
+async def extract_contents(post_ids=None, failed: bool = False) -> int:
+    async with SessionLocal() as db:
+        if post_ids is None:
+            post_ids = await PostContentRepository.missing(db, failed=failed)
+        for post_id in post_ids:
+            await JobRepository.enqueue(db, "posts.extract_text", {"post_id": post_id})
+        await db.commit()
+    return len(post_ids)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    ids = [int(arg) for arg in args if arg != "--failed"] or None
+    queued = asyncio.run(extract_contents(ids, failed="--failed" in args))
+    print(f"Queued text extraction for {queued} posts")
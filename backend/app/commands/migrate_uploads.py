@@ -0,0 +1,72 @@
+"""
+Move legacy flat uploads (/static/uploads/<uuid>.<ext>) into the
+content-addressed blob store and link their posts to blobs.
+Safe to re-run: posts that already reference a blob are skipped.
+
+Usage (from the backend directory):
+    python -m app.commands.migrate_uploads          # migrate posts
+    python -m app.commands.migrate_uploads --gc     # also remove blob files no post references now
+                                                    # (otherwise done by the blobs.collect_garbage job)
+"""
+import asyncio
+import hashlib
+import sys
+from contextlib import closing
+from typing import Set, Tuple
+from sqlalchemy.future import select
+from app.core.blob_store import blob_url, collect_garbage, file_key, store_blob
+from app.core.config import settings
+from app.core.storage import storage
+from app.database.models import Post
+from app.database.session import SessionLocal
+from app.repositories.blob import BlobRepository
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_object(key: str) -> Tuple[str, int]:
+    """SHA-256 and size of a stored object, streamed in chunks (blocking)"""
+    digest, size = hashlib.sha256(), 0
+    with closing(storage.open(key)) as stream:
+        for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+async def migrate_uploads() -> dict:
+    report = {"migrated": 0, "missing": 0}
+    async with SessionLocal() as db:
+        result = await db.execute(select(Post.id, Post.file_url).filter(Post.blob_sha256.is_(None)))
+        for post_id, file_url in result.all():
+            key = file_key(file_url)
+            if key is None or not await storage.exists(key):
+                report["missing"] += 1
+                print(f"post {post_id}: file not found for {file_url}")
+                continue
+            extension = key.rsplit(".", 1)[-1].lower()
+            sha256, size = await asyncio.to_thread(hash_object, key)
+            await store_blob(key, sha256, extension)
+
+            post = await db.get(Post, post_id)
+            post.blob_sha256 = sha256
+            post.file_url = blob_url(sha256, extension)
+            await BlobRepository.acquire(db, sha256, extension, size)
+            await db.commit()
+            report["migrated"] += 1
+    return report
+
+
+async def remove_unreferenced() -> int:
+    """Remove blob objects that have no `blobs` row (e.g. left by deleted posts or failed uploads)"""
+    async def referenced() -> Set[str]:
+        async with SessionLocal() as db:
+            return await BlobRepository.referenced(db)
+
+    return await collect_garbage(referenced, settings.BLOB_GC_MIN_AGE_SECONDS)
+
+
+if __name__ == "__main__":
+    print(asyncio.run(migrate_uploads()))
+    if "--gc" in sys.argv[1:]:
+        print(f"removed {asyncio.run(remove_unreferenced())} unreferenced files")
@@ -0,0 +1,27 @@
+"""
+Rebuild the precomputed home timelines (`feed_entries`) from the follow graph.
+
+Usage (from the backend directory):
+    python -m app.commands.rebuild_feeds            # every user
+    python -m app.commands.rebuild_feeds 1 2 3      # selected user ids
+"""
+import asyncio
+import sys
+from sqlalchemy.future import select
+from app.database.models import User
+from app.database.session import SessionLocal
+from app.repositories.feed import FeedRepository
+
+
+async def rebuild_feeds(user_ids=None):
+    async with SessionLocal() as db:
+        if user_ids is None:
+            user_ids = (await db.execute(select(User.id))).scalars().all()
+        await FeedRepository.rebuild(db, user_ids)
+        await db.commit()
+
+
+if __name__ == "__main__":
+    ids = [int(arg) for arg in sys.argv[1:]] or None
+    asyncio.run(rebuild_feeds(ids))
+    print(f"Rebuilt feeds for {'all users' if ids is None else ids}")
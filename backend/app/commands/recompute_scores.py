@@ -0,0 +1,19 @@
+"""
+Recompute the precomputed ranking scores (`hot_score`, `wilson_score`) of all posts.
+Run it after changing RANKING_HOT_DECAY_SECONDS, or periodically to repair drift.
+
+Usage (from the backend directory):
+    python -m app.commands.recompute_scores
+"""
+import asyncio
+from app.database.session import SessionLocal
+from app.repositories.ranking import RankingRepository
+
+
+async def recompute_scores() -> int:
+    async with SessionLocal() as db:
+        return await RankingRepository.recompute(db)
+
+
+if __name__ == "__main__":
+    print(f"Recomputed scores of {asyncio.run(recompute_scores())} posts")
@@ -0,0 +1,26 @@
+"""
+Backfill / reconcile the denormalized `user_stats` counters
+(and, for a full run, the per-category post counts).
+
+Usage (from the backend directory):
+    python -m app.commands.reconcile_stats            # every user
+    python -m app.commands.reconcile_stats 1 2 3      # selected user ids
+"""
+import asyncio
+import sys
+from app.database.session import SessionLocal
+from app.repositories.category import CategoryRepository
+from app.repositories.user_stats import UserStatsRepository
+
+
+async def reconcile_stats(user_ids=None):
+    async with SessionLocal() as db:
+        await UserStatsRepository.reconcile(db, user_ids)
+        if user_ids is None:
+            await CategoryRepository.reconcile_post_counts(db)
+
+
+if __name__ == "__main__":
+    ids = [int(arg) for arg in sys.argv[1:]] or None
+    asyncio.run(reconcile_stats(ids))
+    print(f"Reconciled stats for {'all users' if ids is None else ids}")
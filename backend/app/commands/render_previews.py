@@ -0,0 +1,26 @@
+"""
+Queue first-page preview rendering for the files that have none yet, e.g.
+files uploaded before previews existed or while the optional rendering
+packages were missing. The job workers do the rendering.
+
+Usage (from the backend directory):
+    python -m app.commands.render_previews
+"""
+import asyncio
+from app.database.session import SessionLocal
+from app.repositories.blob import BlobRepository
+from app.repositories.job import JobRepository
+
+
+async def render_previews() -> int:
+    async with SessionLocal() as db:
+        hashes = await BlobRepository.without_preview(db)
+        for sha256 in hashes:
+            await JobRepository.enqueue(db, "blobs.render_preview", {"blob_sha256": sha256})
+        await db.commit()
+    return len(hashes)
+
+
+if __name__ == "__main__":
+    queued = asyncio.run(render_previews())
+    print(f"Queued previews for {queued} files")
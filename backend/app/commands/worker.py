@@ -0,0 +1,35 @@
+"""
+Run a background job worker. Start any number of them, on any host, next to
+(or instead of) the in-process worker of the web app (JOB_WORKER_IN_PROCESS).
+
+Usage (from the backend directory):
+    python -m app.commands.worker        # JOB_WORKER_CONCURRENCY jobs at a time
+    python -m app.commands.worker 8      # 8 jobs at a time
+"""
+import asyncio
+import logging
+import signal
+import sys
+import app.jobs.tasks  # Registers the job handlers
+from app.core.config import settings
+from app.core.extraction import shutdown_extraction
+from app.core.jobs import Worker
+from app.database.session import engine
+
+
+async def run_worker(concurrency: int):
+    worker = Worker(concurrency=concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: asyncio.ensure_future(worker.stop()))
+    try:
+        await worker.run()
+    finally:
+        shutdown_extraction()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    concurrency = int(sys.argv[1]) if sys.argv[1:] else settings.JOB_WORKER_CONCURRENCY
+    asyncio.run(run_worker(concurrency))
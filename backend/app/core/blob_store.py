@@ -0,0 +1,78 @@
+import posixpath
+import re
+import time
+from typing import Awaitable, Callable, Optional, Set
+from app.core.storage import storage
+
+# Blobs live in a sharded, content-addressed layout inside the storage backend:
+#   ab/cd/abcd...ef.pdf  (first two byte pairs of the SHA-256)
+# and are exposed under UPLOAD_URL_PREFIX (`file_url` of a post).
+UPLOAD_URL_PREFIX = "/static/uploads/"
+TEMP_PREFIX = "tmp/"  # Uploads in progress
+# Blob files and their previews (ab/cd/<sha256>.pdf, ab/cd/<sha256>.preview.webp)
+BLOB_OBJECT_KEY = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})(\.preview)?\.\w+$")
+
+
+def blob_key(sha256: str, extension: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}"
+
+
+def preview_key(sha256: str, image_format: str) -> str:
+    """First-page thumbnail of a blob, stored next to it"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.preview.{image_format}"
+
+
+def blob_url(sha256: str, extension: str) -> str:
+    return UPLOAD_URL_PREFIX + blob_key(sha256, extension)
+
+
+def file_key(file_url: str) -> Optional[str]:
+    """
+    Map a stored `file_url` (sharded blob or legacy flat upload) to its
+    storage key. Returns None for URLs that point outside the upload area.
+    """
+    if not file_url.startswith(UPLOAD_URL_PREFIX):
+        return None
+    key = posixpath.normpath(file_url[len(UPLOAD_URL_PREFIX):])
+    if key.startswith(("/", "..")) or key == ".":
+        return None
+    return key
+
+
+async def store_blob(temp_key: str, sha256: str, extension: str) -> str:
+    """
+    Move a fully written temp object into the blob store. A blob with the same
+    content is replaced rather than kept, so that it counts as new for
+    `collect_garbage` until the upload has registered its reference.
+    """
+    key = blob_key(sha256, extension)
+    await storage.move(temp_key, key)
+    return key
+
+
+async def collect_garbage(referenced: Callable[[], Awaitable[Set[str]]], min_age: float) -> int:
+    """
+    Remove the blob files and previews whose hash is not in the set returned by
+    `referenced`, and leftover temp objects of interrupted uploads. Objects
+    younger than `min_age` seconds are kept: they may belong to an upload not
+    yet committed.
+
+    The referenced set is read after listing the storage, so a blob registered
+    while listing is kept, and each object is stat'ed again right before its
+    delete, so one just written again by `store_blob` is kept as well. Only an
+    upload landing between that stat and the delete can still lose its file.
+    """
+    cutoff = time.time() - min_age
+    candidates = [obj.key for obj in await storage.list() if obj.modified <= cutoff]
+    hashes = await referenced()
+    removed = 0
+    for key in candidates:
+        match = BLOB_OBJECT_KEY.match(key)
+        if not ((match and match["sha256"] not in hashes) or key.startswith(TEMP_PREFIX)):
+            continue
+        current = await storage.stat(key)
+        if current is None or current.modified > cutoff:
+            continue
+        await storage.delete(key)
+        removed += 1
+    return removed
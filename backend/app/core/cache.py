@@ -0,0 +1,145 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class CacheBackend(ABC):
+    """Minimal key/value cache with per-entry TTL. Values are bytes."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+
+class NullCache(CacheBackend):
+    """Cache that stores nothing; used to switch caching off."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """In-process cache with TTL expiry and LRU eviction beyond `max_entries`."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache speaking the Redis protocol (Redis, Valkey, KeyDB, or a local stand-in).
+    Requires the optional `redis` package unless an async `client` is passed in.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "unilibrary:", client=None):
+        self.prefix = prefix
+        self.client = client or redis_client(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*[self.prefix + key for key in keys])
+
+
+def redis_client(url: str):
+    """Create an asyncio Redis client for `url`"""
+    try:
+        from redis import asyncio as aioredis
+    except ImportError as e:
+        raise RuntimeError("Redis-backed features require the 'redis' package") from e
+    return aioredis.from_url(url)
+
+
+def create_cache(backend: str, redis_url: Optional[str] = None, max_entries: int = 10000) -> CacheBackend:
+    """Build a cache backend by name: 'memory', 'redis' or 'none'"""
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries)
+    if backend == "redis":
+        if not redis_url:
+            raise RuntimeError("REDIS_URL must be set to use the redis cache backend")
+        return RedisCache(redis_url)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+# Invalidation tasks in flight, held so they are not garbage-collected mid-run
+_tasks: Set[asyncio.Task] = set()
+
+
+def invalidate_on_commit(session: Optional[Session], invalidation: Callable[..., Awaitable[None]], *args) -> None:
+    """
+    Run `invalidation(*args)` once `session` commits; nothing runs if it rolls
+    back. Meant for ORM flush listeners, which fire before the commit: a reader
+    invalidating right away could cache the old row again before it is replaced.
+    """
+    if session is not None:
+        session.info.setdefault("invalidate_on_commit", set()).add((invalidation, args))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_invalidations(session: Session):
+    pending = session.info.pop("invalidate_on_commit", ())
+    if not pending:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    for invalidation, args in pending:
+        task = loop.create_task(invalidation(*args))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_invalidations(session: Session):
+    session.info.pop("invalidate_on_commit", None)
@@ -0,0 +1,37 @@
+from typing import List, Optional
+from pydantic import TypeAdapter
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.core.response_cache import invalidate
+from app.schemas.category import CategoryResponse
+
+# The whole category catalog (with post counts) is cached as a single entry
+category_cache = create_cache(
+    settings.CATEGORY_CACHE_BACKEND,
+    redis_url=settings.REDIS_URL,
+    max_entries=1,
+)
+
+CATALOG_KEY = "categories:catalog"
+_catalog = TypeAdapter(List[CategoryResponse])
+
+
+async def get_cached_catalog() -> Optional[List[CategoryResponse]]:
+    raw = await category_cache.get(CATALOG_KEY)
+    return _catalog.validate_json(raw) if raw else None
+
+
+async def cache_catalog(categories) -> List[CategoryResponse]:
+    """Store the catalog built from Category rows and return it"""
+    catalog = [CategoryResponse.model_validate(category, from_attributes=True) for category in categories]
+    await category_cache.set(CATALOG_KEY, _catalog.dump_json(catalog), settings.CATEGORY_CACHE_TTL_SECONDS)
+    return catalog
+
+
+async def invalidate_catalog() -> None:
+    """
+    Drop the cached catalog after a category was added, renamed or removed,
+    or a post count changed; cached /categories/ responses go with it.
+    """
+    await category_cache.delete(CATALOG_KEY)
+    await invalidate("categories")
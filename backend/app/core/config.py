@@ -1,13 +1,99 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 # from pydantic import Field
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"  # Префикс для API
     JWT_SECRET_KEY: str              # Секретный ключ для JWT
-    JWT_ALGORITHM: str = "HS256"     # Алгоритм шифрования JWT
+    JWT_ALGORITHM: str = "HS256"     # Алгоритм подписи JWT: HS256 | RS256 | EdDSA
+    JWT_PRIVATE_KEY_FILE: Optional[str] = None  # PEM-ключ подписи для RS256/EdDSA (не нужен узлам, которые только проверяют)
+    JWT_KEY_ID: Optional[str] = None            # kid активного ключа подписи
+    JWT_JWKS_FILE: Optional[str] = None         # JWKS с открытыми ключами проверки, включая предыдущие (ротация)
+    JWT_VERIFIED_CACHE_SIZE: int = 10000        # Сколько проверенных access-токенов держать в памяти процесса
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # Время жизни access-token
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7  # Время жизни refresh-token
     DATABASE_URL: str            # URL базы данных (например, PostgreSQL)
+    DATABASE_ECHO: bool = False                # Логировать все SQL-запросы (только для отладки)
+    DATABASE_POOL_SIZE: int = 5                # Постоянные соединения в пуле (на процесс)
+    DATABASE_MAX_OVERFLOW: int = 10            # Дополнительные соединения сверх пула при пиковой нагрузке
+    DATABASE_POOL_TIMEOUT: int = 30            # Ожидание свободного соединения (секунды)
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800  # Пересоздавать соединения старше этого возраста
+    DATABASE_POOL_PRE_PING: bool = True        # Проверять соединение перед выдачей из пула
+    DATABASE_STATEMENT_TIMEOUT_MS: Optional[int] = 30000  # statement_timeout в PostgreSQL (None — без ограничения)
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100   # Кэш подготовленных запросов asyncpg (0 для PgBouncer)
+    DATABASE_REPLICA_URLS: str = ""            # URL реплик для чтения через запятую (пусто — всё читается с основной БД)
+    DATABASE_REPLICA_RETRY_SECONDS: int = 10   # Через сколько секунд снова пробовать упавшую реплику
+    DATABASE_REPLICA_HEALTH_INTERVAL_SECONDS: int = 15  # Период фоновой проверки реплик
+    REDIS_URL: Optional[str] = None  # URL Redis-совместимого сервера для кэшей
+    METRICS_TOKEN: Optional[str] = None  # Токен для /system (заголовок X-Metrics-Token); не задан — эндпоинты отключены
+
+    PASSWORD_HASH_ROUNDS: int = 12   # Work factor bcrypt (хеши с другим значением обновляются при входе)
+    PASSWORD_HASH_WORKERS: int = 4   # Размер пула потоков для хеширования паролей
+
+    USER_CACHE_BACKEND: str = "memory"  # Кэш пользователей: memory | redis | none
+    USER_CACHE_TTL_SECONDS: int = 30     # Время жизни записи в кэше пользователей
+    USER_CACHE_MAX_ENTRIES: int = 10000  # Максимум записей в памяти процесса (LRU)
+
+    STORAGE_BACKEND: str = "local"              # Хранилище файлов: local | s3
+    STORAGE_LOCAL_ROOT: str = "static/uploads"  # Каталог для локального хранилища
+    S3_BUCKET: Optional[str] = None             # Бакет S3-совместимого хранилища
+    S3_PREFIX: str = ""                         # Префикс ключей внутри бакета
+    S3_ENDPOINT_URL: Optional[str] = None       # Endpoint (MinIO и т.п.); None — AWS
+    S3_REGION: Optional[str] = None             # Регион бакета
+    S3_ACCESS_KEY_ID: Optional[str] = None      # Ключ доступа (None — стандартная цепочка boto3)
+    S3_SECRET_ACCESS_KEY: Optional[str] = None  # Секретный ключ
+    S3_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024  # Размер части multipart-загрузки (минимум 5MB)
+    S3_PRESIGNED_URL_EXPIRE_SECONDS: int = 3600    # Время жизни подписанных ссылок на скачивание
+    BLOB_GC_INTERVAL_SECONDS: int = 86400  # Периодичность удаления файлов, на которые не ссылается ни один пост
+    BLOB_GC_MIN_AGE_SECONDS: int = 3600    # Более новые файлы не удаляются (загрузка ещё может их зарегистрировать)
+
+    RESPONSE_CACHE_BACKEND: str = "memory"     # Кэш ответов для анонимных GET-запросов: memory | redis | none
+    RESPONSE_CACHE_TTL_SECONDS: int = 30        # Максимальное время жизни закэшированного ответа
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000      # Максимум ответов в памяти процесса (LRU)
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 1024 * 1024  # Ответы больше этого размера не кэшируются
+
+    CATEGORY_CACHE_BACKEND: str = "memory"    # Кэш каталога категорий: memory | redis | none
+    CATEGORY_CACHE_TTL_SECONDS: int = 300     # Время жизни каталога в кэше (ограничивает устаревание в других процессах)
+
+    RANKING_HOT_DECAY_SECONDS: int = 45000  # Возраст, который в hot-рейтинге «стоит» десятикратной разницы голосов
+
+    FEED_FANOUT_MAX_FOLLOWERS: int = 5000  # Авторы с большим числом подписчиков не рассылаются, а подтягиваются при чтении ленты
+    FEED_BACKFILL_POSTS: int = 50          # Сколько последних постов автора добавить в ленту при подписке
+
+    JOB_WORKER_IN_PROCESS: bool = True      # Запускать обработчик фоновых задач внутри веб-процесса
+    JOB_WORKER_CONCURRENCY: int = 4         # Сколько задач обработчик выполняет одновременно
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0  # Как часто обработчик проверяет очередь
+    JOB_TIMEOUT_SECONDS: int = 300          # Максимальное время выполнения одной задачи
+    JOB_MAX_ATTEMPTS: int = 5               # Попыток на задачу до перевода в failed
+    JOB_RETRY_BACKOFF_SECONDS: int = 10     # Задержка перед повтором (удваивается с каждой попыткой)
+    JOB_LOCK_TIMEOUT_SECONDS: int = 900     # Задачи в running дольше этого (упавший обработчик) возвращаются в очередь
+    JOB_RETENTION_HOURS: int = 72           # Сколько хранить выполненные и упавшие задачи
+    SESSION_CLEANUP_INTERVAL_SECONDS: int = 3600  # Периодичность удаления истёкших и отозванных сессий
+    SESSION_CLEANUP_BATCH_SIZE: int = 1000        # Сессий, удаляемых за одну транзакцию
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 86400  # Периодичность пересчёта счётчиков пользователей и категорий
+
+    EXTRACTION_WORKERS: int = 2                    # Процессов для извлечения текста и рендеринга превью документов
+    EXTRACTION_MAX_PAGES: int = 200                # Сколько страниц (слайдов) документа индексировать
+    EXTRACTION_MAX_CHARS: int = 200000             # Максимальный объём сохраняемого текста документа
+    EXTRACTION_MAX_PART_BYTES: int = 50 * 1024 * 1024  # Предел распакованного XML внутри docx/pptx (защита от zip-бомб)
+    PREVIEW_MAX_SIZE: int = 480                    # Максимальная ширина и высота превью первой страницы (px)
+    PREVIEW_FORMAT: str = "webp"                   # Формат превью при наличии Pillow: webp | png | jpeg
+
+    RATE_LIMIT_BACKEND: str = "memory"        # Счётчики ограничения частоты запросов: memory | redis | none
+    RATE_LIMIT_MAX_ENTRIES: int = 100000      # Максимум счётчиков в памяти процесса (LRU)
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 300  # Скользящее окно для попыток входа
+    LOGIN_RATE_LIMIT_PER_IP: int = 30           # Попыток входа за окно с одного IP
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 10     # Попыток входа за окно на одно имя пользователя
+    LOGIN_RATE_LIMIT_PER_DEVICE: int = 20       # Попыток входа за окно с одного Device-Id
+    UPLOAD_RATE_LIMIT_PER_USER: int = 30        # Загрузок за окно на пользователя
+    UPLOAD_RATE_LIMIT_WINDOW_SECONDS: int = 3600
+    VOTE_RATE_LIMIT_PER_USER: int = 120         # Голосов за окно на пользователя
+    VOTE_RATE_LIMIT_WINDOW_SECONDS: int = 60
+
+    DOWNLOAD_CACHE_MAX_AGE: int = 31536000  # Cache-Control max-age для скачиваемых файлов (секунды)
+    DOWNLOAD_OFFLOAD: str = "none"          # Отдача файлов прокси-сервером: none | x-accel-redirect | x-sendfile
+    DOWNLOAD_OFFLOAD_PREFIX: str = "/protected/uploads/"  # Внутренний location nginx для X-Accel-Redirect
+    DOWNLOAD_OFFLOAD_MIN_BYTES: int = 0     # Файлы меньше этого размера отдаются самим приложением
 
     class Config:
         env_file = ".env"  # Загрузка переменных из файла .env
@@ -1,12 +1,14 @@
+import hmac
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security.utils import get_authorization_scheme_param
 from fastapi.security import OAuth2PasswordBearer
 from app.repositories.user import UserRepository
 from app.database.session import get_db
+from app.core.config import settings
 from app.core.jwt import decode_access_token
-from app.schemas.token import TokenPayload
+from app.core.user_cache import cache_user, get_cached_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
@@ -23,53 +25,71 @@ async def get_optional_token(request: Request) -> Optional[str]:
         return None
     return token
 
+async def _load_principal(db: AsyncSession, user_id: str):
+    """
+    Resolve a user id from a token to an active principal, served from the
+    user cache when possible so that auth stays off the database hot path.
+    """
+    user = await get_cached_user(user_id)
+    if user is None:
+        db_user = await UserRepository.get_by_id(db, user_id=user_id)
+        if db_user is None:
+            return None
+        user = await cache_user(db_user)
+    return user if user.is_active else None
+
+def _token_user_id(token: str) -> Optional[str]:
+    """User id of a valid access token, or None"""
+    try:
+        return decode_access_token(token).sub or None
+    except (HTTPException, ValueError):  # ValueError: malformed payload
+        return None
+
 async def get_current_user(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ):
     """Retrieve the current user based on the access token"""
-    try:
-        payload = decode_access_token(token)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-        )
-    
-    user_id: str = payload.sub if isinstance(payload, TokenPayload) else payload.get("sub")
+    user_id = _token_user_id(token)
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
+            detail="Invalid or expired token",
         )
 
-    user = await UserRepository.get_by_id(db, user_id=user_id)
-    if not user or not user.is_active:
+    user = await _load_principal(db, user_id)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is inactive or not found",
         )
     
+    request.state.current_user = user
     return user
 
 async def get_current_user_optional(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     token: Optional[str] = Depends(get_optional_token)
 ):
-    if not token:
-        return None
-
-    try:
-        payload = decode_access_token(token)
-    except Exception:
-        return None
-
-    user_id: str = payload.sub if isinstance(payload, TokenPayload) else payload.get("sub")
+    user_id = _token_user_id(token) if token else None
     if not user_id:
         return None
 
-    user = await UserRepository.get_by_id(db, user_id=user_id)
-    if not user or not user.is_active:
-        return None
+    user = await _load_principal(db, user_id)
+    request.state.current_user = user
+    return user
 
-    return user
\ No newline at end of file
+async def require_metrics_token(x_metrics_token: Optional[str] = Header(None)):
+    """
+    Guard for the operational endpoints: they do not exist unless METRICS_TOKEN
+    is set, and then need it in the X-Metrics-Token header.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_metrics_token or not hmac.compare_digest(x_metrics_token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+        )
@@ -0,0 +1,146 @@
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+import anyio
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, RedirectResponse
+from app.core.storage import guess_content_type, storage
+from app.core.config import settings
+
+
+def file_etag(stat_result: Optional[os.stat_result], sha256: Optional[str] = None) -> str:
+    """
+    Strong ETag from the content hash when it is known, otherwise a weak one
+    from the file's modification time and size (legacy uploads).
+    """
+    if sha256:
+        return f'"{sha256}"'
+    return f'W/"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since (RFC 9110 13.1): when
+    If-None-Match is present, If-Modified-Since is ignored.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def _offload_headers(key: str, path: Path) -> dict:
+    """Headers that hand the transfer over to the front proxy"""
+    if settings.DOWNLOAD_OFFLOAD == "x-accel-redirect":
+        return {"X-Accel-Redirect": settings.DOWNLOAD_OFFLOAD_PREFIX + key}
+    if settings.DOWNLOAD_OFFLOAD == "x-sendfile":
+        return {"X-Sendfile": str(path.resolve())}
+    return {}
+
+
+async def download_response(request: Request, key: str, filename: str, sha256: Optional[str] = None) -> Response:
+    """
+    Serve a stored file as an attachment with validators and caching:
+    strong ETag from the content hash, 304 for matching conditional requests,
+    byte ranges (206) via FileResponse and long-lived Cache-Control. Large
+    files can be offloaded to a front proxy (X-Accel-Redirect / X-Sendfile).
+
+    Backends without local files redirect to a presigned URL instead, so the
+    bytes (and Range handling) come straight from the object store.
+    """
+    path = storage.local_path(key)
+    if path is None:
+        return await _redirect_to_storage(request, key, filename, sha256)
+
+    try:
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found on the server"
+        )
+
+    etag = file_etag(stat_result, sha256)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        # Content behind a post never changes; blob-backed files are immutable
+        "Cache-Control": f"public, max-age={settings.DOWNLOAD_CACHE_MAX_AGE}" + (", immutable" if sha256 else ""),
+    }
+
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if settings.DOWNLOAD_OFFLOAD != "none" and stat_result.st_size >= settings.DOWNLOAD_OFFLOAD_MIN_BYTES:
+        response = Response(headers={**headers, **_offload_headers(key, path)}, media_type="application/octet-stream")
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    return FileResponse(
+        path,
+        headers=headers,
+        media_type="application/octet-stream",
+        filename=filename,
+        stat_result=stat_result,
+    )
+
+
+async def preview_response(request: Request, key: str, sha256: str) -> Response:
+    """
+    Serve a preview image inline. Previews are derived from immutable blobs and
+    linked with a versioned URL, so clients and proxies may keep them forever.
+    """
+    etag = f'"{sha256}-preview"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.DOWNLOAD_CACHE_MAX_AGE}, immutable"}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = storage.local_path(key)
+    if path is None:
+        url = await storage.presigned_url(key)
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers=headers)
+    try:
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preview not available")
+    return FileResponse(path, headers=headers, media_type=guess_content_type(key), stat_result=stat_result)
+
+
+async def _redirect_to_storage(request: Request, key: str, filename: str, sha256: Optional[str]) -> Response:
+    if sha256:
+        # Blob content never changes, so the hash validates without touching the store
+        etag = file_etag(None, sha256)
+        if is_not_modified(request, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": f"public, max-age={settings.DOWNLOAD_CACHE_MAX_AGE}, immutable"},
+            )
+    url = await storage.presigned_url(key, filename)
+    return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+
+async def stored_file_redirect(key: str) -> Response:
+    """
+    Serve the public upload URL (`/static/uploads/<key>`) for backends that
+    are not mounted as static files: redirect to an inline presigned URL.
+    """
+    url = await storage.presigned_url(key)
+    if url is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
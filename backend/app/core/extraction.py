@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import multiprocessing
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib.util import find_spec
+from typing import Callable, List, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# WordprocessingML / DrawingML element names
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+# Control characters never belong in extracted text; they are also used as
+# highlight markers in search snippets (see app.database.search)
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+class ExtractionError(Exception):
+    """The document cannot be read; retrying will not help"""
+
+
+def extraction_supported(extension: str) -> bool:
+    """Whether text can be extracted from this file type here (PDF needs the optional `pypdf`)"""
+    if extension == "pdf":
+        return find_spec("pypdf") is not None
+    return extension in ("docx", "pptx")
+
+
+def check_extraction_support() -> None:
+    """Warn at startup when PDF text cannot be extracted, rather than skipping it silently"""
+    if not extraction_supported("pdf"):
+        logger.warning("pypdf is not installed: PDF uploads will not be searchable by their content")
+
+
+def _clean(text: str) -> str:
+    text = _SPACES.sub(" ", _CONTROL.sub(" ", text))
+    return _BLANK_LINES.sub("\n\n", "\n".join(line.strip() for line in text.split("\n"))).strip()
+
+
+def read_part(archive: zipfile.ZipFile, name: str, max_part_bytes: int):
+    info = archive.getinfo(name)
+    # The declared size bounds what zipfile will decompress, so this stops zip bombs
+    if info.file_size > max_part_bytes:
+        raise ExtractionError(f"{name} is too large to extract ({info.file_size} bytes)")
+    return archive.open(info)
+
+
+def _docx_pages(path: str, max_pages: int, max_part_bytes: int) -> Tuple[List[str], bool]:
+    """
+    Paragraph text of a Word document, one string per page. Pages are only known
+    from the page breaks saved by Word, so a document without them is one page.
+    """
+    pages: List[str] = []
+    paragraphs: List[str] = []
+    runs: List[str] = []
+    with zipfile.ZipFile(path) as archive:
+        try:
+            part = read_part(archive, "word/document.xml", max_part_bytes)
+        except KeyError:
+            raise ExtractionError("Not a Word document")
+        with part:
+            for event, element in iterparse(part, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    if tag == W + "lastRenderedPageBreak" or (tag == W + "br" and element.get(W + "type") == "page"):
+                        if paragraphs or runs:
+                            paragraphs.append("".join(runs))
+                            runs = []
+                            pages.append("\n".join(paragraphs))
+                            paragraphs = []
+                            if len(pages) >= max_pages:
+                                return pages, True
+                    continue
+                if tag == W + "t" and element.text:
+                    runs.append(element.text)
+                elif tag == W + "tab":
+                    runs.append("\t")
+                elif tag == W + "p":
+                    paragraphs.append("".join(runs))
+                    runs = []
+                    element.clear()
+    if paragraphs or runs:
+        pages.append("\n".join(paragraphs + ["".join(runs)]))
+    return pages, False
+
+
+def _slide_number(name: str) -> int:
+    return int(re.search(r"(\d+)\.xml$", name).group(1))
+
+
+def _pptx_pages(path: str, max_pages: int, max_part_bytes: int) -> Tuple[List[str], bool]:
+    """Text of a presentation, one string per slide"""
+    pages: List[str] = []
+    with zipfile.ZipFile(path) as archive:
+        slides = sorted(
+            (name for name in archive.namelist() if re.fullmatch(r"ppt/slides/slide\d+\.xml", name)),
+            key=_slide_number,
+        )
+        if not slides and "ppt/presentation.xml" not in archive.namelist():
+            raise ExtractionError("Not a PowerPoint presentation")
+        for name in slides[:max_pages]:
+            paragraphs: List[str] = []
+            runs: List[str] = []
+            with read_part(archive, name, max_part_bytes) as part:
+                for _, element in iterparse(part):
+                    if element.tag == A + "t" and element.text:
+                        runs.append(element.text)
+                    elif element.tag == A + "p":
+                        paragraphs.append("".join(runs))
+                        runs = []
+                        element.clear()
+            pages.append("\n".join(paragraphs))
+    return pages, len(slides) > max_pages
+
+
+def _pdf_pages(path: str, max_pages: int) -> Tuple[List[str], bool]:
+    try:
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+    except ImportError as e:
+        raise RuntimeError("PDF text extraction requires the 'pypdf' package") from e
+    try:
+        reader = PdfReader(path)
+        if reader.is_encrypted:
+            raise ExtractionError("The PDF is encrypted")
+        total = len(reader.pages)
+        pages = [reader.pages[index].extract_text() or "" for index in range(min(total, max_pages))]
+    except PdfReadError as e:
+        raise ExtractionError(f"Unreadable PDF: {e}") from e
+    return pages, total > max_pages
+
+
+def extract_text(path: str, extension: str, max_pages: int, max_chars: int, max_part_bytes: int) -> Tuple[str, int, bool]:
+    """
+    Pull the plain text out of a pdf, docx or pptx file, reading at most
+    `max_pages` pages (slides) and keeping at most `max_chars` characters.
+    Returns (text, pages read, truncated). Runs in the extraction processes.
+    """
+    try:
+        if extension == "pdf":
+            pages, truncated = _pdf_pages(path, max_pages)
+        elif extension == "docx":
+            pages, truncated = _docx_pages(path, max_pages, max_part_bytes)
+        elif extension == "pptx":
+            pages, truncated = _pptx_pages(path, max_pages, max_part_bytes)
+        else:
+            raise ExtractionError(f"Unsupported file type: {extension}")
+    except (zipfile.BadZipFile, SyntaxError) as e:  # ParseError is a SyntaxError
+        raise ExtractionError(f"Corrupt {extension} file: {e}") from e
+    text = _clean("\n\n".join(pages))
+    if len(text) > max_chars:
+        text, truncated = text[:max_chars], True
+    return text, len(pages), truncated
+
+
+# Parsing and rendering documents is CPU-bound, so it runs in worker processes
+# rather than threads; spawned (not forked) so children do not inherit the event loop
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+async def run_in_pool(function: Callable, *args):
+    """Run a module-level (picklable) function in the document processing pool"""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_pool(), function, *args)
+    except BrokenProcessPool:
+        # A child died (e.g. killed for memory): start a fresh pool for the retry
+        shutdown_extraction()
+        raise
+
+
+async def extract_document(path: str, extension: str) -> Tuple[str, int, bool]:
+    """Run `extract_text` with the configured caps in the extraction pool"""
+    return await run_in_pool(
+        extract_text, path, extension,
+        settings.EXTRACTION_MAX_PAGES, settings.EXTRACTION_MAX_CHARS, settings.EXTRACTION_MAX_PART_BYTES,
+    )
+
+
+def shutdown_extraction() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,13 +1,43 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 from passlib.context import CryptContext
+from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small bounded thread pool keeps hashing
+# off the event loop while capping how many cores logins can take
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
 
 def get_password_hash(password: str) -> str:
-    hashed = pwd_context.hash(password)
-    print(f"🔒 Хешируем пароль: {password} -> {hashed}")
-    return hashed
+    return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    result = pwd_context.verify(plain_password, hashed_password)
-    print(f"🔍 Проверка: {plain_password} -> {hashed_password} = {result}")
-    return result
+    return pwd_context.verify(plain_password, hashed_password)
+
+async def hash_password(password: str) -> str:
+    """Hash a password in the hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.hash, password)
+
+async def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password in the hashing pool.
+    Returns (is_valid, new_hash); new_hash is set when the stored hash
+    was made with a different work factor and should be replaced.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+def shutdown_hashing() -> None:
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
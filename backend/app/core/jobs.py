@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import traceback
+from collections import deque
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.database.session import SessionLocal
+from app.repositories.job import JobRepository, utcnow
+
+logger = logging.getLogger(__name__)
+
+# Registered job handlers: `async def handler(db, **payload)`
+TASKS: Dict[str, Callable[..., Awaitable[Any]]] = {}
+# Jobs enqueued by the workers themselves every `interval` seconds
+PERIODIC_TASKS: List[Tuple[str, float]] = []
+
+_wakeup: Optional[asyncio.Event] = None
+# Tries to store the outcome of a job (done / requeued / failed) before giving up
+RECORD_ATTEMPTS = 3
+
+
+def task(name: str, every: Optional[float] = None):
+    """
+    Register a job handler under `name`; with `every`, the workers also
+    enqueue it once per `every` seconds (once across all of them).
+    """
+    def register(handler):
+        TASKS[name] = handler
+        if every:
+            PERIODIC_TASKS.append((name, every))
+        return handler
+    return register
+
+
+def notify_workers() -> None:
+    """Wake the in-process worker after enqueueing, instead of waiting for its next poll"""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def enqueue(name: str, payload: Optional[Dict[str, Any]] = None, delay: float = 0, **options) -> None:
+    """
+    Queue a job in its own transaction. Writes that need a job should rather call
+    `JobRepository.enqueue` inside their own transaction and `notify_workers` after it.
+    """
+    async with SessionLocal() as db:
+        run_at = utcnow() + timedelta(seconds=delay) if delay else None
+        await JobRepository.enqueue(db, name, payload, run_at=run_at, **options)
+        await db.commit()
+    notify_workers()
+
+
+class Worker:
+    """
+    Runs queued jobs, up to `concurrency` at a time, each in its own session.
+    A failing job is retried with exponential backoff until `max_attempts`;
+    jobs of a worker that died are picked up again after `JOB_LOCK_TIMEOUT_SECONDS`.
+    """
+
+    def __init__(self, concurrency: int = settings.JOB_WORKER_CONCURRENCY,
+                 poll_interval: float = settings.JOB_POLL_INTERVAL_SECONDS):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        # (wait, duration) in seconds of the jobs run by this worker, most recent last
+        self.timings: Deque[Tuple[float, float]] = deque(maxlen=1000)
+        self._running: Set[asyncio.Task] = set()
+        self._periodic_slots: Dict[str, int] = {}
+        self._last_maintenance = 0.0
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """Schedule periodic jobs, then start as many due jobs as there are free slots"""
+        await self._maintain()
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return 0
+        async with SessionLocal() as db:
+            jobs = await JobRepository.claim(db, self.worker_id, free)
+        for job in jobs:
+            running = asyncio.create_task(self._execute(job))
+            self._running.add(running)
+            running.add_done_callback(self._finished)
+        return len(jobs)
+
+    def _finished(self, running: asyncio.Task):
+        # A slot is free again: claim the next job without waiting for the poll
+        self._running.discard(running)
+        notify_workers()
+
+    async def _maintain(self):
+        now = time.time()
+        async with SessionLocal() as db:
+            enqueued = False
+            for name, interval in PERIODIC_TASKS:
+                slot = int(now // interval)
+                if self._periodic_slots.get(name) != slot:
+                    await JobRepository.enqueue(db, name, dedupe_key=f"{name}@{slot}")
+                    self._periodic_slots[name] = slot
+                    enqueued = True
+            if enqueued:
+                await db.commit()
+            if now - self._last_maintenance >= settings.JOB_LOCK_TIMEOUT_SECONDS / 3:
+                self._last_maintenance = now
+                await JobRepository.requeue_stale(db, timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS))
+
+    async def _execute(self, job):
+        started = time.monotonic()
+        wait = max((job.started_at - job.run_at).total_seconds(), 0) if job.started_at and job.run_at else 0.0
+        handler = TASKS.get(job.name)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job '{job.name}'")
+            async with SessionLocal() as db:
+                await asyncio.wait_for(handler(db, **job.payload), timeout=settings.JOB_TIMEOUT_SECONDS)
+        except Exception:
+            error = traceback.format_exc()
+            logger.warning("Job %s (%s) attempt %s failed:\n%s", job.id, job.name, job.attempts, error)
+            if handler is None:
+                job.max_attempts = job.attempts  # Retrying cannot help
+            retried = await self._record(job, lambda db: JobRepository.retry_or_fail(db, job, error))
+            if retried:
+                self.retried += 1
+            elif retried is not None:
+                self.failed += 1
+            return
+        if await self._record(job, lambda db: JobRepository.complete(db, job.id)) is not None:
+            self.processed += 1
+            self.timings.append((wait, time.monotonic() - started))
+
+    async def _record(self, job, write: Callable[[Any], Awaitable[Any]]) -> Optional[Any]:
+        """
+        Store the outcome of a job, retrying a database error a few times.
+        Returns what `write` returned (True if None), or None if it could not be
+        stored: the job then stays `running` until `requeue_stale` picks it up.
+        """
+        for attempt in range(RECORD_ATTEMPTS):
+            try:
+                async with SessionLocal() as db:
+                    result = await write(db)
+                return True if result is None else result
+            except Exception:
+                if attempt + 1 == RECORD_ATTEMPTS:
+                    logger.exception(
+                        "Could not record the outcome of job %s (%s); it runs again after JOB_LOCK_TIMEOUT_SECONDS",
+                        job.id, job.name,
+                    )
+                    return None
+                logger.warning("Recording the outcome of job %s failed, retrying", job.id, exc_info=True)
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def run(self):
+        """Process jobs until `stop` is called"""
+        global _wakeup
+        _wakeup = asyncio.Event()
+        logger.info("Job worker %s started (%s tasks)", self.worker_id, len(TASKS))
+        while not self._stopping:
+            _wakeup.clear()
+            try:
+                started = await self.run_once()
+            except Exception:
+                logger.exception("Job worker %s failed to poll the queue", self.worker_id)
+                started = 0
+            if started and len(self._running) < self.concurrency:
+                continue  # More jobs may be due right away
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        if self._running:
+            await asyncio.wait(self._running)
+
+    def start(self):
+        """Run the worker in the background of the current event loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Finish the running jobs and exit the loop"""
+        self._stopping = True
+        notify_workers()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters and timings of the jobs run by this worker"""
+        return {
+            "worker_id": self.worker_id,
+            "running": len(self._running),
+            "processed": self.processed,
+            "failed": self.failed,
+            "retried": self.retried,
+            **timing_summary(list(self.timings)),
+        }
+
+
+def timing_summary(timings: List[Tuple[float, float]]) -> Dict[str, Optional[float]]:
+    """Average and 95th percentile of queue wait and run time"""
+    summary: Dict[str, Optional[float]] = {}
+    for index, name in ((0, "wait"), (1, "duration")):
+        values = sorted(timing[index] for timing in timings)
+        summary[f"{name}_avg_seconds"] = sum(values) / len(values) if values else None
+        summary[f"{name}_p95_seconds"] = values[min(int(len(values) * 0.95), len(values) - 1)] if values else None
+    return summary
+
+
+# Worker of the web process, used when JOB_WORKER_IN_PROCESS is enabled
+job_worker = Worker()
@@ -1,9 +1,77 @@
 from fastapi import HTTPException, status
+import hashlib
 import jwt
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from jwt import PyJWKSet
+from jwt.algorithms import get_default_algorithms
 from app.core.config import settings
 from app.schemas.token import TokenPayload
 
+
+class KeyRing:
+    """
+    Ключ подписи и набор ключей проверки по `kid`. Для RS256/EdDSA узлам,
+    которые только проверяют токены, достаточно открытых ключей (JWKS);
+    старые ключи остаются в наборе, пока не истекут подписанные ими токены.
+    """
+
+    def __init__(self, algorithm: str, signing_key=None, kid: Optional[str] = None,
+                 verification_keys: Optional[Dict[Optional[str], Tuple[object, str]]] = None):
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.kid = kid
+        self.verification_keys = verification_keys or {}
+
+    def encode(self, claims: dict) -> str:
+        if self.signing_key is None:
+            raise RuntimeError("No JWT signing key configured (JWT_PRIVATE_KEY_FILE)")
+        headers = {"kid": self.kid} if self.kid else None
+        token = jwt.encode(claims, self.signing_key, algorithm=self.algorithm, headers=headers)
+        return token if isinstance(token, str) else token.decode()
+
+    def decode(self, token: str) -> dict:
+        kid = jwt.get_unverified_header(token).get("kid")
+        # Токены без kid подписаны активным ключом
+        entry = self.verification_keys.get(self.kid if kid is None else kid)
+        if entry is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key '{kid}'")
+        key, algorithm = entry
+        return jwt.decode(token, key, algorithms=[algorithm])
+
+
+def load_keyring() -> KeyRing:
+    """Собирает ключи из настроек; файлы читаются один раз при запуске"""
+    algorithm = settings.JWT_ALGORITHM
+    if algorithm.startswith("HS"):
+        secret = settings.JWT_SECRET_KEY
+        return KeyRing(algorithm, secret, settings.JWT_KEY_ID, {settings.JWT_KEY_ID: (secret, algorithm)})
+
+    verification_keys: Dict[Optional[str], Tuple[object, str]] = {}
+    if settings.JWT_JWKS_FILE:
+        for jwk in PyJWKSet.from_json(Path(settings.JWT_JWKS_FILE).read_text()).keys:
+            verification_keys[jwk.key_id] = (jwk.key, jwk.algorithm_name or algorithm)
+
+    signing_key = None
+    if settings.JWT_PRIVATE_KEY_FILE:
+        signing_key = get_default_algorithms()[algorithm].prepare_key(Path(settings.JWT_PRIVATE_KEY_FILE).read_bytes())
+        verification_keys.setdefault(settings.JWT_KEY_ID, (signing_key.public_key(), algorithm))
+    if not verification_keys:
+        raise RuntimeError(f"{algorithm} needs JWT_PRIVATE_KEY_FILE and/or JWT_JWKS_FILE")
+    return KeyRing(algorithm, signing_key, settings.JWT_KEY_ID, verification_keys)
+
+
+keyring = load_keyring()
+
+# Уже проверенные access-токены: повторная проверка подписи и сборка
+# TokenPayload не нужны, пока токен не истёк. Ключ — весь токен: одной
+# подписи мало, иначе подошёл бы токен с подменённым payload.
+_verified: "OrderedDict[str, TokenPayload]" = OrderedDict()
+
 def create_access_token(subject: str) -> str:
     """Создаёт access-токен"""
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -13,8 +81,7 @@ def create_access_token(subject: str) -> str:
         "exp": expire
     }
     
-    token = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return token if isinstance(token, str) else token.decode()
+    return keyring.encode(to_encode)
 
 def create_refresh_token(subject: str) -> str:
     """Создаёт refresh-токен"""
@@ -22,23 +89,37 @@ def create_refresh_token(subject: str) -> str:
     to_encode = {
         "token_type": "refresh",
         "sub": subject,
-        "exp": expire
+        "exp": expire,
+        "jti": uuid.uuid4().hex  # Уникальность токена при нескольких входах в одну секунду
     }
 
-    token = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return token if isinstance(token, str) else token.decode()
+    return keyring.encode(to_encode)
+
+def refresh_token_hash(token: str) -> str:
+    """SHA-256 refresh-токена: в базе хранится только он, сам токен — нет"""
+    return hashlib.sha256(token.encode()).hexdigest()
 
 def decode_access_token(token: str) -> TokenPayload:
-    """Декодирует access-токен и проверяет его тип"""
+    """Декодирует access-токен и проверяет его тип; проверенные токены берутся из кэша"""
+    cached = _verified.get(token)
+    if cached is not None:
+        if cached.exp > time.time():
+            _verified.move_to_end(token)
+            return cached
+        _verified.pop(token, None)  # Истёк: полная проверка ниже вернёт ошибку
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = keyring.decode(token)
         if payload.get("token_type") != "access":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token type for access token",
             )
-        
-        return TokenPayload(**payload)
+
+        token_payload = TokenPayload(**payload)
+        _verified[token] = token_payload
+        if len(_verified) > settings.JWT_VERIFIED_CACHE_SIZE:
+            _verified.popitem(last=False)
+        return token_payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,8 +134,8 @@ def decode_access_token(token: str) -> TokenPayload:
 def verify_refresh_token(token: str) -> str:
     """Проверяет refresh-токен, возвращает user_id и проверяет тип токена"""
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        
+        payload = keyring.decode(token)
+
         if payload.get("token_type") != "refresh":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
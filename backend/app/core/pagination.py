@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(*values: Any, tag: Optional[str] = None) -> str:
+    """
+    Pack the sort-key values of the last row into an opaque cursor; `tag` names
+    the ordering, for listings that have several of them with the same keys.
+    """
+    packed = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    if tag is not None:
+        packed.insert(0, tag)
+    raw = json.dumps(packed, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int, tag: Optional[str] = None) -> List[Any]:
+    """
+    Unpack a cursor produced by `encode_cursor`, expecting `size` key values
+    and the same `tag` (a cursor of another ordering is rejected).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        packed = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if tag is not None:
+            if not isinstance(packed, list) or not packed or packed.pop(0) != tag:
+                raise ValueError("Cursor of another ordering")
+        if not isinstance(packed, list) or len(packed) != size:
+            raise ValueError("Unexpected cursor shape")
+        return [
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in packed
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any]):
+    """
+    Build a "row comes after the cursor" condition for a descending ordering
+    on `columns`, i.e. (c1, c2, ...) < (v1, v2, ...) spelled out so that it
+    works on every backend and can use a matching composite index.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column < values[i]))
+    return or_(*clauses)
+
+
+def paginate(query, columns: Sequence[Any], cursor: Optional[str], skip: int, limit: int, tag: Optional[str] = None):
+    """
+    Order `query` by `columns` descending and apply keyset pagination when a
+    cursor is given, falling back to the legacy `skip` offset otherwise.
+    One extra row is fetched so the caller can tell whether a next page exists.
+    """
+    query = query.order_by(*[column.desc() for column in columns])
+    if cursor:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, len(columns), tag)))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def build_page(rows: Sequence[Any], limit: int, key: Callable[[Any], Tuple],
+               tag: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and compute the cursor of the next page"""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(*key(items[-1]), tag=tag)
+    return items, next_cursor
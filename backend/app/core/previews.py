@@ -0,0 +1,116 @@
+import io
+import logging
+import posixpath
+import zipfile
+from importlib.util import find_spec
+from typing import Optional, Tuple
+from xml.etree.ElementTree import iterparse
+from app.core.config import settings
+from app.core.extraction import read_part, run_in_pool
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_RELATIONSHIP = "http://schemas.openxmlformats.org/package/2006/relationships/metadata/thumbnail"
+RELATIONSHIP = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+# Office thumbnails are small; anything bigger is not one
+MAX_THUMBNAIL_BYTES = 2 * 1024 * 1024
+
+
+def previews_supported(extension: str) -> bool:
+    """
+    Whether previews of this file type can be rendered here. PDF pages need the
+    optional `pypdfium2` and `Pillow` packages; Office files carry a thumbnail
+    of their first page, which `Pillow` (if installed) only resizes.
+    """
+    if extension == "pdf":
+        return find_spec("pypdfium2") is not None and find_spec("PIL") is not None
+    return extension in ("docx", "pptx")
+
+
+def check_preview_support() -> None:
+    """Warn at startup when PDF previews cannot be rendered, rather than skipping them silently"""
+    if not previews_supported("pdf"):
+        logger.warning("pypdfium2 or Pillow is not installed: PDF uploads will have no preview")
+
+
+def _image_format(data: bytes) -> Optional[str]:
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    return None
+
+
+def _office_thumbnail(path: str) -> Optional[bytes]:
+    """The first-page thumbnail Office saves into docx/pptx packages, if any"""
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        target = None
+        if "_rels/.rels" in names:
+            with read_part(archive, "_rels/.rels", MAX_THUMBNAIL_BYTES) as part:
+                for _, element in iterparse(part):
+                    if element.tag == RELATIONSHIP and element.get("Type") == THUMBNAIL_RELATIONSHIP:
+                        target = posixpath.normpath(element.get("Target", "").lstrip("/"))
+        if target not in names:
+            target = next((name for name in sorted(names) if name.startswith("docProps/thumbnail.")), None)
+        if target is None:
+            return None
+        with read_part(archive, target, MAX_THUMBNAIL_BYTES) as part:
+            return part.read()
+
+
+def _pdf_first_page(path: str, max_size: int):
+    import pypdfium2
+
+    try:
+        document = pypdfium2.PdfDocument(path)
+    except pypdfium2.PdfiumError:
+        return None  # Unreadable or encrypted
+    try:
+        if len(document) == 0:
+            return None
+        page = document[0]
+        # Page sizes are in points (1/72 inch); scale renders at that many pixels per point
+        scale = max_size / max(page.get_size())
+        return page.render(scale=scale).to_pil()
+    finally:
+        document.close()
+
+
+def render_preview(path: str, extension: str, max_size: int, image_format: str) -> Optional[Tuple[bytes, str]]:
+    """
+    Render a thumbnail of the first page of a pdf, docx or pptx file, at most
+    `max_size` pixels wide and high. Returns (image, format), or None when the
+    document has no page to show. Runs in the document processing pool.
+    """
+    try:
+        if extension == "pdf":
+            image = _pdf_first_page(path, max_size)
+            if image is None:
+                return None
+        else:
+            thumbnail = _office_thumbnail(path)
+            if thumbnail is None:
+                return None
+            if find_spec("PIL") is None:
+                # Stored as saved by Office (typically 256px), if browsers can show it
+                kind = _image_format(thumbnail)
+                return (thumbnail, kind) if kind else None
+            from PIL import Image
+            image = Image.open(io.BytesIO(thumbnail))
+            image.load()
+    except (zipfile.BadZipFile, SyntaxError, OSError):
+        # Corrupt file or an image format Pillow cannot read (e.g. EMF outside Windows)
+        return None
+
+    image.thumbnail((max_size, max_size))
+    if image_format == "jpeg" or image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format=image_format.upper())
+    return output.getvalue(), image_format
+
+
+async def render_document_preview(path: str, extension: str) -> Optional[Tuple[bytes, str]]:
+    """Run `render_preview` with the configured size and format in the document pool"""
+    return await run_in_pool(render_preview, path, extension, settings.PREVIEW_MAX_SIZE, settings.PREVIEW_FORMAT)
@@ -0,0 +1,37 @@
+import math
+from datetime import datetime, timezone
+from app.core.config import settings
+
+# Reference point of the hot score; any fixed instant works
+HOT_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+WILSON_Z = 1.959964  # 95% confidence
+
+
+def wilson_score(upvotes: int, downvotes: int, z: float = WILSON_Z) -> float:
+    """
+    Lower bound of the Wilson score interval for the share of upvotes:
+    a post with 950/1000 upvotes ranks above one with 1/1.
+    """
+    n = upvotes + downvotes
+    if n == 0:
+        return 0.0
+    p = upvotes / n
+    return (
+        p + z * z / (2 * n) - z * math.sqrt((p * (1 - p) + z * z / (4 * n)) / n)
+    ) / (1 + z * z / n)
+
+
+def hot_score(upvotes: int, downvotes: int, created_at: datetime) -> float:
+    """
+    Time-decayed popularity: the order of magnitude of the net votes plus a term
+    growing with the creation time, so every `RANKING_HOT_DECAY_SECONDS` of age
+    costs a post as much as a tenfold vote difference. Scores of existing posts
+    never need to decay: newer posts simply start higher.
+    """
+    net = upvotes - downvotes
+    order = math.log10(max(abs(net), 1))
+    sign = (net > 0) - (net < 0)
+    if created_at.tzinfo is None:  # SQLite returns naive UTC datetimes
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age = (created_at - HOT_EPOCH).total_seconds()
+    return round(sign * order + age / settings.RANKING_HOT_DECAY_SECONDS, 7)
@@ -0,0 +1,166 @@
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Union
+from fastapi import Depends, HTTPException, Request
+from app.core.cache import redis_client
+from app.core.config import settings
+from app.core.deps import get_current_user
+
+logger = logging.getLogger(__name__)
+
+
+def sliding_window_retry_after(previous: int, current: int, elapsed: float, limit: int, window: float) -> Optional[float]:
+    """
+    Sliding-window counter: the hits of the previous fixed window count with the
+    share of it still inside the sliding window. Returns None if one more hit fits,
+    otherwise the seconds until it does.
+    """
+    if previous * (1 - elapsed / window) + current + 1 <= limit:
+        return None
+    if current + 1 <= limit:
+        # Fits later in this window, once enough of the previous one has slid out
+        return max(window * (1 - (limit - current - 1) / previous) - elapsed, 0.0)
+    # Only in the next window, where the current hits become the previous ones
+    return window - elapsed + max(window * (1 - (limit - 1) / current), 0.0)
+
+
+class RateLimiterBackend(ABC):
+    """Counts hits per key in sliding windows."""
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        """
+        Record a hit on `key` unless it already had `limit` hits in the last
+        `window` seconds; returns None if recorded, otherwise the seconds to wait.
+        Rejected hits are not counted.
+        """
+
+
+class MemoryRateLimiter(RateLimiterBackend):
+    """Per-process counters with LRU eviction beyond `max_entries` keys."""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        # key -> (fixed window number, hits in it, hits in the window before)
+        self._counters: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        now = time.time()
+        number = int(now // window)
+        counter = self._counters.get(key)
+        if counter is None or counter[0] < number - 1:
+            current, previous = 0, 0
+        elif counter[0] == number - 1:
+            current, previous = 0, counter[1]
+        else:
+            current, previous = counter[1], counter[2]
+        retry_after = sliding_window_retry_after(previous, current, now - number * window, limit, window)
+        if retry_after is None:
+            current += 1
+        self._counters[key] = (number, current, previous)
+        self._counters.move_to_end(key)
+        while len(self._counters) > self.max_entries:
+            self._counters.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimiter(RateLimiterBackend):
+    """
+    Counters shared by all processes on a Redis-protocol server: one key per
+    fixed window, expiring once it no longer overlaps the sliding window.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "unilibrary:rl:", client=None):
+        self.prefix = prefix
+        self.client = client or redis_client(url)
+
+    async def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        now = time.time()
+        number = int(now // window)
+        current_key = f"{self.prefix}{key}:{number}"
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(current_key)
+            pipe.pexpire(current_key, int(window * 2000))
+            pipe.get(f"{self.prefix}{key}:{number - 1}")
+            current, _, previous = await pipe.execute()
+        retry_after = sliding_window_retry_after(int(previous or 0), current - 1, now - number * window, limit, window)
+        if retry_after is not None:
+            await self.client.decr(current_key)
+        return retry_after
+
+
+def create_rate_limiter(backend: str, redis_url: Optional[str] = None, max_entries: int = 100000) -> Optional[RateLimiterBackend]:
+    """Build a rate limiter backend by name: 'memory', 'redis' or 'none' (no limits)"""
+    if backend == "memory":
+        return MemoryRateLimiter(max_entries=max_entries)
+    if backend == "redis":
+        if not redis_url:
+            raise RuntimeError("REDIS_URL must be set to use the redis rate limiter backend")
+        return RedisRateLimiter(redis_url)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown rate limiter backend: {backend}")
+
+
+rate_limiter = create_rate_limiter(
+    settings.RATE_LIMIT_BACKEND,
+    redis_url=settings.REDIS_URL,
+    max_entries=settings.RATE_LIMIT_MAX_ENTRIES,
+)
+
+
+# Key functions: dependencies returning what a limit counts by, or None to skip it
+
+def client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+def device_id(request: Request) -> Optional[str]:
+    return request.headers.get("Device-Id") or None
+
+
+async def login_username(request: Request) -> Optional[str]:
+    # The form is parsed once per request; this reuses it
+    username = (await request.form()).get("username")
+    return username.strip().lower() if isinstance(username, str) and username.strip() else None
+
+
+def current_user_id(current_user=Depends(get_current_user)) -> str:
+    return str(current_user.id)
+
+
+def rate_limit(scope: str, limit: int, window: float,
+               key: Callable[..., Union[Optional[str], Awaitable[Optional[str]]]] = client_ip):
+    """
+    Dependency allowing `limit` requests per `window` seconds for each value of
+    `key` (client IP by default) and answering 429 with Retry-After beyond that.
+    It runs before the endpoint, so rejected requests cost no database work.
+    """
+    async def check(subject: Optional[str] = Depends(key)):
+        if rate_limiter is None or subject is None or limit <= 0:
+            return
+        try:
+            retry_after = await rate_limiter.hit(f"{scope}:{subject}", limit, window)
+        except Exception:
+            logger.exception("Rate limiter unavailable, letting the request through")
+            return
+        if retry_after is not None:
+            seconds = max(math.ceil(retry_after), 1)
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many requests, retry in {seconds} seconds",
+                headers={"Retry-After": str(seconds)},
+            )
+    return check
+
+
+login_rate_limits = [
+    Depends(rate_limit("login-ip", settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS)),
+    Depends(rate_limit("login-user", settings.LOGIN_RATE_LIMIT_PER_USERNAME, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS, key=login_username)),
+    Depends(rate_limit("login-device", settings.LOGIN_RATE_LIMIT_PER_DEVICE, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS, key=device_id)),
+]
+upload_rate_limit = rate_limit("upload", settings.UPLOAD_RATE_LIMIT_PER_USER, settings.UPLOAD_RATE_LIMIT_WINDOW_SECONDS, key=current_user_id)
+vote_rate_limit = rate_limit("vote", settings.VOTE_RATE_LIMIT_PER_USER, settings.VOTE_RATE_LIMIT_WINDOW_SECONDS, key=current_user_id)
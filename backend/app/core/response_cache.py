@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import json
+import re
+import uuid
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache import create_cache, invalidate_on_commit
+from app.core.config import settings
+from app.database.models import Category, Post
+
+# Shared cache of rendered responses for anonymous GET requests
+response_cache = create_cache(
+    settings.RESPONSE_CACHE_BACKEND,
+    redis_url=settings.REDIS_URL,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+)
+
+# Namespace versions outlive the entries keyed on them
+VERSION_TTL_SECONDS = 24 * 3600
+
+
+def _version_key(namespace: str) -> str:
+    return f"resp-ver:{namespace}"
+
+
+async def invalidate(*namespaces: str) -> None:
+    """
+    Invalidate every cached response depending on the given namespaces by
+    moving them to a new version; the old entries are never read again and
+    expire on their own.
+    """
+    for namespace in namespaces:
+        await response_cache.set(_version_key(namespace), uuid.uuid4().hex.encode(), VERSION_TTL_SECONDS)
+
+
+async def invalidate_post(post_id: int) -> None:
+    """A post was created, changed or deleted"""
+    await invalidate("posts", f"post:{post_id}")
+
+
+@event.listens_for(Post, "after_insert")
+@event.listens_for(Post, "after_update")
+@event.listens_for(Post, "after_delete")
+def _invalidate_post_on_change(mapper, connection, target):
+    """
+    Catch ORM changes made outside PostService (e.g. in the admin).
+    """
+    invalidate_on_commit(object_session(target), invalidate_post, target.id)
+
+
+@event.listens_for(Category, "after_insert")
+@event.listens_for(Category, "after_update")
+@event.listens_for(Category, "after_delete")
+def _invalidate_categories_on_change(mapper, connection, target):
+    # Post responses embed the category name
+    invalidate_on_commit(object_session(target), invalidate, "categories", "category-names", "posts")
+
+
+async def _versions(namespaces: List[str]) -> str:
+    versions = []
+    for namespace in namespaces:
+        version = await response_cache.get(_version_key(namespace))
+        if version is None:
+            version = uuid.uuid4().hex.encode()
+            await response_cache.set(_version_key(namespace), version, VERSION_TTL_SECONDS)
+        versions.append(version.decode())
+    return ".".join(versions)
+
+
+def _pack(status: int, content_type: str, etag: str, body: bytes) -> bytes:
+    meta = json.dumps({"status": status, "content_type": content_type, "etag": etag}).encode()
+    return meta + b"\n" + body
+
+
+def _unpack(raw: bytes) -> Tuple[dict, bytes]:
+    meta, _, body = raw.partition(b"\n")
+    return json.loads(meta), body
+
+
+def _etag_matches(request_headers: Headers, etag: str) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve repeated anonymous GET requests for the configured routes from the
+    response cache. Each route maps to the invalidation namespaces its output
+    depends on; entries expire after `ttl` seconds at the latest.
+
+    - Requests carrying an Authorization header always go to the endpoint.
+    - Responses get a strong ETag, and a matching If-None-Match yields 304.
+    - Concurrent misses for the same key are coalesced within the process:
+      only the first request runs the endpoint, the others wait for its result.
+    """
+
+    def __init__(self, app: ASGIApp, routes: List[Tuple[str, Callable[[re.Match], List[str]]]],
+                 ttl: float, max_body_bytes: int):
+        self.app = app
+        self.routes: List[Tuple[Pattern, Callable[[re.Match], List[str]]]] = [
+            (re.compile(pattern), namespaces) for pattern, namespaces in routes
+        ]
+        self.ttl = ttl
+        self.max_body_bytes = max_body_bytes
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _namespaces(self, path: str) -> Optional[List[str]]:
+        for pattern, namespaces in self.routes:
+            match = pattern.fullmatch(path)
+            if match:
+                return namespaces(match)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        request_headers = Headers(scope=scope)
+        namespaces = self._namespaces(scope["path"])
+        if namespaces is None or "authorization" in request_headers:
+            return await self.app(scope, receive, send)
+
+        query = scope.get("query_string", b"").decode("latin-1")
+        key = f"resp:{await _versions(namespaces)}:{scope['path']}?{query}"
+
+        raw = await response_cache.get(key)
+        if raw is not None:
+            return await self._send_cached(raw, request_headers, send, "HIT")
+
+        leader = self._inflight.get(key)
+        if leader is not None:
+            raw = await asyncio.shield(leader)
+            if raw is not None:
+                return await self._send_cached(raw, request_headers, send, "HIT")
+            return await self.app(scope, receive, send)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        raw = None
+        try:
+            raw = await self._fill(scope, receive, send, request_headers, key)
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(raw)
+
+    async def _fill(self, scope: Scope, receive: Receive, send: Send, request_headers: Headers, key: str) -> Optional[bytes]:
+        """Run the endpoint, capturing its response; store and return it if cacheable"""
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        size = 0
+        cacheable = True
+
+        async def capture(message: Message):
+            nonlocal start, size, cacheable
+            if message["type"] == "http.response.start":
+                start = message
+                cacheable = message["status"] == 200
+                if not cacheable:
+                    await send(message)
+                return
+            if cacheable and message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if size + len(body) <= self.max_body_bytes:
+                    chunks.append(body)
+                    size += len(body)
+                    return
+                # Too large to cache: flush what was held back and stream the rest
+                cacheable = False
+                await send(start)
+                for chunk in chunks:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunks.clear()
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        if not cacheable or start is None:
+            return None
+
+        body = b"".join(chunks)
+        content_type = Headers(raw=start["headers"]).get("content-type", "application/json")
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        raw = _pack(200, content_type, etag, body)
+        await response_cache.set(key, raw, self.ttl)
+        await self._send_cached(raw, request_headers, send, "MISS")
+        return raw
+
+    async def _send_cached(self, raw: bytes, request_headers: Headers, send: Send, state: str):
+        meta, body = _unpack(raw)
+        headers = [
+            (b"etag", meta["etag"].encode()),
+            (b"cache-control", b"no-cache"),
+            (b"vary", b"Authorization"),
+            (b"x-cache", state.encode()),
+        ]
+        if _etag_matches(request_headers, meta["etag"]):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers += [
+            (b"content-type", meta["content_type"].encode()),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": meta["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
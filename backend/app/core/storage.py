@@ -0,0 +1,367 @@
+import mimetypes
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterator, BinaryIO, List, Optional
+import anyio
+from app.core.config import settings
+
+
+@dataclass
+class StoredObject:
+    """Metadata of an object in a storage backend"""
+    key: str
+    size: int
+    modified: float  # POSIX timestamp
+
+
+class StorageWriter(ABC):
+    """Incremental writer for one object; nothing is visible under `key` before `complete()`."""
+
+    @abstractmethod
+    async def write(self, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def complete(self) -> None:
+        ...
+
+    @abstractmethod
+    async def abort(self) -> None:
+        ...
+
+
+class StorageBackend(ABC):
+    """
+    Object storage for uploaded files. Keys are relative, '/'-separated paths
+    (e.g. `ab/cd/<sha256>.pdf`); how they map to disk or buckets is up to the backend.
+    """
+
+    @abstractmethod
+    def writer(self, key: str, content_type: Optional[str] = None) -> StorageWriter:
+        ...
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def read(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Blocking stream of an object's content, to read large objects in chunks from a worker thread"""
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        ...
+
+    async def exists(self, key: str) -> bool:
+        return await self.stat(key) is not None
+
+    @abstractmethod
+    async def move(self, source: str, target: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove an object; missing keys are ignored"""
+
+    @abstractmethod
+    async def list(self, prefix: str = "") -> List[StoredObject]:
+        ...
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Path on this node's disk, for backends that have one"""
+        return None
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Path]:
+        """
+        A file on local disk with the object's content, for tools that need a path:
+        the object itself where the backend has one, a temporary download otherwise.
+        """
+        path = self.local_path(key)
+        if path is not None:
+            yield path
+            return
+        fd, name = tempfile.mkstemp(suffix=PurePosixPath(key).suffix)
+        os.close(fd)
+        try:
+            await anyio.Path(name).write_bytes(await self.read(key))
+            yield Path(name)
+        finally:
+            os.unlink(name)
+
+    async def presigned_url(self, key: str, filename: Optional[str] = None, expires_in: Optional[int] = None) -> Optional[str]:
+        """Time-limited direct download URL, for backends that support it"""
+        return None
+
+
+def guess_content_type(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+class _LocalWriter(StorageWriter):
+    def __init__(self, path: Path):
+        self.path = path
+        self.handle = None
+
+    async def write(self, data: bytes) -> None:
+        if self.handle is None:
+            await anyio.Path(self.path.parent).mkdir(parents=True, exist_ok=True)
+            self.handle = await anyio.open_file(self.path, "wb")
+        await self.handle.write(data)
+
+    async def complete(self) -> None:
+        if self.handle is None:
+            await self.write(b"")
+        await self.handle.flush()
+        await anyio.to_thread.run_sync(os.fsync, self.handle.wrapped.fileno())
+        await self.handle.aclose()
+
+    async def abort(self) -> None:
+        if self.handle is not None:
+            await self.handle.aclose()
+        await anyio.Path(self.path).unlink(missing_ok=True)
+
+
+class LocalStorage(StorageBackend):
+    """Files in a directory on local disk (single node, or a shared volume)."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def local_path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Storage key outside of the storage root: {key}")
+        return path
+
+    def writer(self, key: str, content_type: Optional[str] = None) -> StorageWriter:
+        return _LocalWriter(self.local_path(key))
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        writer = self.writer(key)
+        try:
+            await writer.write(data)
+            await writer.complete()
+        except BaseException:
+            await writer.abort()
+            raise
+
+    async def read(self, key: str) -> bytes:
+        return await anyio.Path(self.local_path(key)).read_bytes()
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.local_path(key), "rb")
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            stat_result = await anyio.Path(self.local_path(key)).stat()
+        except FileNotFoundError:
+            return None
+        return StoredObject(key=key, size=stat_result.st_size, modified=stat_result.st_mtime)
+
+    async def move(self, source: str, target: str) -> None:
+        target_path = anyio.Path(self.local_path(target))
+        await target_path.parent.mkdir(parents=True, exist_ok=True)
+        await anyio.Path(self.local_path(source)).rename(target_path)
+
+    async def delete(self, key: str) -> None:
+        await anyio.Path(self.local_path(key)).unlink(missing_ok=True)
+
+    async def list(self, prefix: str = "") -> List[StoredObject]:
+        def scan():
+            objects = []
+            for path in self.root.rglob("*"):
+                key = path.relative_to(self.root).as_posix()
+                if key.startswith(prefix) and path.is_file():
+                    stat_result = path.stat()
+                    objects.append(StoredObject(key=key, size=stat_result.st_size, modified=stat_result.st_mtime))
+            return objects
+        return await anyio.to_thread.run_sync(scan)
+
+
+class _S3Writer(StorageWriter):
+    """
+    Streams an object to S3: parts are sent as they fill up (multipart upload),
+    and objects smaller than one part go out as a single PutObject.
+    """
+
+    def __init__(self, storage: "S3Storage", key: str, content_type: Optional[str]):
+        self.storage = storage
+        self.key = key
+        self.content_type = content_type or guess_content_type(key)
+        self.buffer = bytearray()
+        self.upload_id: Optional[str] = None
+        self.parts: List[dict] = []
+
+    async def write(self, data: bytes) -> None:
+        self.buffer += data
+        if len(self.buffer) >= self.storage.part_size:
+            await self._send_part()
+
+    async def _send_part(self):
+        client, bucket, key = self.storage.client, self.storage.bucket, self.storage.object_key(self.key)
+        if self.upload_id is None:
+            response = await anyio.to_thread.run_sync(lambda: client.create_multipart_upload(
+                Bucket=bucket, Key=key, ContentType=self.content_type
+            ))
+            self.upload_id = response["UploadId"]
+        body, number = bytes(self.buffer), len(self.parts) + 1
+        self.buffer.clear()
+        response = await anyio.to_thread.run_sync(lambda: client.upload_part(
+            Bucket=bucket, Key=key, UploadId=self.upload_id, PartNumber=number, Body=body
+        ))
+        self.parts.append({"ETag": response["ETag"], "PartNumber": number})
+
+    async def complete(self) -> None:
+        if self.upload_id is None:
+            await self.storage.put(self.key, bytes(self.buffer), self.content_type)
+            return
+        if self.buffer:
+            await self._send_part()
+        client, bucket, key = self.storage.client, self.storage.bucket, self.storage.object_key(self.key)
+        await anyio.to_thread.run_sync(lambda: client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=self.upload_id, MultipartUpload={"Parts": self.parts}
+        ))
+
+    async def abort(self) -> None:
+        self.buffer.clear()
+        if self.upload_id is not None:
+            client, bucket, key = self.storage.client, self.storage.bucket, self.storage.object_key(self.key)
+            await anyio.to_thread.run_sync(lambda: client.abort_multipart_upload(
+                Bucket=bucket, Key=key, UploadId=self.upload_id
+            ))
+
+
+class S3Storage(StorageBackend):
+    """
+    Objects in an S3-compatible bucket (AWS S3, MinIO, Ceph, moto...).
+    Requires the optional `boto3` package unless a `client` is passed in.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", client=None, part_size: int = 8 * 1024 * 1024,
+                 presign_expires_in: int = 3600, **client_options):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client or s3_client(**client_options)
+        self.part_size = max(part_size, 5 * 1024 * 1024)  # S3 minimum for all but the last part
+        self.presign_expires_in = presign_expires_in
+
+    def object_key(self, key: str) -> str:
+        return self.prefix + key
+
+    def writer(self, key: str, content_type: Optional[str] = None) -> StorageWriter:
+        return _S3Writer(self, key, content_type)
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        await anyio.to_thread.run_sync(lambda: self.client.put_object(
+            Bucket=self.bucket, Key=self.object_key(key), Body=data,
+            ContentType=content_type or guess_content_type(key),
+        ))
+
+    async def read(self, key: str) -> bytes:
+        def get():
+            return self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))["Body"].read()
+        try:
+            return await anyio.to_thread.run_sync(get)
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))["Body"]
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        from botocore.exceptions import ClientError
+        try:
+            response = await anyio.to_thread.run_sync(lambda: self.client.head_object(
+                Bucket=self.bucket, Key=self.object_key(key)
+            ))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredObject(key=key, size=response["ContentLength"], modified=response["LastModified"].timestamp())
+
+    async def move(self, source: str, target: str) -> None:
+        await anyio.to_thread.run_sync(lambda: self.client.copy_object(
+            Bucket=self.bucket, Key=self.object_key(target),
+            CopySource={"Bucket": self.bucket, "Key": self.object_key(source)},
+        ))
+        await self.delete(source)
+
+    async def delete(self, key: str) -> None:
+        await anyio.to_thread.run_sync(lambda: self.client.delete_object(
+            Bucket=self.bucket, Key=self.object_key(key)
+        ))
+
+    async def list(self, prefix: str = "") -> List[StoredObject]:
+        def scan():
+            objects = []
+            paginator = self.client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.object_key(prefix)):
+                for item in page.get("Contents", []):
+                    objects.append(StoredObject(
+                        key=item["Key"][len(self.prefix):],
+                        size=item["Size"],
+                        modified=item["LastModified"].timestamp(),
+                    ))
+            return objects
+        return await anyio.to_thread.run_sync(scan)
+
+    async def presigned_url(self, key: str, filename: Optional[str] = None, expires_in: Optional[int] = None) -> str:
+        params = {"Bucket": self.bucket, "Key": self.object_key(key)}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        return self.client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires_in or self.presign_expires_in
+        )
+
+
+def s3_client(endpoint_url: Optional[str] = None, region: Optional[str] = None,
+              access_key_id: Optional[str] = None, secret_access_key: Optional[str] = None):
+    """Create a boto3 S3 client"""
+    try:
+        import boto3
+    except ImportError as e:
+        raise RuntimeError("The S3 storage backend requires the 'boto3' package") from e
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        region_name=region,
+        aws_access_key_id=access_key_id,
+        aws_secret_access_key=secret_access_key,
+    )
+
+
+def create_storage(backend: str) -> StorageBackend:
+    """Build the storage backend by name: 'local' or 's3'"""
+    if backend == "local":
+        return LocalStorage(Path(settings.STORAGE_LOCAL_ROOT))
+    if backend == "s3":
+        if not settings.S3_BUCKET:
+            raise RuntimeError("S3_BUCKET must be set to use the s3 storage backend")
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            part_size=settings.S3_MULTIPART_PART_SIZE,
+            presign_expires_in=settings.S3_PRESIGNED_URL_EXPIRE_SECONDS,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+storage = create_storage(settings.STORAGE_BACKEND)
@@ -1,38 +1,208 @@
+import hashlib
 import uuid
-import shutil
-from pathlib import Path
-from fastapi import UploadFile, File, HTTPException
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, Request, status
 
-# Directory for file uploads
-UPLOAD_DIR = Path("static/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)  # Create if it doesn't exist
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
 
+from app.core.blob_store import TEMP_PREFIX, blob_url, store_blob
+from app.core.storage import guess_content_type, storage
 
 ALLOWED_EXTENSIONS = {"pdf", "docx", "pptx"}  # Allowed file formats
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_FIELD_SIZE = 64 * 1024  # Limit for plain form fields
+MAX_FIELDS = 16  # Parts (fields and file) per form; the upload form has four
+MULTIPART_OVERHEAD = 64 * 1024  # Room for boundaries, headers and form fields
+WRITE_BUFFER_SIZE = 256 * 1024  # Bytes collected before each disk write
 
-def upload_file(file: UploadFile = File(...)) -> str:
-    """Uploads a file and returns its URL"""
 
-    # Validate file extension
-    file_extension = file.filename.split(".")[-1].lower()
+@dataclass
+class StoredUpload:
+    """A file streamed into the blob store"""
+    key: str
+    url: str
+    filename: str
+    extension: str
+    size: int
+    sha256: str
+
+
+@dataclass
+class UploadForm:
+    """Form fields of a multipart request plus its (single) stored file"""
+    fields: Dict[str, str] = field(default_factory=dict)
+    file: Optional[StoredUpload] = None
+
+
+def validate_extension(filename: str) -> str:
+    """Return the lower-cased extension of `filename` or reject the upload"""
+    file_extension = filename.split(".")[-1].lower() if "." in filename else ""
     if file_extension not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Invalid file format (allowed: pdf, docx, pptx)")
+    return file_extension
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="File size exceeds 10MB limit"
+    )
+
+
+class _FileSink:
+    """Streams one file part to a temporary storage object while hashing and size-checking it"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.extension = validate_extension(filename)
+        self.temp_key = f"{TEMP_PREFIX}{uuid.uuid4()}.part"
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.buffer = bytearray()
+        self.writer = storage.writer(self.temp_key, guess_content_type(filename))
+
+    async def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > MAX_FILE_SIZE:
+            raise _too_large()
+        self.digest.update(data)
+        self.buffer += data
+        if len(self.buffer) >= WRITE_BUFFER_SIZE:
+            await self.flush()
+
+    async def flush(self):
+        if self.buffer:
+            await self.writer.write(bytes(self.buffer))
+            self.buffer.clear()
+
+    async def commit(self) -> StoredUpload:
+        """Complete the temp object and move it to its content address"""
+        await self.flush()
+        await self.writer.complete()
+        sha256 = self.digest.hexdigest()
+        key = await store_blob(self.temp_key, sha256, self.extension)
+        return StoredUpload(
+            key=key,
+            url=blob_url(sha256, self.extension),
+            filename=self.filename,
+            extension=self.extension,
+            size=self.size,
+            sha256=sha256,
+        )
+
+    async def abort(self):
+        await self.writer.abort()
+
+
+async def receive_upload(request: Request) -> UploadForm:
+    """
+    Parse a multipart/form-data request straight from the body stream.
+
+    The single file part is written chunk by chunk to a temporary object in
+    the storage backend, hashed on the fly and moved into place once complete,
+    so it is never buffered whole in memory. Identical content is stored only
+    once (see `app.core.blob_store`). Oversized uploads are rejected as soon
+    as the limit is crossed (or up front from Content-Length), and the
+    partial object is removed.
+    """
+    content_type, params = parse_options_header(request.headers.get("Content-Type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+        raise _too_large()
+
+    # The parser is push-based and synchronous: callbacks only record events,
+    # which are then applied asynchronously after each chunk
+    events: List[Tuple[str, bytes]] = []
+    header_field, header_value = bytearray(), bytearray()
+    part_headers: Dict[bytes, bytes] = {}
+
+    def on_part_begin():
+        part_headers.clear()
+
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        part_headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append(("headers", part_headers.get(b"content-disposition", b"")))
+
+    def on_part_data(data, start, end):
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end():
+        events.append(("end", b""))
 
-    # Validate file size
-    file.file.seek(0, 2)  # Move to the end of the file
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to the beginning
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
 
-    # Generate a unique file name
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = UPLOAD_DIR / unique_filename
+    form = UploadForm()
+    sink: Optional[_FileSink] = None
+    field_name: Optional[str] = None
+    field_value = bytearray()
+    part_count = 0
 
-    # Save the file
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, payload in events:
+                if kind == "headers":
+                    part_count += 1
+                    if part_count > MAX_FIELDS:
+                        raise HTTPException(status_code=400, detail="Too many form fields")
+                    _, options = parse_options_header(payload)
+                    field_name = options.get(b"name", b"").decode("latin-1")
+                    filename = options.get(b"filename")
+                    if filename is not None:
+                        if sink is not None or form.file is not None:
+                            raise HTTPException(status_code=400, detail="Only one file may be uploaded")
+                        sink = _FileSink(filename.decode("utf-8", "replace"))
+                elif kind == "data":
+                    if sink is not None:
+                        await sink.write(payload)
+                    else:
+                        field_value.extend(payload)
+                        if len(field_value) > MAX_FIELD_SIZE:
+                            raise HTTPException(status_code=400, detail=f"Form field '{field_name}' is too large")
+                elif kind == "end":
+                    if sink is not None:
+                        form.file = await sink.commit()
+                        sink = None
+                    elif field_name:
+                        try:
+                            form.fields[field_name] = field_value.decode("utf-8")
+                        except UnicodeDecodeError:
+                            raise HTTPException(status_code=400, detail=f"Form field '{field_name}' is not valid UTF-8")
+                    field_value.clear()
+            events.clear()
+        parser.finalize()
+        if sink is not None:
+            # The body ended inside the file part
+            raise HTTPException(status_code=400, detail="Incomplete multipart body")
+    except BaseException:
+        if sink is not None:
+            await sink.abort()
+        raise
 
-    # Return the file URL as a string
-    return f"/static/uploads/{unique_filename}"
+    return form
@@ -0,0 +1,53 @@
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app.core.cache import create_cache, invalidate_on_commit
+from app.core.config import settings
+from app.database.models import User
+from app.schemas.user import UserResponse
+
+# Process-level cache of authenticated principals, keyed by user id
+user_cache = create_cache(
+    settings.USER_CACHE_BACKEND,
+    redis_url=settings.REDIS_URL,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+)
+
+
+class CachedPrincipal(UserResponse):
+    """
+    Principal read back from the cache. It was fully validated by `cache_user`,
+    so the e-mail is not checked again (that check dominates the decode time).
+    """
+    email: str
+
+
+def _key(user_id) -> str:
+    return f"user:{user_id}"
+
+
+async def get_cached_user(user_id) -> Optional[UserResponse]:
+    """Return the cached principal for a user id, if any"""
+    raw = await user_cache.get(_key(user_id))
+    return CachedPrincipal.model_validate_json(raw) if raw else None
+
+
+async def cache_user(user: User) -> UserResponse:
+    """Store a user's principal and return it"""
+    principal = UserResponse.model_validate(user)
+    await user_cache.set(_key(user.id), principal.model_dump_json().encode(), settings.USER_CACHE_TTL_SECONDS)
+    return principal
+
+
+async def invalidate_user(user_id) -> None:
+    """Drop a user's cached principal"""
+    await user_cache.delete(_key(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    """
+    Catch changes made outside UserRepository (e.g. `is_active` toggled in the admin).
+    """
+    invalidate_on_commit(object_session(target), invalidate_user, target.id)
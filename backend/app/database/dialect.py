@@ -0,0 +1,13 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def upsert(dialect: str, table):
+    """
+    Return an INSERT for `table` that supports `on_conflict_do_update`
+    on the given dialect (PostgreSQL and SQLite share the same API).
+    """
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
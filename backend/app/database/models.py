@@ -1,15 +1,33 @@
-from sqlalchemy import Column, Boolean, String, Integer, ForeignKey, DateTime, func, Text, UniqueConstraint
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import Column, Boolean, String, Integer, Float, ForeignKey, DateTime, func, Text, UniqueConstraint, Index, JSON
+from sqlalchemy import select
+from sqlalchemy.orm import column_property, relationship, declarative_base
+from typing import Optional
 from datetime import datetime, timezone
+from app.core.ranking import hot_score
 
 Base = declarative_base()
 
+
+def calculate_rating_percentage(upvotes: int, downvotes: int) -> float:
+    """Share of upvotes among all votes, in percent."""
+    total_votes = upvotes + downvotes
+    if total_votes == 0:
+        return 0.0
+    return (upvotes / total_votes) * 100
+
+
+def post_preview_url(post_id: int, blob_sha256: Optional[str], preview_format: Optional[str]) -> Optional[str]:
+    """Preview endpoint of a post, versioned by the file hash so it can be cached for good."""
+    if not blob_sha256 or preview_format in (None, "none"):
+        return None
+    return f"/api/v1/posts/{post_id}/preview?v={blob_sha256[:16]}"
+
 class UserSession(Base):
     __tablename__ = "user_sessions"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    refresh_token = Column(String, unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    token_hash = Column(String(64), nullable=False)  # SHA-256 of the refresh token, which is never stored
     device_id = Column(String, nullable=False)
     ip_address = Column(String, nullable=False)
     user_agent = Column(String, nullable=True)
@@ -21,6 +39,12 @@ class UserSession(Base):
 
     user = relationship("User", back_populates="sessions")
 
+    __table_args__ = (
+        Index("ix_user_sessions_token_hash", "token_hash", unique=True),
+        Index("ix_user_sessions_user_id_is_revoked", "user_id", "is_revoked"),
+        Index("ix_user_sessions_expires_at", "expires_at"),
+    )
+
 class UserFollow(Base):
     __tablename__ = "user_follows"
 
@@ -32,7 +56,12 @@ class UserFollow(Base):
     follower = relationship("User", foreign_keys=[follower_id], back_populates="following")
     following = relationship("User", foreign_keys=[following_id], back_populates="followers")
 
-    __table_args__ = (UniqueConstraint("follower_id", "following_id", name="unique_follower_following"),)
+    __table_args__ = (
+        UniqueConstraint("follower_id", "following_id", name="unique_follower_following"),
+        # Cover the follower / following list pages: filter, keyset order and the joined user
+        Index("ix_user_follows_following_created_at_id", "following_id", "created_at", "id", "follower_id"),
+        Index("ix_user_follows_follower_created_at_id", "follower_id", "created_at", "id", "following_id"),
+    )
 
 class User(Base):
     __tablename__ = "users"
@@ -48,13 +77,41 @@ class User(Base):
     followers = relationship("UserFollow", foreign_keys=[UserFollow.following_id], back_populates="following", cascade="all, delete")
     following = relationship("UserFollow", foreign_keys=[UserFollow.follower_id], back_populates="follower", cascade="all, delete")
     sessions = relationship("UserSession", back_populates="user", cascade="all, delete")
+    stats = relationship("UserStats", back_populates="user", uselist=False, cascade="all, delete")
+
+class UserStats(Base):
+    """Denormalized profile counters, maintained by the write paths that change them."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    followers_count = Column(Integer, default=0, server_default="0", nullable=False)
+    following_count = Column(Integer, default=0, server_default="0", nullable=False)
+    uploads_count = Column(Integer, default=0, server_default="0", nullable=False)
+    upvotes_count = Column(Integer, default=0, server_default="0", nullable=False)
+    downvotes_count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    user = relationship("User", back_populates="stats")
 
 class Category(Base):
     __tablename__ = "categories"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
+    post_count = Column(Integer, nullable=False, default=0, server_default="0")  # Maintained by PostRepository
     posts = relationship("Post", back_populates="category")
 
+class Blob(Base):
+    """Content-addressed stored file, shared by every post with the same content."""
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    extension = Column(String(10), nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, default=0, server_default="0", nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    # First-page thumbnail stored next to the file: its image format, "none" if
+    # the document has none, NULL until rendered (see app.core.previews)
+    preview_format = Column(String(8), nullable=True)
+
 class Post(Base):
     __tablename__ = "posts"
     id = Column(Integer, primary_key=True, index=True)
@@ -62,23 +119,84 @@ class Post(Base):
     description = Column(Text, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     file_url = Column(String, nullable=False)
+    blob_sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=True, index=True)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     upvotes = Column(Integer, default=0)
     downvotes = Column(Integer, default=0)
-
-    votes = relationship("PostVote", back_populates="post")
+    # Precomputed ranking scores (see app.core.ranking), refreshed on every vote
+    hot_score = Column(Float, default=lambda context: initial_hot_score(context), server_default="0", nullable=False)
+    wilson_score = Column(Float, default=0, server_default="0", nullable=False)
+    preview_format = column_property(
+        select(Blob.preview_format).where(Blob.sha256 == blob_sha256).correlate_except(Blob).scalar_subquery()
+    )
+
+    votes = relationship("PostVote", back_populates="post", cascade="all, delete")
     author = relationship("User", back_populates="posts")
     category = relationship("Category", back_populates="posts")
 
+    # Composite indexes backing keyset pagination on (created_at, id)
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_category_created_at_id", "category_id", "created_at", "id"),
+        Index("ix_posts_author_created_at_id", "author_id", "created_at", "id"),
+        # Ranked listings: sort=hot|wilson|top, globally and per category
+        Index("ix_posts_hot_score_id", "hot_score", "id"),
+        Index("ix_posts_wilson_score_id", "wilson_score", "id"),
+        Index("ix_posts_top_score_id", upvotes - downvotes, "id"),
+        Index("ix_posts_category_hot_score_id", "category_id", "hot_score", "id"),
+        Index("ix_posts_category_wilson_score_id", "category_id", "wilson_score", "id"),
+        Index("ix_posts_category_top_score_id", "category_id", upvotes - downvotes, "id"),
+    )
+
     @property
     def rating_percentage(self) -> float:
         """Calculate the rating percentage."""
-        total_votes = self.upvotes + self.downvotes
-        if total_votes == 0:
-            return 0.0
-        return (self.upvotes / total_votes) * 100
+        return calculate_rating_percentage(self.upvotes, self.downvotes)
+
+    @property
+    def preview_url(self) -> Optional[str]:
+        return post_preview_url(self.id, self.blob_sha256, self.preview_format)
     
+def initial_hot_score(context) -> float:
+    """Hot score of a post without votes, from its creation time"""
+    # No context when called outside an INSERT (e.g. to prefill the admin form)
+    parameters = context.get_current_parameters() if context is not None else {}
+    created_at = parameters.get("created_at") or datetime.now(timezone.utc)
+    return hot_score(0, 0, created_at)
+
+class FeedEntry(Base):
+    """
+    A post in a follower's precomputed home timeline (fan-out on write).
+    `author_id` and `created_at` are copied from the post for pruning and paging.
+    """
+    __tablename__ = "feed_entries"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_feed_entries_user_created_at_post", "user_id", "created_at", "post_id"),
+        Index("ix_feed_entries_post_id", "post_id"),
+    )
+
+class PostContent(Base):
+    """
+    Text extracted from a post's document after upload (see app.core.extraction),
+    indexed for full-text search next to the title and description.
+    """
+    __tablename__ = "post_contents"
+
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    status = Column(String(16), nullable=False)  # done | failed
+    body = Column(Text, nullable=False, default="")
+    page_count = Column(Integer, nullable=False, default=0)  # Pages (slides) read
+    truncated = Column(Boolean, nullable=False, default=False)  # Stopped at the page or size cap
+    error = Column(Text, nullable=True)
+    extracted_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
 class PostVote(Base):
     __tablename__ = "post_votes"
 
@@ -89,4 +207,27 @@ class PostVote(Base):
 
     post = relationship("Post", back_populates="votes")
 
-    __table_args__ = (UniqueConstraint("user_id", "post_id", name="unique_user_post_vote"),)
\ No newline at end of file
+    __table_args__ = (UniqueConstraint("user_id", "post_id", name="unique_user_post_vote"),)
+
+class Job(Base):
+    """Deferred unit of work, executed by a job worker (see app.core.jobs)."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="queued")  # queued | running | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=1)
+    run_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(100), nullable=True)
+    last_error = Column(Text, nullable=True)
+    dedupe_key = Column(String(200), unique=True, nullable=True)  # At most one job per key, e.g. per periodic run
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_at_id", "status", "run_at", "id"),
+        Index("ix_jobs_finished_at", "finished_at"),
+    )
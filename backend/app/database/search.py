@@ -0,0 +1,263 @@
+import html
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import func, literal, literal_column, text, true, union_all
+from sqlalchemy.sql import column, select, table
+from sqlalchemy.engine import Connection
+
+# Rank used when a search falls back to substring matching
+NO_RANK = literal(0.0)
+
+# Weighted document built from a post: the title counts more than the description
+POSTGRES_DDL = [
+    """
+    ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING GIN (search_vector)",
+]
+
+# FTS5 shadow table over `posts`, kept in sync by triggers
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        title, description,
+        content='posts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, description ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO posts_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+# Extracted document text: same setup over `post_contents.body`. PostgreSQL
+# caps a tsvector at 1MB, which EXTRACTION_MAX_CHARS keeps well clear of.
+CONTENT_POSTGRES_DDL = [
+    """
+    ALTER TABLE post_contents ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_post_contents_search_vector ON post_contents USING GIN (search_vector)",
+]
+
+CONTENT_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS post_contents_fts USING fts5(
+        body,
+        content='post_contents', content_rowid='post_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_contents_fts_ai AFTER INSERT ON post_contents BEGIN
+        INSERT INTO post_contents_fts(rowid, body) VALUES (new.post_id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_contents_fts_ad AFTER DELETE ON post_contents BEGIN
+        INSERT INTO post_contents_fts(post_contents_fts, rowid, body) VALUES ('delete', old.post_id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_contents_fts_au AFTER UPDATE OF body ON post_contents BEGIN
+        INSERT INTO post_contents_fts(post_contents_fts, rowid, body) VALUES ('delete', old.post_id, old.body);
+        INSERT INTO post_contents_fts(rowid, body) VALUES (new.post_id, new.body);
+    END
+    """,
+]
+
+# Document text matches count for less than title and description matches
+CONTENT_RANK_WEIGHT = 0.5
+
+# Highlight markers in raw snippets; extraction strips control characters from
+# the text, so they cannot occur in it
+MARK_START, MARK_END = "\x02", "\x03"
+SNIPPET_TOKENS = 24
+
+
+def install_search_index(connection: Connection) -> None:
+    """
+    Create the full-text index for posts if it does not exist yet.
+    Idempotent; used by the Alembic migration and at application startup.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'")
+        ).first()
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            # Index the posts that were written before the shadow table existed
+            connection.execute(text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+
+
+def drop_search_index(connection: Connection) -> None:
+    """Remove the full-text index created by `install_search_index`"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text("DROP INDEX IF EXISTS ix_posts_search_vector"))
+        connection.execute(text("ALTER TABLE posts DROP COLUMN IF EXISTS search_vector"))
+    elif dialect == "sqlite":
+        for trigger in ("posts_fts_ai", "posts_fts_ad", "posts_fts_au"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        connection.execute(text("DROP TABLE IF EXISTS posts_fts"))
+
+
+def install_content_search_index(connection: Connection) -> None:
+    """
+    Create the full-text index for extracted document text (`post_contents`).
+    Idempotent; used by the Alembic migration and at application startup.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in CONTENT_POSTGRES_DDL:
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_contents_fts'")
+        ).first()
+        for statement in CONTENT_SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO post_contents_fts(post_contents_fts) VALUES ('rebuild')"))
+
+
+def drop_content_search_index(connection: Connection) -> None:
+    """Remove the full-text index created by `install_content_search_index`"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text("DROP INDEX IF EXISTS ix_post_contents_search_vector"))
+        connection.execute(text("ALTER TABLE post_contents DROP COLUMN IF EXISTS search_vector"))
+    elif dialect == "sqlite":
+        for trigger in ("post_contents_fts_ai", "post_contents_fts_ad", "post_contents_fts_au"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        connection.execute(text("DROP TABLE IF EXISTS post_contents_fts"))
+
+
+def _terms(query: str) -> list:
+    """Split a user query into word tokens safe to embed in a full-text query"""
+    return re.findall(r"\w+", query)
+
+
+def _tsquery(terms: List[str]):
+    return func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+
+
+def _fts5_query(terms: List[str]) -> str:
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _hits(dialect: str, terms: List[str]):
+    """
+    Posts matching on their own text and on their document text, with the rank
+    of each match (higher is better), as a union of index lookups.
+    """
+    if dialect == "postgresql":
+        tsquery = _tsquery(terms)
+        posts = table("posts", column("id"), column("search_vector"))
+        contents = table("post_contents", column("post_id"), column("search_vector"))
+        return union_all(
+            select(posts.c.id.label("post_id"), func.ts_rank(posts.c.search_vector, tsquery).label("title_rank"),
+                   literal(0.0).label("content_rank"))
+            .where(posts.c.search_vector.op("@@")(tsquery)),
+            select(contents.c.post_id, literal(0.0), func.ts_rank(contents.c.search_vector, tsquery))
+            .where(contents.c.search_vector.op("@@")(tsquery)),
+        )
+
+    match = _fts5_query(terms)
+    posts_fts = table("posts_fts", column("rowid"))
+    contents_fts = table("post_contents_fts", column("rowid"))
+    posts_document = literal_column("posts_fts")
+    contents_document = literal_column("post_contents_fts")
+    # bm25() is lower-is-better; the title column is weighted over the description
+    return union_all(
+        select(posts_fts.c.rowid.label("post_id"), (-func.bm25(posts_document, 10.0, 1.0)).label("title_rank"),
+               literal(0.0).label("content_rank"))
+        .where(posts_document.match(match)),
+        select(contents_fts.c.rowid, literal(0.0), -func.bm25(contents_document))
+        .where(contents_document.match(match)),
+    )
+
+
+def full_text_match(dialect: str, query: str) -> Optional[Tuple]:
+    """
+    Build the full-text match for `query` on the given dialect, over the title,
+    the description and the text extracted from the post's document.
+
+    Returns `(join, condition, rank)` where `join` is an optional
+    `(target, onclause)` pair, or None when the dialect has no full-text
+    index or the query contains no searchable words. Every term is
+    prefix-matched and all terms must be present in one of the two documents.
+    Higher rank is better.
+    """
+    terms = _terms(query)
+    if not terms or dialect not in ("postgresql", "sqlite"):
+        return None
+
+    hits = _hits(dialect, terms).subquery("search_hits")
+    matches = (
+        select(
+            hits.c.post_id,
+            (func.max(hits.c.title_rank) + CONTENT_RANK_WEIGHT * func.max(hits.c.content_rank)).label("rank"),
+        )
+        .group_by(hits.c.post_id)
+        .subquery("search_matches")
+    )
+    return (matches, matches.c.post_id == literal_column("posts.id")), true(), matches.c.rank
+
+
+def content_snippets(dialect: str, query: str, post_ids: List[int]):
+    """
+    Query of `(post_id, raw snippet)` for those of `post_ids` whose document
+    text matches `query`, or None without a full-text index. Matched terms are
+    wrapped in MARK_START / MARK_END; see `render_snippet`.
+    """
+    terms = _terms(query)
+    if not terms or not post_ids:
+        return None
+
+    if dialect == "postgresql":
+        contents = table("post_contents", column("post_id"), column("body"), column("search_vector"))
+        tsquery = _tsquery(terms)
+        options = f'StartSel="{MARK_START}", StopSel="{MARK_END}", MaxWords={SNIPPET_TOKENS}, MinWords={SNIPPET_TOKENS // 2}'
+        return (
+            select(contents.c.post_id, func.ts_headline("simple", contents.c.body, tsquery, options))
+            .where(contents.c.search_vector.op("@@")(tsquery), contents.c.post_id.in_(post_ids))
+        )
+
+    if dialect == "sqlite":
+        fts = table("post_contents_fts", column("rowid"))
+        document = literal_column("post_contents_fts")
+        return (
+            select(fts.c.rowid, func.snippet(document, 0, MARK_START, MARK_END, "…", SNIPPET_TOKENS))
+            .where(document.match(_fts5_query(terms)), fts.c.rowid.in_(post_ids))
+        )
+
+    return None
+
+
+def render_snippet(raw: str) -> str:
+    """HTML-escape a raw snippet and turn its markers into <mark> tags"""
+    return html.escape(raw).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
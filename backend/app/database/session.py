@@ -1,11 +1,178 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import asyncio
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from app.core.config import settings
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Optional
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+logger = logging.getLogger(__name__)
+
+
+def create_engine(url: str = settings.DATABASE_URL) -> AsyncEngine:
+    """
+    Build the application's async engine from Settings: pool sizing,
+    pre-ping, recycle and, on PostgreSQL, a statement timeout and the
+    asyncpg prepared-statement cache size.
+    """
+    url = make_url(url)
+    options = {"echo": settings.DATABASE_ECHO}
+    connect_args = {}
+
+    # In-memory SQLite uses a single-connection pool that takes no sizing options
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        )
+
+    if url.get_driver_name() == "asyncpg":
+        # Set to 0 behind PgBouncer in transaction mode
+        connect_args["statement_cache_size"] = settings.DATABASE_STATEMENT_CACHE_SIZE
+        connect_args["prepared_statement_cache_size"] = settings.DATABASE_STATEMENT_CACHE_SIZE
+        if settings.DATABASE_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DATABASE_STATEMENT_TIMEOUT_MS)}
+    elif url.get_driver_name() == "psycopg" and settings.DATABASE_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT_MS}"
+
+    return create_async_engine(url, connect_args=connect_args, **options)
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Connection pool usage of this worker process"""
+    pool = engine.sync_engine.pool
+    stats = {"pid": os.getpid(), "pool": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    if hasattr(pool, "_max_overflow"):
+        stats["max_overflow"] = pool._max_overflow
+    return stats
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    healthy: bool = True
+    down_since: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class ReplicaRouter:
+    """
+    Hands out read-only engines: round-robin over healthy replicas, falling
+    back to the primary when none is available. A failed replica is taken out
+    of rotation and retried after `retry_after` seconds or by the periodic
+    health check, whichever comes first.
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine], retry_after: float = 10):
+        self.primary = primary
+        self.replicas = [Replica(engine) for engine in replicas]
+        self.retry_after = retry_after
+        self._turn = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+
+    def candidates(self) -> List[AsyncEngine]:
+        """Engines to try for a read, in order; the primary is always last"""
+        if not self.replicas:
+            return [self.primary]
+        start = next(self._turn) % len(self.replicas)
+        now = time.monotonic()
+        engines = [
+            replica.engine
+            for replica in self.replicas[start:] + self.replicas[:start]
+            if replica.healthy or now - replica.down_since >= self.retry_after
+        ]
+        return engines + [self.primary]
+
+    def mark_down(self, engine: AsyncEngine, error: Exception):
+        for replica in self.replicas:
+            if replica.engine is engine:
+                if replica.healthy:
+                    logger.warning("Database replica %s is unavailable: %s", engine.url.render_as_string(), error)
+                replica.healthy, replica.down_since, replica.last_error = False, time.monotonic(), str(error)
+
+    def mark_up(self, engine: AsyncEngine):
+        for replica in self.replicas:
+            if replica.engine is engine and not replica.healthy:
+                logger.info("Database replica %s is back", engine.url.render_as_string())
+                replica.healthy, replica.down_since, replica.last_error = True, None, None
+
+    async def check_health(self):
+        """Probe every replica with a trivial query"""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=5)
+            except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+                self.mark_down(replica.engine, e)
+            else:
+                self.mark_up(replica.engine)
+
+    async def _health_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health()
+
+    def start_health_checks(self, interval: float):
+        if self.replicas and self._health_task is None:
+            self._health_task = asyncio.get_running_loop().create_task(self._health_loop(interval))
+
+    async def dispose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def replica_urls() -> List[str]:
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+
+engine = create_engine()
 SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
 
+replica_router = ReplicaRouter(
+    engine,
+    [create_engine(url) for url in replica_urls()],
+    retry_after=settings.DATABASE_REPLICA_RETRY_SECONDS,
+)
+ReadSessionLocal = async_sessionmaker(expire_on_commit=False, autoflush=False)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only work, bound to a healthy replica (or the primary).
+    Replicas lag behind the primary: reads that must see the caller's own
+    writes belong on `get_db`.
+    """
+    candidates = replica_router.candidates()
+    for bind in candidates:
+        session = ReadSessionLocal(bind=bind)
+        if bind is not replica_router.primary:
+            # Connect up front so an unreachable replica falls through to the next candidate
+            try:
+                await session.connection()
+            except (OperationalError, OSError) as e:
+                await session.close()
+                replica_router.mark_down(bind, e)
+                continue
+            replica_router.mark_up(bind)
+        async with session:
+            yield session
+        return
@@ -0,0 +1,124 @@
+"""
+Job handlers. Importing this module registers them with `app.core.jobs`.
+"""
+from datetime import timedelta
+from typing import Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.blob_store import blob_key, collect_garbage, file_key, preview_key
+from app.core.category_cache import invalidate_catalog
+from app.core.config import settings
+from app.core.extraction import ExtractionError, extract_document, extraction_supported
+from app.core.jobs import task
+from app.core.previews import previews_supported, render_document_preview
+from app.core.response_cache import invalidate, invalidate_post
+from app.core.storage import guess_content_type, storage
+from app.repositories.auth import AuthRepository
+from app.repositories.blob import BlobRepository
+from app.repositories.category import CategoryRepository
+from app.repositories.feed import FeedRepository
+from app.repositories.job import JobRepository, utcnow
+from app.repositories.post import PostRepository
+from app.repositories.post_content import PostContentRepository
+from app.repositories.user_stats import UserStatsRepository
+from app.services.auth import AuthService
+
+
+@task("posts.process_upload")
+async def process_upload(db: AsyncSession, post_id: int):
+    """
+    Work following a new post that does not need to hold up the upload
+    request: pushing the post to the followers' timelines.
+    """
+    await FeedRepository.fan_out(db, post_id)
+    await db.commit()
+
+
+@task("posts.extract_text")
+async def extract_text(db: AsyncSession, post_id: int):
+    """
+    Index the text of a post's document for search. Files shared with an
+    already indexed post are not parsed again; unreadable ones are recorded
+    as failed rather than retried.
+    """
+    post = await PostRepository.get_file_info(db, post_id)
+    if post is None:
+        return  # Deleted in the meantime
+    if post.blob_sha256 and await PostContentRepository.copy_from_blob(db, post_id, post.blob_sha256):
+        await db.commit()
+        await invalidate("posts")
+        return
+    key = file_key(post.file_url)
+    if key is None:
+        await PostContentRepository.save(db, post_id, "failed", error="File outside the upload area")
+        await db.commit()
+        return
+    extension = key.rsplit(".", 1)[-1].lower()
+    if not extraction_supported(extension):
+        return  # Left for a later run of `python -m app.commands.extract_contents`
+    try:
+        async with storage.local_copy(key) as path:
+            body, page_count, truncated = await extract_document(str(path), extension)
+    except ExtractionError as e:
+        await PostContentRepository.save(db, post_id, "failed", error=str(e))
+    else:
+        await PostContentRepository.save(db, post_id, "done", body, page_count, truncated)
+    await db.commit()
+    # Cached search results may now change
+    await invalidate("posts")
+
+
+@task("blobs.render_preview")
+async def render_preview(db: AsyncSession, blob_sha256: str):
+    """
+    Render the first-page thumbnail of a file, once per blob. File types this
+    host cannot render (missing optional packages) are left for a later run
+    of `python -m app.commands.render_previews`.
+    """
+    blob = await BlobRepository.get(db, blob_sha256)
+    if blob is None or blob.preview_format is not None or not previews_supported(blob.extension):
+        return
+    async with storage.local_copy(blob_key(blob_sha256, blob.extension)) as path:
+        preview = await render_document_preview(str(path), blob.extension)
+    if preview is None:
+        image_format = "none"
+    else:
+        image, image_format = preview
+        key = preview_key(blob_sha256, image_format)
+        await storage.put(key, image, content_type=guess_content_type(key))
+    await BlobRepository.set_preview(db, blob_sha256, image_format)
+    await db.commit()
+    # Cached responses of the posts sharing the file now lack their preview_url
+    await invalidate("posts")
+    for post_id in await PostRepository.ids_by_blob(db, blob_sha256):
+        await invalidate_post(post_id)
+
+
+@task("sessions.cleanup", every=settings.SESSION_CLEANUP_INTERVAL_SECONDS)
+async def cleanup_sessions(db: AsyncSession):
+    """Keep user_sessions bounded: drop expired sessions and revoked ones no longer needed for reuse detection"""
+    revoked_before = utcnow() - timedelta(hours=AuthService.GRACE_PERIOD_HOURS)
+    await AuthRepository.prune_sessions(db, revoked_before, batch_size=settings.SESSION_CLEANUP_BATCH_SIZE)
+
+
+@task("stats.reconcile", every=settings.STATS_RECONCILE_INTERVAL_SECONDS)
+async def reconcile_stats(db: AsyncSession):
+    """Repair drift of the denormalized user and category counters"""
+    await UserStatsRepository.reconcile(db)
+    await CategoryRepository.reconcile_post_counts(db)
+    await invalidate_catalog()
+
+
+@task("blobs.collect_garbage", every=settings.BLOB_GC_INTERVAL_SECONDS)
+async def collect_blob_garbage(db: AsyncSession):
+    """Remove the files of deleted posts and of uploads that never became a post"""
+    async def referenced() -> Set[str]:
+        hashes = await BlobRepository.referenced(db)
+        await db.rollback()  # Do not hold the transaction open while deleting
+        return hashes
+
+    await collect_garbage(referenced, settings.BLOB_GC_MIN_AGE_SECONDS)
+
+
+@task("jobs.prune", every=3600)
+async def prune_jobs(db: AsyncSession):
+    await JobRepository.prune(db, timedelta(hours=settings.JOB_RETENTION_HOURS))
@@ -1,27 +1,33 @@
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import update
+from sqlalchemy import delete, update
 from app.database.models import UserSession
 from app.core.config import settings
+from app.core.jwt import refresh_token_hash
 
 
 class AuthRepository:
+    @staticmethod
+    def _new_session(user_id: int, token: str, device_id: str, ip: str, user_agent: str) -> UserSession:
+        return UserSession(
+            user_id=user_id,
+            token_hash=refresh_token_hash(token),
+            device_id=device_id,
+            ip_address=ip,
+            user_agent=user_agent,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+
     @staticmethod
     async def save_refresh_token(
         db: AsyncSession, user_id: int, token: str, device_id: str, ip: str, user_agent: str
     ):
         """ Save a refresh token in the database """
         try:
-            db_token = UserSession(
-                user_id=user_id,
-                refresh_token=token,
-                device_id=device_id,
-                ip_address=ip,
-                user_agent=user_agent,
-                expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-            )
+            db_token = AuthRepository._new_session(user_id, token, device_id, ip, user_agent)
             db.add(db_token)
             await db.commit()
             return db_token
@@ -30,30 +36,40 @@ class AuthRepository:
             raise ValueError("Failed to save refresh token")
 
     @staticmethod
-    async def get_and_lock_session(db: AsyncSession, token: str) -> UserSession:
-        """ Get a session with row-level lock for token rotation """
+    async def rotate_refresh_token(
+        db: AsyncSession, user_id: int, token: str, new_token: str, device_id: str, ip: str, user_agent: str
+    ) -> Optional[UserSession]:
+        """
+        Replace a refresh token by its successor in one transaction: a conditional
+        UPDATE ... RETURNING revokes the live session of `token`, then the new session
+        is inserted. Of several concurrent rotations of the same token exactly one
+        matches the UPDATE; the others get None, as for an unknown, revoked or
+        expired token. Returns the new session.
+        """
+        now = datetime.now(timezone.utc)
         try:
-            # Use SELECT FOR UPDATE to lock the row
             result = await db.execute(
-                select(UserSession)
-                .filter(
-                    UserSession.refresh_token == token,
+                update(UserSession)
+                .where(
+                    UserSession.token_hash == refresh_token_hash(token),
+                    UserSession.user_id == user_id,
                     UserSession.is_revoked == False,
-                    UserSession.expires_at > datetime.now(timezone.utc)
+                    UserSession.expires_at > now
                 )
-                .with_for_update()
+                .values(is_revoked=True, revoked_at=now, last_used_at=now)
+                .returning(UserSession.id)
+                .execution_options(synchronize_session=False)
             )
-            session = result.scalar_one_or_none()
-            
-            if session:
-                # Update last used timestamp
-                session.last_used_at = datetime.now(timezone.utc)
-                await db.commit()
-            
-            return session
+            if result.scalar_one_or_none() is None:
+                await db.rollback()
+                return None
+            new_session = AuthRepository._new_session(user_id, new_token, device_id, ip, user_agent)
+            db.add(new_session)
+            await db.commit()
+            return new_session
         except Exception:
             await db.rollback()
-            raise ValueError("Failed to get session")
+            raise
 
     @staticmethod
     async def revoke_refresh_token(db: AsyncSession, token: str):
@@ -63,7 +79,7 @@ class AuthRepository:
             result = await db.execute(
                 update(UserSession)
                 .where(
-                    UserSession.refresh_token == token,
+                    UserSession.token_hash == refresh_token_hash(token),
                     UserSession.is_revoked == False
                 )
                 .values(
@@ -87,7 +103,7 @@ class AuthRepository:
             grace_period_start = datetime.now(timezone.utc) - timedelta(hours=grace_period_hours)
             result = await db.execute(
                 select(UserSession).filter(
-                    UserSession.refresh_token == token,
+                    UserSession.token_hash == refresh_token_hash(token),
                     UserSession.last_used_at >= grace_period_start
                 )
             )
@@ -117,4 +133,30 @@ class AuthRepository:
             return result.rowcount
         except Exception:
             await db.rollback()
-            raise ValueError("Failed to revoke user sessions")
\ No newline at end of file
+            raise ValueError("Failed to revoke user sessions")
+
+    @staticmethod
+    async def prune_sessions(db: AsyncSession, revoked_before: datetime, batch_size: int = 1000) -> int:
+        """
+        Delete expired sessions, and revoked ones last used before `revoked_before`
+        (past the token reuse detection window), in batches of `batch_size` rows
+        so that each transaction stays short. Returns the number of deleted rows.
+        """
+        now = datetime.now(timezone.utc)
+        deleted = 0
+        for condition in (
+            UserSession.expires_at < now,
+            (UserSession.is_revoked == True) & (UserSession.last_used_at < revoked_before),
+        ):
+            while True:
+                batch = select(UserSession.id).where(condition).limit(batch_size)
+                try:
+                    result = await db.execute(delete(UserSession).where(UserSession.id.in_(batch.scalar_subquery())))
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+                deleted += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+        return deleted
@@ -0,0 +1,70 @@
+from typing import Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import update, delete
+from app.database.models import Blob
+from app.database.dialect import upsert
+
+
+class BlobRepository:
+    @staticmethod
+    async def acquire(db: AsyncSession, sha256: str, extension: str, size: int):
+        """
+        Add a reference to a blob, registering it on first use.
+        Does not commit: it runs inside the transaction that creates the post.
+        """
+        stmt = upsert(db.get_bind().dialect.name, Blob).values(
+            sha256=sha256, extension=extension, size=size, ref_count=1
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[Blob.sha256],
+                set_={"ref_count": Blob.ref_count + 1},
+            )
+        )
+
+    @staticmethod
+    async def release(db: AsyncSession, sha256: str) -> bool:
+        """
+        Drop a reference to a blob and forget it once nothing uses it.
+        Returns True if the blob became unreferenced; its file is then left to
+        `collect_garbage`. Does not commit: it runs inside the transaction that deletes the post.
+        """
+        result = await db.execute(
+            update(Blob)
+            .where(Blob.sha256 == sha256)
+            .values(ref_count=Blob.ref_count - 1)
+            .returning(Blob.ref_count)
+        )
+        remaining = result.scalar_one_or_none()
+        if remaining is not None and remaining <= 0:
+            await db.execute(delete(Blob).where(Blob.sha256 == sha256, Blob.ref_count <= 0))
+            return True
+        return False
+
+    @staticmethod
+    async def get(db: AsyncSession, sha256: str):
+        return await db.get(Blob, sha256)
+
+    @staticmethod
+    async def set_preview(db: AsyncSession, sha256: str, image_format: str):
+        """Record the rendered preview of a blob ("none" if it has none). Does not commit."""
+        await db.execute(update(Blob).where(Blob.sha256 == sha256).values(preview_format=image_format))
+
+    @staticmethod
+    async def without_preview(db: AsyncSession):
+        """Hashes of the blobs whose preview was never rendered"""
+        result = await db.execute(select(Blob.sha256).where(Blob.preview_format.is_(None)))
+        return result.scalars().all()
+
+    @staticmethod
+    async def referenced(db: AsyncSession) -> Set[str]:
+        """Hashes of all registered blobs"""
+        result = await db.execute(select(Blob.sha256))
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def exists(db: AsyncSession, sha256: str) -> bool:
+        """Check whether a blob is registered (i.e. referenced by a post)."""
+        result = await db.execute(select(Blob.sha256).filter(Blob.sha256 == sha256))
+        return result.scalar_one_or_none() is not None
@@ -1,16 +1,53 @@
-from typing import List
+from typing import Iterable, List, Optional
+from sqlalchemy import update
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.models import Category
+from sqlalchemy.sql import func
+from app.database.models import Category, Post
 
 class CategoryRepository:
     @staticmethod
     async def get_all(db: AsyncSession) -> List[Category]:
         """ Retrieve all categories """
-        result = await db.execute(select(Category))
+        result = await db.execute(select(Category).order_by(Category.id))
         return result.scalars().all()
 
     @staticmethod
     async def get_by_id(db: AsyncSession, category_id: int) -> Category:
         """ Retrieve a category by ID """
-        return await db.get(Category, category_id)
\ No newline at end of file
+        return await db.get(Category, category_id)
+
+    @staticmethod
+    async def increment_post_count(db: AsyncSession, category_id: int, delta: int):
+        """
+        Shift a category's post counter. Does not commit: it runs inside the
+        transaction of the post write that caused it.
+        """
+        await db.execute(
+            update(Category)
+            .where(Category.id == category_id)
+            .values(post_count=Category.post_count + delta)
+        )
+
+    @staticmethod
+    def reconcile_statement(category_ids: Optional[Iterable[int]] = None):
+        """
+        Build an UPDATE recomputing the post counters of the given
+        categories (or of all of them) from the posts table.
+        """
+        stmt = update(Category).values(
+            post_count=select(func.count()).where(Post.category_id == Category.id).scalar_subquery()
+        )
+        if category_ids is not None:
+            stmt = stmt.where(Category.id.in_(list(category_ids)))
+        return stmt
+
+    @staticmethod
+    async def reconcile_post_counts(db: AsyncSession, category_ids: Optional[Iterable[int]] = None):
+        """ Recompute post counters, fixing any drift """
+        try:
+            await db.execute(CategoryRepository.reconcile_statement(category_ids))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
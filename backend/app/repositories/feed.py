@@ -0,0 +1,136 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, union
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func, literal
+from app.core.config import settings
+from app.core.pagination import decode_cursor, keyset_after, paginate
+from app.database.dialect import upsert
+from app.database.models import FeedEntry, Post, UserFollow, UserStats
+
+FEED_COLUMNS = ["user_id", "post_id", "author_id", "created_at"]
+
+
+def followers_count(author_id):
+    return func.coalesce(
+        select(UserStats.followers_count).where(UserStats.user_id == author_id).scalar_subquery(), 0
+    )
+
+
+class FeedRepository:
+    """
+    Per-user home timelines. Posts are pushed to followers right after creation
+    by the `posts.process_upload` job (fan-out on write), except for authors with more than
+    `FEED_FANOUT_MAX_FOLLOWERS` followers, whose posts are pulled at read time.
+    None of the write helpers commit: they run in the caller's transaction.
+    """
+
+    @staticmethod
+    async def fan_out(db: AsyncSession, post_id: int):
+        """
+        Push a new post to the timelines of its author's followers, in one statement.
+        """
+        source = (
+            select(UserFollow.follower_id, Post.id, Post.author_id, Post.created_at)
+            .join(UserFollow, UserFollow.following_id == Post.author_id)
+            .where(Post.id == post_id, followers_count(Post.author_id) < settings.FEED_FANOUT_MAX_FOLLOWERS)
+        )
+        stmt = upsert(db.get_bind().dialect.name, FeedEntry).from_select(FEED_COLUMNS, source)
+        await db.execute(stmt.on_conflict_do_nothing())
+
+    @staticmethod
+    async def backfill(db: AsyncSession, user_id: int, author_id: int, limit: Optional[int] = None):
+        """
+        Add an author's most recent posts to a new follower's timeline.
+        """
+        source = (
+            select(literal(user_id, FeedEntry.user_id.type), Post.id, Post.author_id, Post.created_at)
+            .where(Post.author_id == author_id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit or settings.FEED_BACKFILL_POSTS)
+        )
+        stmt = upsert(db.get_bind().dialect.name, FeedEntry).from_select(FEED_COLUMNS, source)
+        await db.execute(stmt.on_conflict_do_nothing())
+
+    @staticmethod
+    async def fan_out_author(db: AsyncSession, author_id: int):
+        """
+        Push an author's most recent posts to all of their followers. Used when an
+        author drops below the fan-out threshold: posts made while above it were
+        only pulled at read time and would otherwise vanish from timelines.
+        """
+        recent = (
+            select(Post.id)
+            .where(Post.author_id == author_id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(settings.FEED_BACKFILL_POSTS)
+        )
+        source = (
+            select(UserFollow.follower_id, Post.id, Post.author_id, Post.created_at)
+            .join(UserFollow, UserFollow.following_id == Post.author_id)
+            .where(Post.id.in_(recent))
+        )
+        stmt = upsert(db.get_bind().dialect.name, FeedEntry).from_select(FEED_COLUMNS, source)
+        await db.execute(stmt.on_conflict_do_nothing())
+
+    @staticmethod
+    async def prune(db: AsyncSession, user_id: int, author_id: int):
+        """
+        Remove an author's posts from a former follower's timeline.
+        """
+        await db.execute(
+            delete(FeedEntry).where(FeedEntry.user_id == user_id, FeedEntry.author_id == author_id)
+        )
+
+    @staticmethod
+    async def remove_post(db: AsyncSession, post_id: int):
+        await db.execute(delete(FeedEntry).where(FeedEntry.post_id == post_id))
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, user_ids: Iterable[int]):
+        """
+        Recreate timelines from the follow graph, keeping the latest
+        `FEED_BACKFILL_POSTS` posts of every followed author.
+        """
+        for user_id in user_ids:
+            await db.execute(delete(FeedEntry).where(FeedEntry.user_id == user_id))
+            following = await db.execute(select(UserFollow.following_id).where(UserFollow.follower_id == user_id))
+            for author_id in following.scalars().all():
+                await FeedRepository.backfill(db, user_id, author_id)
+
+    @staticmethod
+    async def get_timeline(db: AsyncSession, user_id: int, skip: int, limit: int, cursor: Optional[str] = None) -> List[Row]:
+        """
+        Page through a user's timeline merged with the posts pulled from the
+        high-fanout authors they follow. Returns up to `limit + 1`
+        `(post_id, created_at)` rows, newest first.
+        """
+        pushed = select(FeedEntry.post_id, FeedEntry.created_at).where(FeedEntry.user_id == user_id)
+        pulled = (
+            select(Post.id.label("post_id"), Post.created_at)
+            .join(UserFollow, UserFollow.following_id == Post.author_id)
+            .where(
+                UserFollow.follower_id == user_id,
+                followers_count(Post.author_id) >= settings.FEED_FANOUT_MAX_FOLLOWERS,
+            )
+        )
+
+        # Bound each source to the rows the page can use before merging them;
+        # UNION also drops posts present in both (an author who crossed the threshold)
+        bound = skip + limit + 1 if not cursor else limit + 1
+        values = decode_cursor(cursor, 2) if cursor else None
+        branches = []
+        for query, columns in (
+            (pushed, (FeedEntry.created_at, FeedEntry.post_id)),
+            (pulled, (Post.created_at, Post.id)),
+        ):
+            if values:
+                query = query.where(keyset_after(columns, values))
+            branches.append(select(query.order_by(*[c.desc() for c in columns]).limit(bound).subquery()))
+        feed = union(*branches).subquery()
+
+        result = await db.execute(
+            paginate(select(feed.c.post_id, feed.c.created_at), (feed.c.created_at, feed.c.post_id), cursor, skip, limit)
+        )
+        return result.all()
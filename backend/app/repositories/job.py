@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from app.core.config import settings
+from app.database.dialect import upsert
+from app.database.models import Job
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobRepository:
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession,
+        name: str,
+        payload: Optional[Dict[str, Any]] = None,
+        run_at: Optional[datetime] = None,
+        max_attempts: Optional[int] = None,
+        dedupe_key: Optional[str] = None,
+    ):
+        """
+        Queue a job. Does not commit: enqueued in the caller's transaction,
+        the job exists exactly when the write that needs it does.
+        A job whose `dedupe_key` is already taken is silently dropped.
+        """
+        stmt = upsert(db.get_bind().dialect.name, Job).values(
+            name=name,
+            payload=payload or {},
+            run_at=run_at or utcnow(),
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            dedupe_key=dedupe_key,
+        )
+        await db.execute(stmt.on_conflict_do_nothing(index_elements=[Job.dedupe_key]))
+
+    @staticmethod
+    async def claim(db: AsyncSession, worker_id: str, limit: int) -> List[Job]:
+        """
+        Atomically move up to `limit` due jobs to `running` for this worker.
+        On PostgreSQL concurrent workers skip each other's rows (SKIP LOCKED);
+        elsewhere the `status` check in the UPDATE keeps a job from being claimed twice.
+        """
+        now = utcnow()
+        due = (
+            select(Job.id)
+            .where(Job.status == "queued", Job.run_at <= now)
+            .order_by(Job.run_at, Job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id.in_(due.scalar_subquery()), Job.status == "queued")
+                .values(status="running", attempts=Job.attempts + 1, started_at=now, locked_by=worker_id)
+                .returning(Job)
+                .execution_options(synchronize_session=False)
+            )
+            jobs = result.scalars().all()
+            await db.commit()
+            return jobs
+        except Exception:
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def complete(db: AsyncSession, job_id: int):
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(status="done", finished_at=utcnow(), last_error=None)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def retry_or_fail(db: AsyncSession, job: Job, error: str) -> bool:
+        """
+        Record a failed attempt: requeue the job with exponential backoff, or
+        mark it `failed` once its attempts are used up. Returns True if requeued.
+        """
+        now = utcnow()
+        retry = job.attempts < job.max_attempts
+        values = {"last_error": error[:2000], "locked_by": None}
+        if retry:
+            delay = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            values.update(status="queued", run_at=now + timedelta(seconds=delay))
+        else:
+            values.update(status="failed", finished_at=now)
+        await db.execute(update(Job).where(Job.id == job.id).values(**values))
+        await db.commit()
+        return retry
+
+    @staticmethod
+    async def requeue_stale(db: AsyncSession, older_than: timedelta) -> int:
+        """
+        Return jobs left `running` by a worker that died to the queue.
+        The interrupted attempt still counts towards `max_attempts`.
+        """
+        cutoff = utcnow() - older_than
+        stale = (Job.status == "running", Job.started_at < cutoff)
+        failed = await db.execute(
+            update(Job)
+            .where(*stale, Job.attempts >= Job.max_attempts)
+            .values(status="failed", finished_at=utcnow(), last_error="Worker lost", locked_by=None)
+        )
+        requeued = await db.execute(
+            update(Job)
+            .where(*stale)
+            .values(status="queued", run_at=utcnow(), locked_by=None)
+        )
+        await db.commit()
+        return failed.rowcount + requeued.rowcount
+
+    @staticmethod
+    async def prune(db: AsyncSession, older_than: timedelta) -> int:
+        """ Delete finished (done or failed) jobs """
+        result = await db.execute(
+            delete(Job).where(Job.status.in_(("done", "failed")), Job.finished_at < utcnow() - older_than)
+        )
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def depth(db: AsyncSession) -> Dict[str, Any]:
+        """ Queue depth: jobs per status, due jobs and the age of the oldest due job """
+        now = utcnow()
+        counts = await db.execute(select(Job.status, func.count()).group_by(Job.status))
+        due = await db.execute(
+            select(func.count(), func.min(Job.run_at)).where(Job.status == "queued", Job.run_at <= now)
+        )
+        due_count, oldest = due.one()
+        if oldest is not None and oldest.tzinfo is None:  # SQLite returns naive UTC datetimes
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        return {
+            "by_status": dict(counts.all()),
+            "due": due_count,
+            "oldest_due_seconds": (now - oldest).total_seconds() if oldest else None,
+        }
+
+    @staticmethod
+    async def recent_timings(db: AsyncSession, limit: int = 1000):
+        """ Scheduling and execution timestamps of the most recently finished jobs """
+        result = await db.execute(
+            select(Job.name, Job.run_at, Job.started_at, Job.finished_at)
+            .where(Job.status == "done")
+            .order_by(Job.finished_at.desc())
+            .limit(limit)
+        )
+        return result.all()
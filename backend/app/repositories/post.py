@@ -1,21 +1,55 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Callable, List, Optional
+from sqlalchemy import update
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.sql import func, desc, case, cast
-from sqlalchemy.types import Float
+from sqlalchemy.sql import func
 from sqlalchemy.exc import SQLAlchemyError
-from app.database.models import Post, UserFollow
+from app.database.models import Category, Post, PostContent, User
+from app.core.pagination import paginate
+from app.database.search import NO_RANK, full_text_match
+from app.repositories.user_stats import UserStatsRepository
+from app.repositories.blob import BlobRepository
+from app.repositories.category import CategoryRepository
+from app.repositories.feed import FeedRepository
+from app.repositories.job import JobRepository
+from app.repositories.post_content import PostContentRepository
+from app.core.ranking import hot_score, wilson_score
 from sqlalchemy.orm import joinedload
 
+# Default, stable ordering of post listings; keyset cursors are built on it
+DEFAULT_ORDERING = (Post.created_at, Post.id)
+
+
+# Orderings (all descending) of the ranked sorts; each is backed by an index
+RANKED_ORDERINGS = {
+    'hot': (Post.hot_score, Post.id),
+    'wilson': (Post.wilson_score, Post.id),
+    'top': (Post.upvotes - Post.downvotes, Post.id),
+}
+RANKED_KEYS = {
+    'hot': lambda post: (post.hot_score, post.id),
+    'wilson': lambda post: (post.wilson_score, post.id),
+    'top': lambda post: (post.upvotes - post.downvotes, post.id),
+}
+
 class PostRepository:
     @staticmethod
     async def create(db: AsyncSession, post_data: dict) -> Post:
         """
-        Create a new post in the database.
+        Create a new post in the database and queue its post-processing job.
         """
         try:
             post = Post(**post_data)
             db.add(post)
+            await db.flush()
+            await UserStatsRepository.increment(db, post.author_id, uploads_count=1)
+            await CategoryRepository.increment_post_count(db, post.category_id, 1)
+            await JobRepository.enqueue(db, "posts.process_upload", {"post_id": post.id})
+            await JobRepository.enqueue(db, "posts.extract_text", {"post_id": post.id})
+            if post.blob_sha256:
+                await JobRepository.enqueue(db, "blobs.render_preview", {"blob_sha256": post.blob_sha256})
             await db.commit()
             await db.refresh(post)
             return post
@@ -24,15 +58,16 @@ class PostRepository:
             raise e
 
     @staticmethod
-    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 10) -> List[Post]:
+    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, sort: Optional[str] = None) -> List[Post]:
         """
         Retrieve all posts with pagination, including related category and author.
+        Returns up to `limit + 1` rows, newest (or highest ranked for `sort`) first.
         """
         result = await db.execute(
-            select(Post)
-            .options(joinedload(Post.category), joinedload(Post.author))
-            .offset(skip)
-            .limit(limit)
+            paginate(
+                select(Post).options(joinedload(Post.category), joinedload(Post.author)),
+                PostRepository.ordering(sort), cursor, skip, limit, tag=PostRepository.sort_name(sort)
+            )
         )
         return result.scalars().all()
 
@@ -49,19 +84,36 @@ class PostRepository:
         return result.scalars().first()
     
     @staticmethod
-    async def get_following(db: AsyncSession, user_id: int, skip: int, limit: int) -> List[Post]:
+    async def get_file_info(db: AsyncSession, post_id: int) -> Optional[Row]:
+        """
+        Retrieve only what is needed to serve a post's file and preview: its URL,
+        content hash and preview format.
+        """
+        result = await db.execute(
+            select(Post.file_url, Post.blob_sha256, Post.preview_format).filter(Post.id == post_id)
+        )
+        return result.first()
+
+    @staticmethod
+    async def ids_by_blob(db: AsyncSession, blob_sha256: str) -> List[int]:
+        result = await db.execute(select(Post.id).filter(Post.blob_sha256 == blob_sha256))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_by_ids(db: AsyncSession, post_ids: List[int]) -> List[Post]:
         """
-        Retrieve all posts created by users the given user is following.
+        Retrieve several posts in one query, including related category and author,
+        in the order of `post_ids`. Ids that no longer exist are skipped.
         """
+        if not post_ids:
+            return []
         result = await db.execute(
             select(Post)
             .options(joinedload(Post.category), joinedload(Post.author))
-            .join(UserFollow, Post.author_id == UserFollow.following_id)
-            .filter(UserFollow.follower_id == user_id)
-            .offset(skip)
-            .limit(limit)
+            .filter(Post.id.in_(post_ids))
         )
-        return result.scalars().all()
+        posts = {post.id: post for post in result.scalars().all()}
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
 
     @staticmethod
     async def get_by_user(db: AsyncSession, user_id: int) -> List[Post]:
@@ -88,11 +140,24 @@ class PostRepository:
     @staticmethod
     async def delete(db: AsyncSession, post_id: int):
         """
-        Delete a specific post by ID.
+        Delete a specific post by ID, releasing its file blob.
         """
         try:
             post = await db.get(Post, post_id)
             if post:
+                # The post's votes go with it, so they no longer count towards the author
+                await UserStatsRepository.increment(
+                    db, post.author_id,
+                    uploads_count=-1,
+                    upvotes_count=-(post.upvotes or 0),
+                    downvotes_count=-(post.downvotes or 0),
+                )
+                await CategoryRepository.increment_post_count(db, post.category_id, -1)
+                if post.blob_sha256:
+                    # An unreferenced file is removed later by the blob garbage collection
+                    await BlobRepository.release(db, post.blob_sha256)
+                await FeedRepository.remove_post(db, post_id)
+                await PostContentRepository.delete(db, post_id)
                 await db.delete(post)
                 await db.commit()
             else:
@@ -102,64 +167,91 @@ class PostRepository:
             raise e
 
     @staticmethod
-    async def search(db: AsyncSession, query: str, category_id: Optional[int] = None, sort: Optional[str] = None, skip: int = 0, limit: int = 10) -> List[Post]:
+    async def search(db: AsyncSession, query: str, category_id: Optional[int] = None, sort: Optional[str] = None, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Post]:
         """
-        Search for posts by title or description, optionally filtered by category and sorted.
+        Search for posts by title, description or document text, optionally filtered by category and sorted.
+        Uses the full-text indexes where the backend has them, substring matching otherwise.
+        Returns up to `limit + 1` rows, each with its text relevance in `search_rank`.
         """
         try:
-            # Calculate rating percentage in the query
-            total_votes = Post.upvotes + Post.downvotes
-            rating_percentage = case(
-                (total_votes > 0, 
-                 cast(Post.upvotes, Float) / cast(total_votes, Float) * 100),
-                else_=0
-            ).label('rating_percentage')
-
-            base_query = select(Post, rating_percentage).options(joinedload(Post.category), joinedload(Post.author))
-            
-            # Add search conditions
-            search_conditions = (Post.title.ilike(f"%{query}%")) | (Post.description.ilike(f"%{query}%"))
+            match = full_text_match(db.get_bind().dialect.name, query)
+            if match:
+                join, search_conditions, rank = match
+            else:
+                join, rank = None, NO_RANK
+                search_conditions = (
+                    Post.title.ilike(f"%{query}%")
+                    | Post.description.ilike(f"%{query}%")
+                    | Post.id.in_(select(PostContent.post_id).where(PostContent.body.ilike(f"%{query}%")))
+                )
+
+            base_query = select(Post, rank.label("search_rank")).options(joinedload(Post.category), joinedload(Post.author))
+            if join is not None:
+                base_query = base_query.join(*join)
             
             # Add category filter if provided and not None
             if category_id is not None:
                 search_conditions = search_conditions & (Post.category_id == category_id)
             
-            # Apply sorting
-            if sort == 'recent':
-                base_query = base_query.order_by(Post.created_at.desc())
-            elif sort == 'relevant':
-                # For relevant sorting, we'll use a combination of rating and recency
-                base_query = base_query.order_by(
-                    rating_percentage.desc(),
-                    Post.created_at.desc()
-                )
+            # Apply sorting: 'recent' (and no sort) use the default ordering,
+            # 'relevant' ranks by text relevance, then Wilson score, then recency;
+            # 'hot', 'wilson' and 'top' use the precomputed scores
+            ordering = PostRepository.ordering(sort, rank)
             
             result = await db.execute(
-                base_query
-                .filter(search_conditions)
-                .offset(skip)
-                .limit(limit)
+                paginate(base_query.filter(search_conditions), ordering, cursor, skip, limit,
+                         tag=PostRepository.sort_name(sort))
             )
-            
-            # Extract posts from the result
-            posts = [row[0] for row in result.all()]
+
+            posts = []
+            for post, search_rank in result.all():
+                post.search_rank = search_rank
+                posts.append(post)
             return posts
         except SQLAlchemyError as e:
             await db.rollback()
             raise e
 
     @staticmethod
-    async def search_by_category(db: AsyncSession, category_id: int, skip: int = 0, limit: int = 10) -> List[Post]:
+    def ordering(sort: Optional[str], rank=NO_RANK) -> tuple:
+        """
+        Columns a listing or search result is ordered by (all descending) for the given sort.
+        """
+        if sort == 'relevant':
+            return (rank, Post.wilson_score, *DEFAULT_ORDERING)
+        return RANKED_ORDERINGS.get(sort, DEFAULT_ORDERING)
+
+    @staticmethod
+    def sort_name(sort: Optional[str]) -> str:
+        """
+        Name of the ordering `sort` resolves to, stored in cursors so that a
+        cursor of one sort is rejected by another (hot and wilson keys look alike).
+        """
+        return sort if sort == 'relevant' or sort in RANKED_ORDERINGS else 'recent'
+
+    @staticmethod
+    def cursor_key(sort: Optional[str] = None) -> Callable[[Post], tuple]:
+        """
+        Values of a loaded post matching `ordering`, used to build its cursor.
+        """
+        if sort == 'relevant':
+            return lambda post: (post.search_rank, post.wilson_score, post.created_at, post.id)
+        return RANKED_KEYS.get(sort, lambda post: (post.created_at, post.id))
+
+    @staticmethod
+    async def search_by_category(db: AsyncSession, category_id: int, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, sort: Optional[str] = None) -> List[Post]:
         """
         Get all posts from a specific category.
+        Returns up to `limit + 1` rows, newest (or highest ranked for `sort`) first.
         """
         try:
             result = await db.execute(
-                select(Post)
-                .options(joinedload(Post.category), joinedload(Post.author))
-                .filter(Post.category_id == category_id)
-                .offset(skip)
-                .limit(limit)
+                paginate(
+                    select(Post)
+                    .options(joinedload(Post.category), joinedload(Post.author))
+                    .filter(Post.category_id == category_id),
+                    PostRepository.ordering(sort), cursor, skip, limit, tag=PostRepository.sort_name(sort)
+                )
             )
             return result.scalars().all()
         except SQLAlchemyError as e:
@@ -167,25 +259,43 @@ class PostRepository:
             raise e
 
     @staticmethod
-    async def update_vote_counts(db: AsyncSession, post: Post, is_upvote: bool, is_new_vote: bool, is_remove: bool):
-        """Update the upvotes and downvotes counts for a post."""
-        if is_remove:
-            if is_upvote:
-                post.upvotes -= 1
-            else:
-                post.downvotes -= 1
-        elif is_new_vote:
-            if is_upvote:
-                post.upvotes += 1
-            else:
-                post.downvotes += 1
-        else:
-            if is_upvote:
-                post.upvotes += 1
-                post.downvotes -= 1
-            else:
-                post.upvotes -= 1
-                post.downvotes += 1
+    async def apply_vote_delta(db: AsyncSession, post_id: int, upvotes_delta: int, downvotes_delta: int) -> Optional[Row]:
+        """
+        Atomically shift the vote counters of a post and return its fresh state,
+        together with the category name and author username, in one statement.
+        Does not commit: it is one step of the vote transaction.
+        Returns None if the post does not exist.
+        """
+        result = await db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(
+                upvotes=Post.upvotes + upvotes_delta,
+                downvotes=Post.downvotes + downvotes_delta,
+            )
+            .returning(
+                Post.id, Post.title, Post.description, Post.category_id, Post.author_id, Post.file_url,
+                Post.created_at, Post.upvotes, Post.downvotes, Post.blob_sha256, Post.preview_format,
+                select(Category.name).where(Category.id == Post.category_id).scalar_subquery().label("category_name"),
+                select(User.username).where(User.id == Post.author_id).scalar_subquery().label("author_username"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.first()
 
-        await db.commit()
-        await db.refresh(post)
\ No newline at end of file
+    @staticmethod
+    async def set_scores(db: AsyncSession, post_id: int, upvotes: int, downvotes: int, created_at: datetime):
+        """
+        Store the ranking scores for the given vote counters.
+        Does not commit: it follows `apply_vote_delta` in the vote transaction,
+        whose row lock keeps concurrent votes from interleaving.
+        """
+        await db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(
+                hot_score=hot_score(upvotes, downvotes, created_at),
+                wilson_score=wilson_score(upvotes, downvotes),
+            )
+            .execution_options(synchronize_session=False)
+        )
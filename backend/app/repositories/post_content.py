@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import delete, exists, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.database.dialect import upsert
+from app.database.models import Post, PostContent
+from app.database.search import content_snippets, render_snippet
+
+CONTENT_COLUMNS = ["post_id", "status", "body", "page_count", "truncated", "error", "extracted_at"]
+
+
+def _save(db: AsyncSession, source):
+    """Upsert the row selected by `source`; nothing is written if the post is gone"""
+    stmt = upsert(db.get_bind().dialect.name, PostContent).from_select(CONTENT_COLUMNS, source)
+    return db.execute(stmt.on_conflict_do_update(
+        index_elements=[PostContent.post_id],
+        set_={name: stmt.excluded[name] for name in CONTENT_COLUMNS[1:]},
+    ))
+
+
+class PostContentRepository:
+    """
+    Text extracted from post documents. Rows are written by the
+    `posts.extract_text` job; the write helpers do not commit.
+    """
+
+    @staticmethod
+    async def save(db: AsyncSession, post_id: int, status: str, body: str = "", page_count: int = 0,
+                   truncated: bool = False, error: Optional[str] = None):
+        """Store the extraction result of a post, replacing an earlier one"""
+        source = select(
+            literal(post_id, PostContent.post_id.type),
+            literal(status, PostContent.status.type),
+            literal(body, PostContent.body.type),
+            literal(page_count, PostContent.page_count.type),
+            literal(truncated, PostContent.truncated.type),
+            literal(error, PostContent.error.type),
+            literal(datetime.now(timezone.utc), PostContent.extracted_at.type),
+        ).where(exists().where(Post.id == post_id))
+        await _save(db, source)
+
+    @staticmethod
+    async def copy_from_blob(db: AsyncSession, post_id: int, blob_sha256: str) -> bool:
+        """
+        Reuse the text already extracted for another post with the same file.
+        Returns False if there is none.
+        """
+        source = (
+            select(
+                literal(post_id, PostContent.post_id.type),
+                PostContent.status, PostContent.body, PostContent.page_count,
+                PostContent.truncated, PostContent.error, PostContent.extracted_at,
+            )
+            .join(Post, Post.id == PostContent.post_id)
+            .where(
+                Post.blob_sha256 == blob_sha256,
+                PostContent.post_id != post_id,
+                PostContent.status == "done",
+                exists().where(Post.id == post_id),
+            )
+            .limit(1)
+        )
+        result = await _save(db, source)
+        return result.rowcount > 0
+
+    @staticmethod
+    async def get(db: AsyncSession, post_id: int) -> Optional[PostContent]:
+        return await db.get(PostContent, post_id)
+
+    @staticmethod
+    async def delete(db: AsyncSession, post_id: int):
+        await db.execute(delete(PostContent).where(PostContent.post_id == post_id))
+
+    @staticmethod
+    async def missing(db: AsyncSession, failed: bool = False) -> List[int]:
+        """IDs of posts without extracted text (and, with `failed`, those whose extraction failed)"""
+        extracted = select(PostContent.post_id).where(PostContent.post_id == Post.id)
+        if failed:
+            extracted = extracted.where(PostContent.status == "done")
+        result = await db.execute(select(Post.id).where(~exists(extracted)).order_by(Post.id))
+        return result.scalars().all()
+
+    @staticmethod
+    async def snippets(db: AsyncSession, query: str, post_ids: List[int]) -> Dict[int, str]:
+        """Excerpts of the document text around the terms of `query`, for the posts that match there"""
+        stmt = content_snippets(db.get_bind().dialect.name, query, post_ids)
+        if stmt is None:
+            return {}
+        result = await db.execute(stmt)
+        return {post_id: render_snippet(raw) for post_id, raw in result.all()}
@@ -0,0 +1,54 @@
+from typing import Optional
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.ranking import hot_score, wilson_score
+from app.database.models import Post
+
+
+class RankingRepository:
+    @staticmethod
+    def score_rows(rows) -> list:
+        """Parameters for `recompute_statement` from (id, upvotes, downvotes, created_at) rows"""
+        return [
+            {
+                "post_id": post_id,
+                "hot": hot_score(upvotes or 0, downvotes or 0, created_at),
+                "wilson": wilson_score(upvotes or 0, downvotes or 0),
+            }
+            for post_id, upvotes, downvotes, created_at in rows
+            if created_at is not None
+        ]
+
+    @staticmethod
+    def recompute_statement():
+        return (
+            update(Post.__table__)
+            .where(Post.__table__.c.id == bindparam("post_id"))
+            .values(hot_score=bindparam("hot"), wilson_score=bindparam("wilson"))
+        )
+
+    @staticmethod
+    async def recompute(db: AsyncSession, batch_size: int = 1000, since_id: Optional[int] = None) -> int:
+        """
+        Recompute the ranking scores of every post from its vote counters, in
+        id-ordered batches (one commit per batch). Needed after changing the
+        ranking parameters or to repair drift; votes keep scores current otherwise.
+        """
+        last_id, updated = since_id or 0, 0
+        while True:
+            result = await db.execute(
+                select(Post.id, Post.upvotes, Post.downvotes, Post.created_at)
+                .where(Post.id > last_id)
+                .order_by(Post.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                return updated
+            params = RankingRepository.score_rows(rows)
+            if params:
+                await db.execute(RankingRepository.recompute_statement(), params)
+            await db.commit()
+            updated += len(params)
+            last_id = rows[-1][0]
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database.models import User
 from app.schemas.user import UserUpdate
+from app.core.user_cache import invalidate_user
 
 
 class UserRepository:
@@ -28,6 +29,7 @@ class UserRepository:
             raise RuntimeError("User not found")
         await db.delete(user)
         await db.commit()
+        await invalidate_user(user_id)
 
     @staticmethod
     async def get_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
@@ -56,10 +58,12 @@ class UserRepository:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def update_profile(db: AsyncSession, current_user: User, user_data: UserUpdate) -> User:
-        """Update the profile of the current user."""
+    async def update_profile(db: AsyncSession, current_user, user_data: UserUpdate) -> User:
+        """Update the profile of the current user (an ORM user or a cached principal)."""
+        user = await db.get(User, current_user.id)
         for key, value in user_data.dict(exclude_unset=True).items():
-            setattr(current_user, key, value)
+            setattr(user, key, value)
         await db.commit()
-        await db.refresh(current_user)
-        return current_user
\ No newline at end of file
+        await db.refresh(user)
+        await invalidate_user(user.id)
+        return user
\ No newline at end of file
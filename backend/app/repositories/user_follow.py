@@ -1,7 +1,16 @@
+from typing import List, Optional
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.sql import func
-from app.database.models import UserFollow
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import exists, func, literal
+from app.core.pagination import paginate
+from app.database.models import User, UserFollow, UserStats
+from app.repositories.user_stats import UserStatsRepository
+from app.repositories.feed import FeedRepository, followers_count
+from app.core.config import settings
+
+SUMMARY_COUNTERS = ("followers_count", "following_count", "uploads_count")
 
 class UserFollowRepository:
     @staticmethod
@@ -11,6 +20,9 @@ class UserFollowRepository:
         """
         follow = UserFollow(follower_id=follower_id, following_id=following_id)
         db.add(follow)
+        await UserStatsRepository.increment(db, follower_id, following_count=1)
+        await UserStatsRepository.increment(db, following_id, followers_count=1)
+        await FeedRepository.backfill(db, follower_id, following_id)
         await db.commit()
         await db.refresh(follow)
         return follow
@@ -29,17 +41,54 @@ class UserFollowRepository:
         follow = result.scalar_one_or_none()
         if follow:
             await db.delete(follow)
+            await UserStatsRepository.increment(db, follower_id, following_count=-1)
+            await UserStatsRepository.increment(db, following_id, followers_count=-1)
+            await FeedRepository.prune(db, follower_id, following_id)
+            remaining = await db.execute(select(followers_count(following_id)))
+            if remaining.scalar() == settings.FEED_FANOUT_MAX_FOLLOWERS - 1:
+                await FeedRepository.fan_out_author(db, following_id)
             await db.commit()
 
     @staticmethod
-    async def get_followers(db: AsyncSession, user_id: int, limit: int, offset: int):
+    def _connections(user_column, other_column, user_id: int, viewer_id: Optional[int],
+                     skip: int, limit: int, cursor: Optional[str]):
         """
-        Get all followers of a user.
+        One page of a user's connections (followers or followed users),
+        hydrated with the profile counters and whether the viewer follows each of them.
         """
-        result = await db.execute(
-            select(UserFollow).filter(UserFollow.following_id == user_id).limit(limit).offset(offset)
+        is_following = literal(None)
+        if viewer_id:
+            viewer_follow = aliased(UserFollow)
+            is_following = exists().where(
+                viewer_follow.follower_id == viewer_id,
+                viewer_follow.following_id == User.id,
+            )
+        query = (
+            select(
+                UserFollow.id.label("follow_id"),
+                UserFollow.created_at.label("followed_at"),
+                User.id,
+                User.username,
+                User.full_name,
+                *[func.coalesce(getattr(UserStats, key), 0).label(key) for key in SUMMARY_COUNTERS],
+                is_following.label("is_following"),
+            )
+            .join(User, User.id == other_column)
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .where(user_column == user_id)
         )
-        return result.scalars().all()
+        return paginate(query, (UserFollow.created_at, UserFollow.id), cursor, skip, limit)
+
+    @staticmethod
+    async def get_followers(db: AsyncSession, user_id: int, limit: int, skip: int = 0,
+                            cursor: Optional[str] = None, viewer_id: Optional[int] = None) -> List[Row]:
+        """
+        Get the followers of a user, most recent first. Returns up to `limit + 1` rows.
+        """
+        result = await db.execute(UserFollowRepository._connections(
+            UserFollow.following_id, UserFollow.follower_id, user_id, viewer_id, skip, limit, cursor
+        ))
+        return result.all()
     
     @staticmethod
     async def get_followers_count(db: AsyncSession, user_id: int) -> int:
@@ -52,14 +101,15 @@ class UserFollowRepository:
         return result.scalar() or 0
 
     @staticmethod
-    async def get_following(db: AsyncSession, user_id: int, limit: int, offset: int):
+    async def get_following(db: AsyncSession, user_id: int, limit: int, skip: int = 0,
+                            cursor: Optional[str] = None, viewer_id: Optional[int] = None) -> List[Row]:
         """
-        Get all users a user is following.
+        Get the users a user is following, most recently followed first. Returns up to `limit + 1` rows.
         """
-        result = await db.execute(
-            select(UserFollow).filter(UserFollow.follower_id == user_id).limit(limit).offset(offset)
-        )
-        return result.scalars().all()
+        result = await db.execute(UserFollowRepository._connections(
+            UserFollow.follower_id, UserFollow.following_id, user_id, viewer_id, skip, limit, cursor
+        ))
+        return result.all()
     
     @staticmethod
     async def get_following_count(db: AsyncSession, user_id: int) -> int:
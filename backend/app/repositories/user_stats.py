@@ -0,0 +1,94 @@
+from typing import Iterable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+from sqlalchemy.future import select
+from sqlalchemy.sql import func, exists, true, literal
+from app.database.models import User, UserStats, UserFollow, Post, PostVote
+from app.database.dialect import upsert
+
+STAT_COLUMNS = ("followers_count", "following_count", "uploads_count", "upvotes_count", "downvotes_count")
+
+
+class UserStatsRepository:
+    @staticmethod
+    async def increment(db: AsyncSession, user_id: int, **deltas: int):
+        """
+        Shift a user's counters by the given deltas, creating the stats row if needed.
+        Does not commit: it runs inside the transaction of the write that caused it.
+        """
+        deltas = {key: value for key, value in deltas.items() if value}
+        if not deltas:
+            return
+        stmt = upsert(db.get_bind().dialect.name, UserStats).values(user_id=user_id, **deltas)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[UserStats.user_id],
+                set_={key: getattr(UserStats, key) + stmt.excluded[key] for key in deltas},
+            )
+        )
+
+    @staticmethod
+    async def get_profile(db: AsyncSession, username: str, viewer_id: Optional[int] = None) -> Optional[Row]:
+        """
+        Retrieve a user with their counters and, for a viewer, whether they follow the user.
+        """
+        is_following = literal(None)
+        if viewer_id:
+            is_following = exists().where(
+                UserFollow.follower_id == viewer_id,
+                UserFollow.following_id == User.id,
+            )
+        result = await db.execute(
+            select(
+                User,
+                *[func.coalesce(getattr(UserStats, key), 0).label(key) for key in STAT_COLUMNS],
+                is_following.label("is_following"),
+            )
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .filter(User.username == username)
+        )
+        return result.first()
+
+    @staticmethod
+    def reconcile_statement(dialect: str, user_ids: Optional[Iterable[int]] = None):
+        """
+        Build an upsert recomputing the counters of the given users
+        (or of everyone) from the source tables.
+        """
+        def votes_count(is_upvote: bool):
+            return (
+                select(func.count())
+                .select_from(PostVote)
+                .join(Post, Post.id == PostVote.post_id)
+                .where(Post.author_id == User.id, PostVote.is_upvote == is_upvote)
+                .scalar_subquery()
+            )
+
+        source = select(
+            User.id,
+            select(func.count()).where(UserFollow.following_id == User.id).scalar_subquery(),
+            select(func.count()).where(UserFollow.follower_id == User.id).scalar_subquery(),
+            select(func.count()).where(Post.author_id == User.id).scalar_subquery(),
+            votes_count(True),
+            votes_count(False),
+        )
+        # SQLite needs an explicit WHERE to parse INSERT ... SELECT ... ON CONFLICT
+        source = source.where(User.id.in_(list(user_ids)) if user_ids is not None else true())
+
+        stmt = upsert(dialect, UserStats).from_select(["user_id", *STAT_COLUMNS], source)
+        return stmt.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={key: stmt.excluded[key] for key in STAT_COLUMNS},
+        )
+
+    @staticmethod
+    async def reconcile(db: AsyncSession, user_ids: Optional[Iterable[int]] = None):
+        """
+        Recompute counters from the source tables, fixing any drift.
+        """
+        try:
+            await db.execute(UserStatsRepository.reconcile_statement(db.get_bind().dialect.name, user_ids))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, delete, insert
 from app.database.models import PostVote, Post
 
 
@@ -17,6 +17,17 @@ class VoteRepository:
         except Exception as e:
             raise
     
+    @staticmethod
+    async def get_votes(db: AsyncSession, user_id: int, post_ids: List[int]) -> Dict[int, bool]:
+        """A user's votes on several posts, in one query: post ID -> is_upvote (unvoted posts are absent)."""
+        if not post_ids:
+            return {}
+        result = await db.execute(
+            select(PostVote.post_id, PostVote.is_upvote)
+            .filter(PostVote.user_id == user_id, PostVote.post_id.in_(post_ids))
+        )
+        return dict(result.all())
+
     @staticmethod
     async def get_upvotes_count(db: AsyncSession, user_id: int) -> int:
         """Get the number of upvotes for a given user."""
@@ -46,24 +57,24 @@ class VoteRepository:
         return result.scalar() or 0
 
     @staticmethod
-    async def create_vote(db: AsyncSession, user_id: int, post_id: int, is_upvote: bool) -> PostVote:
-        """Create a new vote."""
-        vote = PostVote(user_id=user_id, post_id=post_id, is_upvote=is_upvote)
-        db.add(vote)
-        await db.commit()
-        await db.refresh(vote)
-        return vote
-
-    @staticmethod
-    async def update_vote(db: AsyncSession, vote: PostVote, is_upvote: bool) -> PostVote:
-        """Update an existing vote."""
-        vote.is_upvote = is_upvote
-        await db.commit()
-        await db.refresh(vote)
-        return vote
+    async def pop_vote(db: AsyncSession, user_id: int, post_id: int) -> Optional[bool]:
+        """
+        Delete a user's vote on a post and return its previous value.
+        Does not commit: it is one step of the vote transaction.
+        """
+        result = await db.execute(
+            delete(PostVote)
+            .where(PostVote.user_id == user_id, PostVote.post_id == post_id)
+            .returning(PostVote.is_upvote)
+        )
+        return result.scalar_one_or_none()
 
     @staticmethod
-    async def delete_vote(db: AsyncSession, vote: PostVote):
-        """Delete an existing vote."""
-        await db.delete(vote)
-        await db.commit()
\ No newline at end of file
+    async def add_vote(db: AsyncSession, user_id: int, post_id: int, is_upvote: bool):
+        """
+        Insert a user's vote on a post.
+        Does not commit: it is one step of the vote transaction.
+        """
+        await db.execute(
+            insert(PostVote).values(user_id=user_id, post_id=post_id, is_upvote=is_upvote)
+        )
\ No newline at end of file
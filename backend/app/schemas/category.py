@@ -8,6 +8,7 @@ class CategoryCreate(CategoryBase):
 
 class CategoryResponse(CategoryBase):
     id: int
+    post_count: int = 0
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        from_attributes = True
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -35,8 +35,16 @@ class PostResponse(PostBase):
     downvotes: int
     rating_percentage: float
     user_vote: Optional[bool] = None
+    # First-page thumbnail, once rendered; immutable, so safe to cache forever
+    preview_url: Optional[str] = None
+    # Search results matching in the document text: HTML-escaped excerpt, matches in <mark>
+    snippet: Optional[str] = None
     category: CategorySummary
     author: AuthorSummary
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PostPage(BaseModel):
+    items: List[PostResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,40 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+class PoolStats(BaseModel):
+    pid: int
+    pool: str
+    status: str
+    size: Optional[int] = None
+    checkedin: Optional[int] = None
+    checkedout: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+
+class ReplicaStatus(BaseModel):
+    index: int  # Position in DATABASE_REPLICA_URLS; URLs and errors stay in the logs
+    healthy: bool
+    pool: PoolStats
+
+class ReplicaReport(BaseModel):
+    replicas: List[ReplicaStatus]
+
+class JobTimings(BaseModel):
+    wait_avg_seconds: Optional[float] = None      # From scheduled time to start
+    wait_p95_seconds: Optional[float] = None
+    duration_avg_seconds: Optional[float] = None  # Run time
+    duration_p95_seconds: Optional[float] = None
+
+class JobWorkerStats(JobTimings):
+    worker_id: str
+    running: int
+    processed: int
+    failed: int
+    retried: int
+
+class JobQueueStats(BaseModel):
+    by_status: Dict[str, int]
+    due: int
+    oldest_due_seconds: Optional[float] = None
+    recent: JobTimings
+    worker: Optional[JobWorkerStats] = None  # In-process worker of the serving process, if enabled
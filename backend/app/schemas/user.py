@@ -1,7 +1,6 @@
-from pydantic import BaseModel, EmailStr, validator
-from app.core.hashing import get_password_hash
+from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class UserBase(BaseModel):
     username: str
@@ -11,11 +10,6 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
-    @validator("password", pre=True)
-    def hash_password(cls, value: str) -> str:
-        """Hash the password before saving"""
-        return get_password_hash(value)
-
 class UserUpdate(UserBase):
     full_name: str
 
@@ -39,4 +33,22 @@ class UserProfile(UserBase):
     is_following: Optional[bool] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class FollowUser(BaseModel):
+    """A follower or followed user, as listed on a profile"""
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    followers_count: int
+    following_count: int
+    uploads_count: int
+    followed_at: Optional[datetime] = None
+    is_following: Optional[bool] = None  # Whether the viewer follows this user; None when anonymous
+
+    class Config:
+        from_attributes = True
+
+class FollowPage(BaseModel):
+    items: List[FollowUser]
+    next_cursor: Optional[str] = None
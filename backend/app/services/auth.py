@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.user import UserRepository
 from app.repositories.auth import AuthRepository
 from app.core.jwt import create_access_token, create_refresh_token, verify_refresh_token
-from app.core.hashing import verify_password
+from app.core.hashing import verify_and_update
 
 
 class AuthService:
@@ -13,12 +13,22 @@ class AuthService:
     async def login(db: AsyncSession, form_data, request: Request, response: Response):
         """ Log in a user and issue JWT tokens """
         user = await UserRepository.get_by_email_or_username(db, form_data.username)
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
+        is_valid, new_hash = await verify_and_update(form_data.password, user.hashed_password)
+        if not is_valid:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid credentials"
+            )
+        if new_hash:
+            # Work factor changed: store the rehashed password with the new session
+            user.hashed_password = new_hash
+
         # Create new tokens
         access_token = create_access_token(str(user.id))
         refresh_token = create_refresh_token(str(user.id))
@@ -63,78 +73,58 @@ class AuthService:
                 detail="Invalid refresh token"
             )
 
+        new_access_token = create_access_token(user_id)
+        new_refresh_token = create_refresh_token(user_id)
         try:
-            # Get and lock the current session
-            current_session = await AuthRepository.get_and_lock_session(db, refresh_token)
-            
-            if current_session:
-                # Valid session found - proceed with token rotation
-                try:
-                    # Generate new tokens
-                    new_access_token = create_access_token(user_id)
-                    new_refresh_token = create_refresh_token(user_id)
-
-                    # First revoke the old token
-                    if not await AuthRepository.revoke_refresh_token(db, refresh_token):
-                        raise HTTPException(
-                            status_code=status.HTTP_401_UNAUTHORIZED,
-                            detail="Token already used"
-                        )
-
-                    # Then save the new token
-                    await AuthRepository.save_refresh_token(
-                        db, user_id, new_refresh_token,
-                        request.headers.get("Device-Id", "unknown_device"),
-                        request.client.host,
-                        request.headers.get("User-Agent")
-                    )
-
-                    # Set new refresh token cookie
-                    response.set_cookie(
-                        key="refresh_token",
-                        value=new_refresh_token,
-                        httponly=True,
-                        secure=False,
-                        samesite="Lax",
-                        path="/"
-                    )
-
-                    return {"access_token": new_access_token, "token_type": "bearer"}
-                except Exception as e:
-                    # If anything fails during token rotation, revoke the current token
-                    await AuthRepository.revoke_refresh_token(db, refresh_token)
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Failed to refresh token"
-                    )
-            else:
+            # Revoke the current session and store its successor in one transaction
+            new_session = await AuthRepository.rotate_refresh_token(
+                db, int(user_id), refresh_token, new_refresh_token,
+                request.headers.get("Device-Id", "unknown_device"),
+                request.client.host,
+                request.headers.get("User-Agent")
+            )
+            recent_session = None
+            if new_session is None:
                 # Check if token was recently used (within grace period)
                 recent_session = await AuthRepository.get_recent_session_by_token(
-                    db, 
-                    refresh_token, 
+                    db,
+                    refresh_token,
                     AuthService.GRACE_PERIOD_HOURS
                 )
-                
-                if recent_session:
-                    # Token reuse detected - revoke all sessions for security
-                    await AuthRepository.revoke_all_user_sessions(db, user_id)
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Security alert: Token reuse detected. Please log in again."
-                    )
-                
-                # Token is invalid and not recently used
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid or expired refresh token"
-                )
-        except Exception as e:
+        except Exception:
             # Handle any database errors
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to process refresh token"
             )
 
+        if new_session is None:
+            if recent_session:
+                # Token reuse detected - revoke all sessions for security
+                await AuthRepository.revoke_all_user_sessions(db, int(user_id))
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Security alert: Token reuse detected. Please log in again."
+                )
+
+            # Token is invalid and not recently used
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired refresh token"
+            )
+
+        # Set new refresh token cookie
+        response.set_cookie(
+            key="refresh_token",
+            value=new_refresh_token,
+            httponly=True,
+            secure=False,
+            samesite="Lax",
+            path="/"
+        )
+
+        return {"access_token": new_access_token, "token_type": "bearer"}
+
     @staticmethod
     async def logout(db: AsyncSession, request: Request, response: Response):
         """ Log out the current user by invalidating their refresh token """
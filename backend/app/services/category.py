@@ -1,10 +1,19 @@
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.category_cache import cache_catalog, get_cached_catalog
 from app.repositories.category import CategoryRepository
 from app.schemas.category import CategoryResponse
 
 class CategoryService:
     @staticmethod
     async def get_all(db: AsyncSession) -> List[CategoryResponse]:
-        """ Get all categories """
-        return await CategoryRepository.get_all(db)
\ No newline at end of file
+        """ Get all categories with their post counts, from the catalog cache when possible """
+        catalog = await get_cached_catalog()
+        if catalog is None:
+            catalog = await CategoryService.load_catalog(db)
+        return catalog
+
+    @staticmethod
+    async def load_catalog(db: AsyncSession) -> List[CategoryResponse]:
+        """ (Re)load the catalog cache from the database """
+        return await cache_catalog(await CategoryRepository.get_all(db))
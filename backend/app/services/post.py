@@ -1,56 +1,87 @@
-from typing import List, Optional
-from fastapi import HTTPException, UploadFile, status
+import logging
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from pathlib import Path
+from sqlalchemy.exc import IntegrityError
 from app.repositories.vote import VoteRepository
+from app.repositories.user_stats import UserStatsRepository
 from app.repositories.user import UserRepository
 from app.repositories.category import CategoryRepository
-from app.schemas.post import PostCreate, PostResponse
+from app.schemas.post import AuthorSummary, CategorySummary, PostCreate, PostResponse, PostPage
+from app.database.models import calculate_rating_percentage, post_preview_url
 from app.repositories.post import PostRepository
-from app.core.upload import upload_file
-from fastapi.concurrency import run_in_threadpool
+from app.repositories.post_content import PostContentRepository
+from app.repositories.blob import BlobRepository
+from app.repositories.feed import FeedRepository
+from app.core.upload import StoredUpload
+from app.core.blob_store import file_key, preview_key
+from app.core.pagination import build_page
+from app.core.response_cache import invalidate_post
+from app.core.category_cache import invalidate_catalog
+from app.core.jobs import notify_workers
+
+logger = logging.getLogger(__name__)
+
+async def _invalidate_caches(post_id: int, catalog: bool = False):
+    """
+    Drop cached responses after a committed change of a post. Best effort: a
+    cache outage must not fail the write, and stale entries expire on their own.
+    """
+    try:
+        await invalidate_post(post_id)
+        if catalog:
+            await invalidate_catalog()
+    except Exception:
+        logger.exception("Cache invalidation failed for post %s", post_id)
 
 class PostService:
     @staticmethod
-    async def create(db: AsyncSession, post_data: PostCreate, file: UploadFile, author_id: int) -> PostResponse:
+    async def create(db: AsyncSession, post_data: PostCreate, file: StoredUpload, author_id: int) -> PostResponse:
         """
-        Create a new post with file upload.
+        Create a new post for an already stored file upload.
+        If the post cannot be created, the unreferenced file is left to
+        the blob garbage collection.
         """
-        file_url = None
-        if file:
-            file_url = await PostService._handle_file_upload(file)
-
         post_dict = post_data.dict()
         post_dict.update({
             "author_id": author_id,
-            "file_url": file_url,
+            "file_url": file.url,
+            "blob_sha256": file.sha256,
         })
 
         try:
+            await BlobRepository.acquire(db, file.sha256, file.extension, file.size)
             post = await PostRepository.create(db, post_dict)
-            post_with_details = await PostRepository.get_by_id(db, post.id)
-            return post_with_details
         except Exception as e:
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error creating post: {str(e)}"
             )
 
+        notify_workers()
+        await _invalidate_caches(post.id, catalog=True)
+        return await PostRepository.get_by_id(db, post.id)
+
     @staticmethod
-    async def get_all(db: AsyncSession, skip: int, limit: int) -> List[PostResponse]:
+    async def get_all(db: AsyncSession, skip: int, limit: int, cursor: Optional[str] = None, sort: Optional[str] = None, viewer_id: Optional[int] = None) -> PostPage:
         """
         Retrieve all posts with pagination.
         """
-        posts = await PostRepository.get_all(db, skip=skip, limit=limit)
-        return posts
+        posts = await PostRepository.get_all(db, skip=skip, limit=limit, cursor=cursor, sort=sort)
+        await PostService._attach_votes(db, posts[:limit], viewer_id)
+        return PostService._page(posts, limit, sort)
     
     @staticmethod
-    async def get_following(db: AsyncSession, user_id: int, skip: int, limit: int) -> List[PostResponse]:
+    async def get_following(db: AsyncSession, user_id: int, skip: int, limit: int, cursor: Optional[str] = None) -> PostPage:
         """
-        Retrieve all posts created by users the current user follows.
+        Retrieve all posts created by users the current user follows, from their home timeline.
         """
-        posts = await PostRepository.get_following(db, user_id=user_id, skip=skip, limit=limit)
-        return posts
+        rows = await FeedRepository.get_timeline(db, user_id=user_id, skip=skip, limit=limit, cursor=cursor)
+        entries, next_cursor = build_page(rows, limit, lambda row: (row.created_at, row.post_id))
+        posts = await PostRepository.get_by_ids(db, [entry.post_id for entry in entries])
+        await PostService._attach_votes(db, posts, user_id)
+        return PostPage(items=posts, next_cursor=next_cursor)
     
     @staticmethod
     async def get_by_id(db: AsyncSession, post_id: int, user_id: Optional[int] = None) -> PostResponse:
@@ -81,12 +112,22 @@ class PostService:
             created_at=post.created_at,
             rating_percentage=post.rating_percentage,
             user_vote=user_vote,
+            preview_url=post.preview_url,
             category=post.category,
             author=post.author,
         )
 
     @staticmethod
-    async def get_by_user(db: AsyncSession, username: str) -> List[PostResponse]:
+    async def get_batch(db: AsyncSession, post_ids: List[int], viewer_id: Optional[int] = None) -> List[PostResponse]:
+        """
+        Retrieve several posts at once, in the requested order; unknown IDs are skipped.
+        """
+        posts = await PostRepository.get_by_ids(db, post_ids)
+        await PostService._attach_votes(db, posts, viewer_id)
+        return posts
+
+    @staticmethod
+    async def get_by_user(db: AsyncSession, username: str, viewer_id: Optional[int] = None) -> List[PostResponse]:
         """
         Retrieve all posts created by a specific user.
         """
@@ -98,6 +139,7 @@ class PostService:
             )
         
         posts = await PostRepository.get_by_user(db, user.id)
+        await PostService._attach_votes(db, posts, viewer_id)
         return posts
 
     @staticmethod
@@ -119,96 +161,146 @@ class PostService:
             )
 
         await PostRepository.delete(db, post_id)
+        await _invalidate_caches(post_id, catalog=True)
 
     @staticmethod
-    async def get_file_url(db: AsyncSession, post_id: int) -> str:
+    async def get_file(db: AsyncSession, post_id: int) -> Tuple[str, Optional[str]]:
         """
-        Retrieve the file URL for a specific post.
+        Resolve the stored file of a post to its storage key and content hash.
         """
-        post = await PostRepository.get_by_id(db, post_id)
+        post = await PostRepository.get_file_info(db, post_id)
         if not post or not post.file_url:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found in the database"
             )
 
-        file_path = Path("static/uploads") / Path(post.file_url).name
-        if not file_path.exists():
+        key = file_key(post.file_url)
+        if key is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"File not found on the server: {file_path}"
+                detail="File not found on the server"
             )
 
-        return str(file_path)
+        return key, post.blob_sha256
 
     @staticmethod
-    async def search(db: AsyncSession, query: str, category_id: Optional[int] = None, sort: Optional[str] = None, skip: int = 0, limit: int = 10) -> List[PostResponse]:
+    async def get_preview(db: AsyncSession, post_id: int) -> Tuple[str, str]:
         """
-        Search for posts by title, description, or category.
+        Resolve the first-page thumbnail of a post to its storage key and content hash.
+        """
+        post = await PostRepository.get_file_info(db, post_id)
+        if not post or post.preview_format in (None, "none"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Preview not available"
+            )
+        return preview_key(post.blob_sha256, post.preview_format), post.blob_sha256
+
+    @staticmethod
+    async def search(db: AsyncSession, query: str, category_id: Optional[int] = None, sort: Optional[str] = None, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, viewer_id: Optional[int] = None) -> PostPage:
+        """
+        Search for posts by title, description or document text. Posts matching
+        in their document come with a snippet of it.
         """
         if not query:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Search query cannot be empty"
             )
-        posts = await PostRepository.search(db, query=query, category_id=category_id, sort=sort, skip=skip, limit=limit)
-        return posts
+        posts = await PostRepository.search(db, query=query, category_id=category_id, sort=sort, skip=skip, limit=limit, cursor=cursor)
+        snippets = await PostContentRepository.snippets(db, query, [post.id for post in posts[:limit]])
+        for post in posts:
+            post.snippet = snippets.get(post.id)
+        await PostService._attach_votes(db, posts[:limit], viewer_id)
+        return PostService._page(posts, limit, sort)
 
     @staticmethod
-    async def search_by_category(db: AsyncSession, category_id: int, skip: int = 0, limit: int = 10) -> List[PostResponse]:
+    async def search_by_category(db: AsyncSession, category_id: int, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, sort: Optional[str] = None, viewer_id: Optional[int] = None) -> PostPage:
         """
         Get all posts from a specific category.
         """
-        posts = await PostRepository.search_by_category(db, category_id=category_id, skip=skip, limit=limit)
-        return posts
+        posts = await PostRepository.search_by_category(db, category_id=category_id, skip=skip, limit=limit, cursor=cursor, sort=sort)
+        await PostService._attach_votes(db, posts[:limit], viewer_id)
+        return PostService._page(posts, limit, sort)
 
     @staticmethod
-    async def _handle_file_upload(file: UploadFile) -> str:
+    async def _attach_votes(db: AsyncSession, posts: List, viewer_id: Optional[int]):
         """
-        Handle file upload and return the uploaded file URL.
+        Set `user_vote` on the posts of a page for the viewer, with one query for the whole page.
         """
-        try:
-            return await run_in_threadpool(upload_file, file)
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"File upload failed: {str(e)}"
-            )
-    
+        if not viewer_id or not posts:
+            return
+        votes = await VoteRepository.get_votes(db, viewer_id, [post.id for post in posts])
+        for post in posts:
+            post.user_vote = votes.get(post.id)
+
+    @staticmethod
+    def _page(posts: List, limit: int, sort: Optional[str] = None) -> PostPage:
+        """
+        Wrap a look-ahead result (`limit + 1` rows) into a page with the next cursor.
+        """
+        items, next_cursor = build_page(posts, limit, PostRepository.cursor_key(sort), tag=PostRepository.sort_name(sort))
+        return PostPage(items=items, next_cursor=next_cursor)
+
     @staticmethod
     async def vote(db: AsyncSession, user_id: int, post_id: int, is_upvote: Optional[bool]) -> PostResponse:
         """
         Handle voting logic (upvote, downvote, or remove vote).
+        Repeating the current vote removes it. The vote row and the post counters
+        are changed in a single transaction, with counters updated in SQL.
         """
-        post = await PostRepository.get_by_id(db, post_id)
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Post not found"
-            )
-
-        existing_vote = await VoteRepository.get_vote(db, user_id, post_id)
-
-        if is_upvote is None:
-            if not existing_vote:
+        try:
+            previous_vote = await VoteRepository.pop_vote(db, user_id, post_id)
+            if is_upvote is None and previous_vote is None:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"You have not voted on this post"
                 )
-            await VoteRepository.delete_vote(db, existing_vote)
-            await PostRepository.update_vote_counts(db, post, is_upvote=existing_vote.is_upvote, is_new_vote=False, is_remove=True)
-        elif existing_vote and existing_vote.is_upvote == is_upvote and is_upvote is True:
-            await VoteRepository.delete_vote(db, existing_vote)
-            await PostRepository.update_vote_counts(db, post, is_upvote=True, is_new_vote=False, is_remove=True)
-        elif existing_vote and existing_vote.is_upvote == is_upvote and is_upvote is False:
-            await VoteRepository.delete_vote(db, existing_vote)
-            await PostRepository.update_vote_counts(db, post, is_upvote=False, is_new_vote=False, is_remove=True)
-        else:
-            if not existing_vote:
-                await VoteRepository.create_vote(db, user_id, post_id, is_upvote)
-                await PostRepository.update_vote_counts(db, post, is_upvote=is_upvote, is_new_vote=True, is_remove=False)
-            else:
-                await VoteRepository.update_vote(db, existing_vote, is_upvote)
-                await PostRepository.update_vote_counts(db, post, is_upvote=is_upvote, is_new_vote=False, is_remove=False)
-
-        return await PostService.get_by_id(db, post_id, user_id)
\ No newline at end of file
+
+            new_vote = None if is_upvote is None or is_upvote == previous_vote else is_upvote
+            upvotes_delta = (new_vote is True) - (previous_vote is True)
+            downvotes_delta = (new_vote is False) - (previous_vote is False)
+            # Counters first: a missing post is a 404 before the vote row could
+            # violate its foreign key (which would look like the race below)
+            post = await PostRepository.apply_vote_delta(db, post_id, upvotes_delta, downvotes_delta)
+            if not post:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Post not found"
+                )
+            if new_vote is not None:
+                await VoteRepository.add_vote(db, user_id, post_id, new_vote)
+
+            await PostRepository.set_scores(db, post_id, post.upvotes, post.downvotes, post.created_at)
+            await UserStatsRepository.increment(
+                db, post.author_id, upvotes_count=upvotes_delta, downvotes_count=downvotes_delta
+            )
+            await db.commit()
+        except HTTPException:
+            await db.rollback()
+            raise
+        except IntegrityError:
+            # A concurrent vote by the same user on the same post won the race
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Vote is already being processed"
+            )
+
+        await _invalidate_caches(post_id)
+        return PostResponse(
+            id=post.id,
+            title=post.title,
+            description=post.description,
+            category_id=post.category_id,
+            file_url=post.file_url,
+            upvotes=post.upvotes,
+            downvotes=post.downvotes,
+            created_at=post.created_at,
+            rating_percentage=calculate_rating_percentage(post.upvotes, post.downvotes),
+            user_vote=new_vote,
+            preview_url=post_preview_url(post.id, post.blob_sha256, post.preview_format),
+            category=CategorySummary(id=post.category_id, name=post.category_name),
+            author=AuthorSummary(id=post.author_id, username=post.author_username),
+        )
@@ -1,11 +1,10 @@
 import uuid
-import shutil
-from pathlib import Path
 from fastapi import UploadFile, File, HTTPException
+from app.core.blob_store import UPLOAD_URL_PREFIX
+from app.core.storage import storage
 
-# Директория для загрузки файлов
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)  # Создаем, если нет
+# Префикс ключей изображений в хранилище
+IMAGE_PREFIX = "images/"
 
 
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}  # Разрешенные форматы
@@ -13,27 +12,21 @@ MAX_FILE_SIZE = 2 * 1024 * 1024  # 2MB
 
 class UploadService:
     @staticmethod
-    def upload_image(file: UploadFile = File(...)):
-        """Загружает изображение и возвращает URL"""
+    async def upload_image(file: UploadFile = File(...)):
+        """Загружает изображение в хранилище и возвращает URL"""
 
         # Проверка формата
         file_extension = file.filename.split(".")[-1].lower()
         if file_extension not in ALLOWED_EXTENSIONS:
             raise HTTPException(status_code=400, detail="Неверный формат файла")
 
-        # Проверка размера
-        file.file.seek(0, 2)  # Перемещаемся в конец файла
-        file_size = file.file.tell()
-        file.file.seek(0)  # Возвращаемся в начало
-        if file_size > MAX_FILE_SIZE:
+        # Проверка размера (читаем не больше лимита + 1 байт)
+        data = await file.read(MAX_FILE_SIZE + 1)
+        if len(data) > MAX_FILE_SIZE:
             raise HTTPException(status_code=400, detail="Файл слишком большой (макс. 2MB)")
 
-        # Генерируем уникальное имя файла
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = UPLOAD_DIR / unique_filename
+        # Генерируем уникальный ключ и сохраняем файл
+        key = f"{IMAGE_PREFIX}{uuid.uuid4()}.{file_extension}"
+        await storage.put(key, data, content_type=file.content_type)
 
-        # Сохраняем файл
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        return {"url": f"/static/uploads/{unique_filename}"}
+        return {"url": UPLOAD_URL_PREFIX + key}
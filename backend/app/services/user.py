@@ -2,11 +2,9 @@ from typing import Optional
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.user import UserRepository
-from app.repositories.user_follow import UserFollowRepository
-from app.repositories.post import PostRepository
-from app.repositories.vote import VoteRepository
+from app.repositories.user_stats import UserStatsRepository
 from app.schemas.user import UserCreate, UserResponse, UserUpdate, UserProfile
-from app.core.hashing import get_password_hash
+from app.core.hashing import hash_password
 
 
 class UserService:
@@ -17,7 +15,9 @@ class UserService:
         if existing_user:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
 
-        new_user = await UserRepository.create(db, user_data.dict())
+        user_dict = user_data.dict()
+        user_dict["password"] = await hash_password(user_data.password)
+        new_user = await UserRepository.create(db, user_dict)
         return new_user
 
     @staticmethod
@@ -46,36 +46,27 @@ class UserService:
     @staticmethod
     async def get_profile(db: AsyncSession, username: str, user_id: Optional[int] = None) -> UserProfile:
         """Get a profile of a user by their username"""
-        user = await UserRepository.get_by_username(db, username)
+        row = await UserStatsRepository.get_profile(db, username, viewer_id=user_id)
 
-        if not user:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        
-        followers_count = await UserFollowRepository.get_followers_count(db, user.id)
-        following_count = await UserFollowRepository.get_following_count(db, user.id)
-        uploads_count = await PostRepository.get_posts_count(db, user.id)
-        upvotes_count = await VoteRepository.get_upvotes_count(db, user.id)
-        downvotes_count = await VoteRepository.get_downvotes_count(db, user.id)
+        user = row.User
 
-        is_following = None
-        if user_id:
-            is_following = await UserFollowRepository.is_following(db, user_id, user.id)
-        
         user_profile = UserProfile(
             id=user.id,
             username=user.username,
             full_name=user.full_name,
             email=user.email,
-            followers_count=followers_count,
-            following_count=following_count,
-            uploads_count=uploads_count,
-            upvotes_count=upvotes_count,
-            downvotes_count=downvotes_count,
+            followers_count=row.followers_count,
+            following_count=row.following_count,
+            uploads_count=row.uploads_count,
+            upvotes_count=row.upvotes_count,
+            downvotes_count=row.downvotes_count,
             created_at=user.created_at,
             is_active=user.is_active,
-            is_following=is_following,
+            is_following=row.is_following,
         )
         return user_profile
\ No newline at end of file
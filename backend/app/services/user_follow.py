@@ -1,6 +1,9 @@
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.repositories.user_follow import UserFollowRepository
+from app.schemas.user import FollowPage, FollowUser
+from app.core.pagination import build_page
 
 class UserFollowService:
     @staticmethod
@@ -22,9 +25,22 @@ class UserFollowService:
         await UserFollowRepository.unfollow_user(db, follower_id, following_id)
 
     @staticmethod
-    async def get_followers(db: AsyncSession, user_id: int, limit: int, offset: int):
-        return await UserFollowRepository.get_followers(db, user_id, limit=limit, offset=offset)
+    async def get_followers(db: AsyncSession, user_id: int, limit: int, skip: int = 0,
+                            cursor: Optional[str] = None, viewer_id: Optional[int] = None) -> FollowPage:
+        rows = await UserFollowRepository.get_followers(
+            db, user_id, limit=limit, skip=skip, cursor=cursor, viewer_id=viewer_id
+        )
+        return UserFollowService._page(rows, limit)
 
     @staticmethod
-    async def get_following(db: AsyncSession, user_id: int, limit: int, offset: int):
-        return await UserFollowRepository.get_following(db, user_id, limit=limit, offset=offset)
\ No newline at end of file
+    async def get_following(db: AsyncSession, user_id: int, limit: int, skip: int = 0,
+                            cursor: Optional[str] = None, viewer_id: Optional[int] = None) -> FollowPage:
+        rows = await UserFollowRepository.get_following(
+            db, user_id, limit=limit, skip=skip, cursor=cursor, viewer_id=viewer_id
+        )
+        return UserFollowService._page(rows, limit)
+
+    @staticmethod
+    def _page(rows, limit: int) -> FollowPage:
+        items, next_cursor = build_page(rows, limit, lambda row: (row.followed_at, row.follow_id))
+        return FollowPage(items=[FollowUser.model_validate(row) for row in items], next_cursor=next_cursor)
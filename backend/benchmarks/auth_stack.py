@@ -0,0 +1,71 @@
+"""
+Micro-benchmark of the auth dependency stack: access-token verification
+(cold, and from the verified-token cache) and `get_current_user` with the
+principal served from the user cache. Uses the configured JWT keys, plus
+throwaway RS256 and EdDSA keys for comparison. Needs no database.
+
+Usage (from the backend directory):
+    python -m benchmarks.auth_stack              # 20000 iterations
+    python -m benchmarks.auth_stack 100000
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from app.core import jwt as tokens
+from app.core.deps import get_current_user
+from app.core.user_cache import cache_user
+from app.database.models import User
+
+
+def timed(label: str, iterations: int, fn):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<44} {elapsed / iterations * 1e6:9.2f} µs/op")
+
+
+def bench_keyring(label: str, keyring: tokens.KeyRing, iterations: int):
+    tokens.keyring = keyring
+    token = tokens.create_access_token("1")
+
+    def cold():
+        tokens._verified.clear()
+        tokens.decode_access_token(token)
+
+    timed(f"{label} decode, cold", iterations, cold)
+    timed(f"{label} decode, cached", iterations, lambda: tokens.decode_access_token(token))
+    return token
+
+
+async def bench_dependency(token: str, iterations: int):
+    await cache_user(User(
+        id=1, username="bench", email="bench@example.com", full_name=None,
+        is_active=True, created_at=datetime.now(timezone.utc),
+    ))
+    request = SimpleNamespace(state=SimpleNamespace())
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await get_current_user(request, db=None, token=token)
+    elapsed = time.perf_counter() - started
+    print(f"{'get_current_user (cached token + principal)':<44} {elapsed / iterations * 1e6:9.2f} µs/op")
+
+
+def main(iterations: int):
+    configured = tokens.keyring
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ed_key = ed25519.Ed25519PrivateKey.generate()
+
+    token = bench_keyring(f"configured ({configured.algorithm})", configured, iterations)
+    bench_keyring("RS256", tokens.KeyRing("RS256", rsa_key, "rsa", {"rsa": (rsa_key.public_key(), "RS256")}), iterations // 10)
+    bench_keyring("EdDSA", tokens.KeyRing("EdDSA", ed_key, "ed", {"ed": (ed_key.public_key(), "EdDSA")}), iterations // 10)
+
+    tokens.keyring = configured
+    asyncio.run(bench_dependency(token, iterations))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if sys.argv[1:] else 20000)
@@ -0,0 +1,88 @@
+"""
+Login throughput under concurrent load.
+
+Fires CONCURRENCY concurrent logins (REQUESTS in total) at the app in-process,
+while a probe keeps hitting a cheap endpoint to show how much the event loop
+is blocked. Runs against a throwaway SQLite database, with login rate limiting
+switched off: every request logs in as the same user and would otherwise be
+rejected with 429 after LOGIN_RATE_LIMIT_PER_USERNAME attempts.
+
+Usage (from the backend directory):
+    python -m benchmarks.login_throughput [--requests 64] [--concurrency 16] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx  # noqa: E402
+import main  # noqa: E402
+from app.core import rate_limit  # noqa: E402
+from app.core.hashing import get_password_hash  # noqa: E402
+from app.database.models import User  # noqa: E402
+from app.database.session import SessionLocal  # noqa: E402
+
+
+async def setup():
+    await main.startup()
+    rate_limit.rate_limiter = None  # Measure hashing, not the limiter
+    async with SessionLocal() as db:
+        db.add(User(username="bench", email="bench@example.com", hashed_password=get_password_hash("secret")))
+        await db.commit()
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/api/v1/categories/")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def run(requests: int, concurrency: int):
+    await setup()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    data={"username": "bench", "password": "secret"},
+                    headers={"Device-Id": "bench"},
+                )
+                response.raise_for_status()
+
+        stop, latencies = asyncio.Event(), []
+        probe_task = asyncio.create_task(probe(client, stop, latencies))
+        started = time.perf_counter()
+        await asyncio.gather(*[login() for _ in range(requests)])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    latencies.sort()
+    print(f"logins: {requests} at concurrency {concurrency} in {elapsed:.2f}s "
+          f"-> {requests / elapsed:.1f} logins/s")
+    if latencies:
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+        print(f"probe GET /categories/ during load: n={len(latencies)} "
+              f"p50={statistics.median(latencies) * 1000:.1f}ms p95={p95 * 1000:.1f}ms "
+              f"max={latencies[-1] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=None, help="override PASSWORD_HASH_ROUNDS")
+    args = parser.parse_args()
+    if args.rounds:
+        from app.core import hashing
+        hashing.pwd_context.update(bcrypt__rounds=args.rounds)
+    asyncio.run(run(args.requests, args.concurrency))
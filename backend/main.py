@@ -1,17 +1,40 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from app.api.v1 import users, auth, posts, categories, user_follow
+from app.api.v1 import users, auth, posts, categories, user_follow, system
 from app.core.config import settings
 from app.database.models import Base
+from app.database.session import SessionLocal, engine, replica_router
+from app.database.search import install_content_search_index, install_search_index
+from app.core.extraction import check_extraction_support, shutdown_extraction
+from app.core.hashing import shutdown_hashing
+from app.core.previews import check_preview_support
+from app.core.storage import LocalStorage, storage
+from app.core.blob_store import UPLOAD_URL_PREFIX
+from app.core.downloads import stored_file_redirect
+from app.core.response_cache import ResponseCacheMiddleware
+from app.services.category import CategoryService
+from app.core.jobs import job_worker
+import app.jobs.tasks  # Registers the job handlers
 from admin.config import setup_admin
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
-SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 app = FastAPI()
 
+# Cache of anonymous listing / detail responses, invalidated on post and category changes
+# (added first so that it runs inside CORS and cached responses get CORS headers)
+app.add_middleware(
+    ResponseCacheMiddleware,
+    routes=[
+        (r"/api/v1/posts/", lambda match: ["posts"]),
+        (r"/api/v1/posts/search(/category)?", lambda match: ["posts"]),
+        (r"/api/v1/posts/(?P<id>\d+)", lambda match: [f"post:{match['id']}", "category-names"]),
+        (r"/api/v1/categories/", lambda match: ["categories"]),
+    ],
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_body_bytes=settings.RESPONSE_CACHE_MAX_BODY_BYTES,
+)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -27,12 +50,35 @@ app.include_router(user_follow.router, prefix="/api/v1/user_follow", tags=["User
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
 app.include_router(posts.router, prefix="/api/v1/posts", tags=["Posts"])
 app.include_router(categories.router, prefix="/api/v1/categories", tags=["Categories"])
+app.include_router(system.router, prefix="/api/v1/system", tags=["System"])
+# Uploaded files: served from disk for local storage, redirected to the object store otherwise
+if isinstance(storage, LocalStorage):
+    app.mount(UPLOAD_URL_PREFIX.rstrip("/"), StaticFiles(directory=storage.root), name="uploads")
+else:
+    app.add_api_route(UPLOAD_URL_PREFIX + "{key:path}", stored_file_redirect, methods=["GET"], include_in_schema=False)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 @app.on_event("startup")
 async def startup():
+    check_extraction_support()
+    check_preview_support()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(install_search_index)
+        await conn.run_sync(install_content_search_index)
+    async with SessionLocal() as db:
+        await CategoryService.load_catalog(db)
+    replica_router.start_health_checks(settings.DATABASE_REPLICA_HEALTH_INTERVAL_SECONDS)
+    if settings.JOB_WORKER_IN_PROCESS:
+        job_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_worker.stop()
+    shutdown_hashing()
+    shutdown_extraction()
+    await replica_router.dispose()
+    await engine.dispose()
 
 # Setup SQLAdmin
 setup_admin(app, engine)
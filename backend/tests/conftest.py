@@ -0,0 +1,31 @@
+"""
+Shared fixtures. Run from the backend directory: python -m pytest tests
+"""
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.database.models import Base, Category, Post, User
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(tmp_path):
+    """Session on a fresh SQLite database holding two users, a category and a post by the first user"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        session.add_all([
+            User(id=1, username="author", email="author@example.com", hashed_password="-"),
+            User(id=2, username="voter", email="voter@example.com", hashed_password="-"),
+            Category(id=1, name="Math"),
+        ])
+        await session.flush()
+        session.add(Post(id=1, title="Algebra", description="", category_id=1, file_url="/static/uploads/a.pdf",
+                         author_id=1, upvotes=0, downvotes=0))
+        await session.commit()
+        yield session
+    await engine.dispose()
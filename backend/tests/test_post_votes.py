@@ -0,0 +1,70 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from app.database.models import Post, PostVote, UserStats
+from app.repositories.vote import VoteRepository
+from app.services.post import PostService
+
+pytestmark = pytest.mark.anyio
+
+AUTHOR, VOTER, POST = 1, 2, 1
+
+
+async def state(db):
+    """Post counters, the voter's vote and the author's vote counters, as stored"""
+    db.expire_all()
+    post = await db.get(Post, POST)
+    vote = await db.scalar(select(PostVote.is_upvote).where(PostVote.user_id == VOTER, PostVote.post_id == POST))
+    stats = await db.get(UserStats, AUTHOR)
+    received = (stats.upvotes_count, stats.downvotes_count) if stats else (0, 0)
+    return (post.upvotes, post.downvotes), vote, received
+
+
+@pytest.mark.parametrize("previous, is_upvote, expected_vote", [
+    (None, True, True),     # upvote
+    (None, False, False),   # downvote
+    (True, True, None),     # repeating the upvote removes it
+    (False, False, None),   # repeating the downvote removes it
+    (True, False, False),   # switch to a downvote
+    (False, True, True),    # switch to an upvote
+    (True, None, None),     # explicit removal
+])
+async def test_vote_transitions(db, previous, is_upvote, expected_vote):
+    if previous is not None:
+        await PostService.vote(db, VOTER, POST, previous)
+
+    response = await PostService.vote(db, VOTER, POST, is_upvote)
+
+    counters = (int(expected_vote is True), int(expected_vote is False))
+    assert response.user_vote is expected_vote
+    assert (response.upvotes, response.downvotes) == counters
+    assert await state(db) == (counters, expected_vote, counters)
+
+
+async def test_removing_a_missing_vote(db):
+    with pytest.raises(HTTPException) as error:
+        await PostService.vote(db, VOTER, POST, None)
+    assert error.value.status_code == 400
+
+
+async def test_vote_on_missing_post(db):
+    with pytest.raises(HTTPException) as error:
+        await PostService.vote(db, VOTER, 404, True)
+    assert error.value.status_code == 404
+    assert await db.scalar(select(PostVote.id)) is None
+
+
+async def test_concurrent_vote_is_a_conflict(db, monkeypatch):
+    add_vote = VoteRepository.add_vote
+
+    async def racing_add_vote(session, user_id, post_id, is_upvote):
+        # Another request of the same user inserts its vote first
+        await add_vote(session, user_id, post_id, not is_upvote)
+        await add_vote(session, user_id, post_id, is_upvote)
+
+    monkeypatch.setattr(VoteRepository, "add_vote", staticmethod(racing_add_vote))
+    with pytest.raises(HTTPException) as error:
+        await PostService.vote(db, VOTER, POST, True)
+    assert error.value.status_code == 409
+    # Rolled back as a whole: neither the counters nor a vote were written
+    assert await state(db) == ((0, 0), None, (0, 0))
@@ -0,0 +1,45 @@
+import pytest
+from app.core.rate_limit import sliding_window_retry_after
+
+LIMIT, WINDOW = 10, 60.0
+
+
+@pytest.mark.parametrize("previous, current, elapsed, expected", [
+    (0, 9, 0.0, None),       # the last hit of an empty sliding window
+    (10, 4, 30.0, None),     # half of the previous window still counts: 5 + 4 + 1
+    (10, 0, 0.0, 6.0),       # the previous window counts in full right at the switch
+    (10, 5, 30.0, 6.0),      # fits later in this window
+    (10, 9, 59.0, 1.0),      # only once the previous window has slid out entirely
+    (0, 10, 30.0, 36.0),     # only in the next window, once 1/10 of this one slid out
+    (10, 10, 30.0, 36.0),    # the previous window no longer matters then
+    (0, 10, 60.0, 6.0),      # at the very end of the window
+])
+def test_retry_after(previous, current, elapsed, expected):
+    retry_after = sliding_window_retry_after(previous, current, elapsed, LIMIT, WINDOW)
+    if expected is None:
+        assert retry_after is None
+    else:
+        assert retry_after == pytest.approx(expected)
+
+
+def test_single_hit_limit():
+    # One hit per window: the next one fits exactly a window after it
+    assert sliding_window_retry_after(0, 0, 10.0, 1, WINDOW) is None
+    assert sliding_window_retry_after(0, 1, 10.0, 1, WINDOW) == pytest.approx(2 * WINDOW - 10.0)
+
+
+@pytest.mark.parametrize("previous", [0, 3, 10, 25])
+@pytest.mark.parametrize("current", [0, 5, 9, 10])
+@pytest.mark.parametrize("elapsed", [0.0, 12.5, 45.0, 59.9])
+def test_hit_fits_after_retry_after(previous, current, elapsed):
+    retry_after = sliding_window_retry_after(previous, current, elapsed, LIMIT, WINDOW)
+    if retry_after is None:
+        return
+    assert retry_after >= 0
+    later = elapsed + retry_after
+    if later < WINDOW:
+        retry_again = sliding_window_retry_after(previous, current, later, LIMIT, WINDOW)
+    else:
+        # The window has switched: the current hits became the previous ones
+        retry_again = sliding_window_retry_after(current, 0, later - WINDOW, LIMIT, WINDOW)
+    assert retry_again is None or retry_again == pytest.approx(0.0, abs=1e-9)
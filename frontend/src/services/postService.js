@@ -54,7 +54,7 @@ export const createPost = async (formData, onProgress) => {
 export const fetchPopularPosts = async (skip = 0, limit = 6) => {
   try {
     const response = await api.get(`posts?skip=${skip}&limit=${limit}`);
-    return response.data;
+    return response.data.items;
   } catch (error) {
     handleError(error, 'Failed to fetch popular posts');
     return [];
@@ -64,7 +64,7 @@ export const fetchPopularPosts = async (skip = 0, limit = 6) => {
 export const fetchFollowingPosts = async (skip = 0, limit = 6) => {
   try {
     const response = await api.get(`posts/following?skip=${skip}&limit=${limit}`);
-    return response.data;
+    return response.data.items;
   } catch (error) {
     handleError(error, 'Failed to fetch following posts');
     return [];
@@ -95,7 +95,7 @@ export const searchPosts = async (query, category_id = null, sort = null, skip =
       params.append('sort', sort);
     }
     const response = await api.get(`/posts/search?${params.toString()}`);
-    return response.data;
+    return response.data.items;
   } catch (error) {
     handleError(error, 'Failed to search posts');
     return [];